@@ -0,0 +1,169 @@
+import asyncio
+
+from pymodbus.client import AsyncModbusTcpClient, AsyncModbusSerialClient
+from pymodbus.exceptions import ModbusException
+
+from client import (
+    READ_REQUESTS, READBACK_CODES, WRITE_REQUESTS, GarbledReplyError, Transaction, plan_poll,
+    store_block, write_mismatches, write_requests, write_value,
+)
+from logs import get_logger
+from metrics import CRC, AsyncWireTap, transaction_stats
+
+log = get_logger('async_client')
+
+
+class AsyncModbusToolClient:
+    """asyncio counterpart of ModbusToolClient.
+
+    Offers read/write and the planned reads as coroutines, so one event loop
+    can drive many TCP devices and serial ports at once without a thread per
+    connection. Request planning and write verification are shared with
+    ModbusToolClient, and every request is counted in the same stats and
+    frame capture::
+
+        clients = [AsyncModbusToolClient(host=h) for h in hosts]
+        await asyncio.gather(*(c.connect() for c in clients))
+        values = await asyncio.gather(*(c.read(3, 0, 10) for c in clients))
+    """
+
+    def __init__(self, mode='tcp', host='localhost', port=502, timeout=3, baudrate=9600, parity='N', bytesize=8, stopbits=1, retries=3, stats=None):
+        """Initialize async Modbus client.
+
+        Args:
+            mode (str): Connection mode ('tcp' or 'rtu')
+            host (str): IP address for TCP mode
+            port (int or str): TCP port number, or serial port name for RTU
+            timeout (int): Connection timeout in seconds
+            retries (int): Retries on a missing response before giving up
+            stats (TransactionStats): Where transactions are counted,
+                defaults to the shared metrics.transaction_stats
+        """
+        self.mode = mode
+        self.port = port
+        self.stats = stats if stats is not None else transaction_stats
+        if mode == 'tcp':
+            self.client = AsyncModbusTcpClient(host, port=port, timeout=timeout, retries=retries)
+        elif mode == 'rtu':
+            self.client = AsyncModbusSerialClient(
+                port,
+                timeout=timeout,
+                baudrate=baudrate,
+                parity=parity,
+                bytesize=bytesize,
+                stopbits=stopbits,
+                retries=retries
+            )
+        else:
+            raise ValueError("Mode must be 'tcp' or 'rtu'")
+        # A serial line carries one transaction at a time
+        self.lock = asyncio.Lock()
+
+    async def connect(self):
+        """Connect to the Modbus device."""
+        try:
+            return await self.client.connect()
+        except Exception as e:
+            log.error("Connection error: %s", e, extra={'port': self.port})
+            return False
+
+    def disconnect(self):
+        """Disconnect from the Modbus device."""
+        try:
+            self.client.close()
+        except:
+            pass  # Ensure we don't throw errors during cleanup
+
+    def is_connected(self):
+        return self.client.connected
+
+    async def request(self, function_code, unit, method, **kwargs):
+        """Run one request and record its latency and outcome.
+
+        See ModbusToolClient.request.
+        """
+        async with self.lock:
+            transaction = Transaction(self.stats, unit, function_code, AsyncWireTap.attach(self.client))
+            try:
+                result = await getattr(self.client, method)(slave=unit, **kwargs)
+            except Exception as e:
+                if transaction.failed(e) == CRC:
+                    raise GarbledReplyError(str(e)) from e
+                raise
+            finally:
+                transaction.flush()
+            return transaction.done(result)
+
+    async def read(self, function_code, address, count, unit=1):
+        """Read coils, discrete inputs or registers (function codes 1-4).
+
+        Returns:
+            list of values, or None if the read failed or was rejected
+        """
+        method, field, name = READ_REQUESTS[function_code]
+        extra = {'unit': unit, 'address': address, 'count': count}
+        try:
+            result = await self.request(function_code, unit, method, address=address, count=count)
+        except ModbusException as e:
+            log.warning("%s failed: %s", name, e, extra=extra)
+            return None
+        # An exception response carries an empty value list, not a failure
+        if result.isError():
+            log.warning("%s rejected: %s", name, result, extra=extra)
+            return None
+        return getattr(result, field)
+
+    async def read_block(self, block, unit=1):
+        """Read a planned ReadBlock; returns the values or None."""
+        values = await self.read(block.function_code, block.address, block.count, unit)
+        if values is None:
+            return None
+        # Bit reads are padded to a whole byte
+        return values[:block.count]
+
+    async def read_addresses(self, wanted, unit=1, max_gap=0):
+        """Read scattered addresses with the minimum number of requests.
+
+        See ModbusToolClient.read_addresses.
+        """
+        results = {}
+        for block in plan_poll(wanted, max_gap):
+            values = await self.read_block(block, unit)
+            if values is not None:
+                store_block(results, block, values)
+        return results
+
+    async def write(self, function_code, address, value, unit=1):
+        """Write coils or holding registers (function codes 5, 6, 15, 16).
+
+        See ModbusToolClient.write.
+        """
+        method, argument, name = WRITE_REQUESTS[function_code]
+        extra = {'unit': unit, 'address': address}
+        if argument == 'values':
+            extra['count'] = len(value)
+        try:
+            result = await self.request(function_code, unit, method, address=address, **{argument: value})
+            if result.isError():
+                log.warning("%s rejected: %s", name, result, extra=extra)
+                return False
+            return True
+        except Exception as e:
+            log.warning("%s failed: %s", name, e, extra=extra)
+            return False
+
+    async def write_values(self, function_code, values, unit=1, verify=False):
+        """Write pending values in as few transactions as possible.
+
+        See ModbusToolClient.write_values.
+        """
+        failed = []
+        for block in write_requests(values, function_code):
+            if not await self.write(block.function_code, block.address, write_value(block), unit):
+                failed.extend(range(block.address, block.address + len(block.values)))
+
+        if verify:
+            written = {addr: value for addr, value in values.items() if addr not in failed}
+            read = await self.read_addresses({READBACK_CODES[function_code]: written}, unit)
+            failed.extend(write_mismatches(function_code, written, read))
+        return sorted(failed)
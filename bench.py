@@ -0,0 +1,372 @@
+"""Reproducible benchmarks against a local simulated slave.
+
+Starts a pymodbus server over TCP and, on POSIX systems, over a pty-backed
+virtual serial pair, then measures request throughput and latency, connect
+cost and full-range scan time, plus GUI import time and time to first
+window. Results are written as JSON so runs can be compared::
+
+    python bench.py --output before.json
+    python bench.py --output after.json --compare before.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import select
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import pymodbus
+from pymodbus.datastore import ModbusSequentialDataBlock, ModbusServerContext, ModbusSlaveContext
+from pymodbus.server import ModbusSerialServer, ModbusTcpServer
+
+from client import ModbusToolClient, PortManager
+from logs import start_logging, stop_logging
+from pool import pool
+from rtu_timing import char_time
+from scanner import scan_rtu
+from tcp_scan import run_tcp_scan
+
+# Unit IDs answered by the simulated slave; every other ID stays silent
+SIM_UNITS = (1, 2, 3)
+
+# Registers per unit in the simulated slave
+SIM_REGISTERS = 2000
+
+SCAN_UNITS = range(1, 248)
+
+# Metrics where a larger value is better, for --compare
+HIGHER_IS_BETTER = ('requests_per_sec',)
+
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile of a list of samples"""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def summarize(latencies, elapsed):
+    return {
+        'requests': len(latencies),
+        'requests_per_sec': len(latencies) / elapsed if elapsed else None,
+        'latency_mean': sum(latencies) / len(latencies) if latencies else None,
+        'latency_p50': percentile(latencies, 0.5),
+        'latency_p99': percentile(latencies, 0.99),
+        'latency_max': max(latencies, default=None),
+    }
+
+
+def free_tcp_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+class SimulatedSlave:
+    """pymodbus server on its own event loop thread"""
+
+    def __init__(self, mode, **params):
+        block = lambda: ModbusSequentialDataBlock(0, list(range(SIM_REGISTERS)))
+        slaves = {
+            unit: ModbusSlaveContext(di=block(), co=block(), hr=block(), ir=block())
+            for unit in SIM_UNITS
+        }
+        context = ModbusServerContext(slaves=slaves, single=False)
+        self._loop = asyncio.new_event_loop()
+        self._started = threading.Event()
+
+        async def serve():
+            # Missing units stay silent like absent slaves on a real line
+            if mode == 'tcp':
+                self._server = ModbusTcpServer(context, ignore_missing_slaves=True, **params)
+            else:
+                self._server = ModbusSerialServer(context, ignore_missing_slaves=True, **params)
+            self._started.set()
+            await self._server.serve_forever()
+
+        self._thread = threading.Thread(target=self._loop.run_until_complete, args=(serve(),),
+                                        name="SimulatedSlave")
+        self._thread.daemon = True
+
+    def __enter__(self):
+        self._thread.start()
+        self._started.wait()
+        time.sleep(0.5)  # Let the listener open
+        return self
+
+    def __exit__(self, *exc):
+        asyncio.run_coroutine_threadsafe(self._server.shutdown(), self._loop).result(timeout=5)
+        self._thread.join(timeout=5)
+
+
+class VirtualSerialPair:
+    """Two ptys joined by a relay thread, standing in for a serial cable.
+
+    The relay holds each chunk for its time on the wire at ``baudrate`` so
+    scans and polls see realistic line timing; None relays at full speed.
+    """
+
+    def __init__(self, baudrate=None):
+        self.baudrate = baudrate
+        self._masters = []
+        self._slaves = []
+        self.ports = []
+        for _ in range(2):
+            master, slave = os.openpty()
+            self._masters.append(master)
+            self._slaves.append(slave)
+            self.ports.append(os.ttyname(slave))
+        self._stopping = False
+        self._thread = threading.Thread(target=self._relay, name="VirtualSerialPair")
+        self._thread.daemon = True
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stopping = True
+        self._thread.join(timeout=2)
+        for fd in self._masters + self._slaves:
+            os.close(fd)
+
+    def _relay(self):
+        a, b = self._masters
+        peer = {a: b, b: a}
+        while not self._stopping:
+            ready, _, _ = select.select([a, b], [], [], 0.1)
+            for fd in ready:
+                try:
+                    data = os.read(fd, 4096)
+                except OSError:
+                    continue
+                if self.baudrate:
+                    time.sleep(len(data) * char_time(self.baudrate))
+                os.write(peer[fd], data)
+
+
+def bench_requests(client, count, unit=1, registers=10):
+    """Sequential FC03 reads through one ModbusToolClient"""
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(count):
+        t = time.perf_counter()
+        client.read_holding_registers(0, registers, unit=unit)
+        latencies.append(time.perf_counter() - t)
+    return summarize(latencies, time.perf_counter() - start)
+
+
+def bench_connect(connect, close, count):
+    """Average seconds for a connect/close cycle"""
+    connects = []
+    closes = []
+    for _ in range(count):
+        t = time.perf_counter()
+        connect()
+        connects.append(time.perf_counter() - t)
+        t = time.perf_counter()
+        close()
+        closes.append(time.perf_counter() - t)
+    return {
+        'cycles': count,
+        'connect_mean': sum(connects) / count,
+        'connect_p99': percentile(connects, 0.99),
+        'close_mean': sum(closes) / count,
+    }
+
+
+def run_tcp(args):
+    port = free_tcp_port()
+    results = {}
+    with SimulatedSlave('tcp', address=('127.0.0.1', port)):
+        client = ModbusToolClient('tcp', host='127.0.0.1', port=port)
+        client.connect()
+        bench_requests(client, args.warmup)
+        results['requests'] = bench_requests(client, args.requests)
+        client.close()
+
+        def connect():
+            connect.client = ModbusToolClient('tcp', host='127.0.0.1', port=port)
+            connect.client.connect()
+
+        results['connect'] = bench_connect(connect, lambda: connect.client.close(), args.connects)
+
+        start = time.perf_counter()
+        found = run_tcp_scan('127.0.0.1', units=SCAN_UNITS, port=port, timeout=args.scan_timeout)
+        results['scan'] = {
+            'units': len(SCAN_UNITS),
+            'found': [unit for _, unit in found],
+            'seconds': time.perf_counter() - start,
+        }
+    return results
+
+
+def run_rtu(args):
+    results = {'baudrate': args.baudrate}
+    line = dict(baudrate=args.baudrate, parity='N', bytesize=8, stopbits=1)
+    with VirtualSerialPair(args.baudrate) as pair:
+        server_port, client_port = pair.ports
+        with SimulatedSlave('rtu', port=server_port, **line):
+            client = ModbusToolClient('rtu', port=client_port, timeout=1, **line)
+            client.connect()
+            bench_requests(client, args.warmup)
+            results['requests'] = bench_requests(client, args.requests)
+            client.close()
+
+            # Cold: open and close the port every time; warm: reuse the
+            # PortManager session as the GUI does between devices
+            def cold_connect():
+                cold_connect.client = ModbusToolClient('rtu', port=client_port, timeout=1, **line)
+                cold_connect.client.connect()
+
+            results['connect_cold'] = bench_connect(
+                cold_connect, lambda: cold_connect.client.close(), args.connects
+            )
+
+            keeper = ModbusToolClient('rtu', port=client_port, timeout=1, **line)
+            keeper.connect()
+
+            def warm_connect():
+                warm_connect.client = ModbusToolClient('rtu', port=client_port, timeout=1, **line)
+                warm_connect.client.connect()
+
+            results['connect_warm'] = bench_connect(
+                warm_connect, lambda: warm_connect.client.disconnect(), args.connects
+            )
+            keeper.close()
+
+            start = time.perf_counter()
+            found = scan_rtu(client_port, line, SCAN_UNITS)
+            results['scan'] = {
+                'units': len(SCAN_UNITS),
+                'found': found,
+                'seconds': time.perf_counter() - start,
+            }
+            pool.close_all()
+            PortManager.release_all()
+    return results
+
+
+def run_startup(args):
+    """GUI module import time and, when a display is available, time to first window"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    code = "import time; t = time.perf_counter(); import main_window; print(time.perf_counter() - t)"
+    imports = []
+    processes = []
+    for _ in range(args.startup_runs):
+        start = time.perf_counter()
+        out = subprocess.run([sys.executable, '-c', code], cwd=here, capture_output=True, text=True, check=True)
+        processes.append(time.perf_counter() - start)
+        imports.append(float(out.stdout.split()[-1]))
+    results = {
+        'runs': args.startup_runs,
+        'import_seconds': percentile(imports, 0.5),
+        'process_seconds': percentile(processes, 0.5),
+        'first_window_seconds': None,
+    }
+
+    windows = []
+    for _ in range(args.startup_runs):
+        try:
+            out = subprocess.run([sys.executable, 'main_window.py', '--profile-startup'],
+                                 cwd=here, capture_output=True, text=True, timeout=60)
+        except subprocess.TimeoutExpired:
+            break
+        if out.returncode != 0:
+            print("Skipping time to first window: the GUI could not start", file=sys.stderr)
+            break
+        timings = json.loads(out.stdout.strip().splitlines()[-1])
+        windows.append(timings['first_window_seconds'])
+        results['target_seconds'] = timings['target_seconds']
+    if windows:
+        results['first_window_seconds'] = percentile(windows, 0.5)
+    return results
+
+
+def flatten(results, prefix=''):
+    """Numeric leaves of a result tree keyed by dotted path"""
+    flat = {}
+    for key, value in results.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, path + '.'))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = value
+    return flat
+
+
+def compare(results, baseline):
+    """Print the relative change of every metric against a baseline run"""
+    old = flatten(baseline.get('results', {}))
+    for path, value in flatten(results['results']).items():
+        before = old.get(path)
+        if not before:
+            continue
+        change = (value - before) / before * 100
+        better = change > 0 if path.rsplit('.', 1)[-1] in HIGHER_IS_BETTER else change < 0
+        mark = '+' if better else '-' if abs(change) >= 1 else ' '
+        print(f"{mark} {path:40} {before:12.6g} -> {value:12.6g} ({change:+.1f}%)", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Modbus client against a simulated slave")
+    parser.add_argument('--requests', type=int, default=2000, help="Reads per throughput run")
+    parser.add_argument('--warmup', type=int, default=100, help="Reads before measuring")
+    parser.add_argument('--connects', type=int, default=20, help="Connect/close cycles")
+    parser.add_argument('--baudrate', type=int, default=19200, help="Simulated serial line speed")
+    parser.add_argument('--scan-timeout', type=float, default=0.5, help="TCP scan probe timeout")
+    parser.add_argument('--startup-runs', type=int, default=5, help="GUI start-ups to time")
+    parser.add_argument('--skip', choices=('tcp', 'rtu', 'startup'), action='append', default=[],
+                        help="Skip a transport")
+    parser.add_argument('--output', '-o', default=None, help="Write results here instead of stdout")
+    parser.add_argument('--compare', default=None, metavar='BASELINE',
+                        help="Print changes against an earlier results file")
+    args = parser.parse_args(argv)
+
+    # Scans time out on purpose; only report errors. The simulated slave
+    # also logs every request to an absent unit through pymodbus.
+    start_logging(level=logging.ERROR)
+    logging.getLogger('pymodbus').setLevel(logging.CRITICAL)
+    results = {}
+    try:
+        if 'tcp' not in args.skip:
+            results['tcp'] = run_tcp(args)
+        if 'rtu' not in args.skip:
+            if hasattr(os, 'openpty'):
+                results['rtu'] = run_rtu(args)
+            else:
+                print("Skipping RTU: virtual serial pairs need a POSIX pty", file=sys.stderr)
+        if 'startup' not in args.skip:
+            results['startup'] = run_startup(args)
+    finally:
+        stop_logging()
+
+    report = {
+        'timestamp': time.time(),
+        'python': platform.python_version(),
+        'pymodbus': pymodbus.__version__,
+        'platform': platform.platform(),
+        'parameters': {k: v for k, v in vars(args).items() if k not in ('output', 'compare')},
+        'results': results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            compare(report, json.load(f))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
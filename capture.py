@@ -0,0 +1,86 @@
+import threading
+import time
+from collections import deque, namedtuple
+
+# Frames kept in memory; the oldest are dropped first
+DEFAULT_CAPACITY = 20000
+
+TX = 'TX'
+RX = 'RX'
+
+Frame = namedtuple('Frame', ['seq', 'timestamp', 'direction', 'source', 'data'])
+
+
+def format_frame(frame):
+    """One text line: wall time, direction, source and hex bytes"""
+    seconds = int(frame.timestamp)
+    stamp = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(seconds))
+    micros = int((frame.timestamp - seconds) * 1e6)
+    return f"{stamp}.{micros:06d} {frame.direction} {frame.source} {frame.data.hex(' ').upper()}"
+
+
+class FrameCapture:
+    """Bounded in-memory ring of raw TX/RX frames.
+
+    WireTap feeds every client's traffic in here while ``enabled`` is set;
+    when it is clear the tap only pays for one attribute check. Timestamps
+    come from the high-resolution performance counter, anchored to the wall
+    clock when the capture was created.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.enabled = False
+        self._frames = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._next_seq = 0
+        self._wall_start = time.time()
+        self._counter_start = time.perf_counter()
+
+    def start(self):
+        self.enabled = True
+
+    def stop(self):
+        self.enabled = False
+
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
+
+    def add(self, direction, source, data, counter=None):
+        """Store one frame.
+
+        Args:
+            direction (str): TX or RX
+            source (str): Port or host the frame went over
+            data (bytes): Raw frame
+            counter (float): perf_counter() when the frame started, now if None
+        """
+        if counter is None:
+            counter = time.perf_counter()
+        timestamp = self._wall_start + (counter - self._counter_start)
+        with self._lock:
+            self._frames.append(Frame(self._next_seq, timestamp, direction, source, bytes(data)))
+            self._next_seq += 1
+
+    def since(self, seq=-1):
+        """Frames with a sequence number above ``seq``, oldest first"""
+        with self._lock:
+            if not self._frames or self._frames[-1].seq <= seq:
+                return []
+            skip = max(0, seq + 1 - self._frames[0].seq)
+            return list(self._frames)[skip:]
+
+    def __len__(self):
+        return len(self._frames)
+
+    def dump(self, path):
+        """Write the buffered frames to a text file, one per line"""
+        frames = self.since()
+        with open(path, 'w') as f:
+            for frame in frames:
+                f.write(format_frame(frame) + '\n')
+        return len(frames)
+
+
+# Shared by every ModbusToolClient's WireTap
+frame_capture = FrameCapture()
@@ -0,0 +1,100 @@
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+
+from capture import TX, format_frame, frame_capture
+
+# Milliseconds between view refreshes
+REFRESH_INTERVAL = 200
+
+# Lines kept in the view; the ring buffer itself keeps more
+MAX_VIEW_LINES = 2000
+
+
+class CaptureWindow(tk.Toplevel):
+    """Live hex view of the raw frame capture.
+
+    The view only reads frames added since its last refresh, so polling
+    keeps running on the worker thread while frames are displayed.
+    """
+
+    def __init__(self, parent, capture=frame_capture):
+        super().__init__(parent)
+        self.title("Frame Capture")
+        self.geometry("900x450")
+        self.capture = capture
+        self.last_seq = -1
+        self.refresh_job = None
+
+        self.create_widgets()
+        self.refresh()
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    def create_widgets(self):
+        button_frame = ttk.Frame(self)
+        button_frame.pack(fill=tk.X, padx=10, pady=5)
+        self.capture_var = tk.BooleanVar(value=self.capture.enabled)
+        ttk.Checkbutton(
+            button_frame, text="Capture", variable=self.capture_var, command=self.toggle_capture
+        ).pack(side=tk.LEFT)
+        self.pause_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(button_frame, text="Pause view", variable=self.pause_var).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Clear", command=self.clear).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Save", command=self.save).pack(side=tk.LEFT)
+        self.count_label = ttk.Label(button_frame, text="")
+        self.count_label.pack(side=tk.RIGHT)
+
+        text_frame = ttk.Frame(self)
+        text_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+        self.text = tk.Text(text_frame, font=('Courier', 9), wrap=tk.NONE, state=tk.DISABLED)
+        scrollbar = ttk.Scrollbar(text_frame, orient=tk.VERTICAL, command=self.text.yview)
+        self.text.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.text.tag_configure(TX, foreground='blue')
+
+    def toggle_capture(self):
+        if self.capture_var.get():
+            self.capture.start()
+        else:
+            self.capture.stop()
+
+    def refresh(self):
+        """Append the frames captured since the last refresh"""
+        self.count_label.config(text=f"{len(self.capture)} frames buffered")
+        if not self.pause_var.get():
+            frames = self.capture.since(self.last_seq)[-MAX_VIEW_LINES:]
+            if frames:
+                self.last_seq = frames[-1].seq
+                self.text.config(state=tk.NORMAL)
+                for frame in frames:
+                    self.text.insert(tk.END, format_frame(frame) + '\n', frame.direction)
+                lines = int(self.text.index('end-1c').split('.')[0]) - 1
+                if lines > MAX_VIEW_LINES:
+                    self.text.delete('1.0', f"{lines - MAX_VIEW_LINES + 1}.0")
+                self.text.config(state=tk.DISABLED)
+                self.text.see(tk.END)
+        self.refresh_job = self.after(REFRESH_INTERVAL, self.refresh)
+
+    def clear(self):
+        self.capture.clear()
+        self.text.config(state=tk.NORMAL)
+        self.text.delete('1.0', tk.END)
+        self.text.config(state=tk.DISABLED)
+
+    def save(self):
+        path = filedialog.asksaveasfilename(
+            parent=self,
+            defaultextension=".txt",
+            filetypes=[("Text", "*.txt"), ("All files", "*.*")]
+        )
+        if not path:
+            return
+        try:
+            self.capture.dump(path)
+        except OSError as e:
+            messagebox.showerror("Error", f"Cannot save capture: {e}", parent=self)
+
+    def on_close(self):
+        if self.refresh_job:
+            self.after_cancel(self.refresh_job)
+        self.destroy()
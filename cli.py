@@ -0,0 +1,427 @@
+"""Headless scanning and polling for gateways without a display.
+
+Runs from a JSON config and writes one JSON object per line to stdout or a
+file. Only the client and poller modules are imported, never tkinter or
+matplotlib, so it starts quickly on small Linux boxes::
+
+    python cli.py scan gateway.json
+    python cli.py poll gateway.json --output /var/log/modbus.jsonl
+
+Example config; addresses are 0-based and may be given as "start-end"::
+
+    {
+        "connections": [
+            {"mode": "rtu", "port": "/dev/ttyUSB0", "baudrate": 9600, "parity": "N",
+             "scan": {"start": 1, "end": 247},
+             "targets": [
+                 {"unit": 1, "interval": 1.0, "holding": [0, 1, "10-19"]},
+                 {"unit": 1, "group": "setpoints", "interval": 30.0, "holding": ["100-139"]},
+                 {"unit": 5, "interval": 10.0, "coils": ["0-15"], "input": [3]},
+                 {"unit": 7, "interval": 5.0, "map": "meter_map.json"}
+             ]},
+            {"mode": "tcp", "host": "192.168.1.0/24", "port": 502}
+        ]
+    }
+
+A unit may be listed more than once to poll register sets at different
+rates; each extra entry needs its own "group" name, which its records carry.
+The --stats output reports the achieved period and start jitter per unit and
+group.
+
+A target's "map" names a register map file (see register_map.py); its tags
+are polled along with any listed addresses and each record then carries the
+decoded engineering values under "tags".
+
+A "deadband" given for a target, or at the top level for every target,
+turns on report-by-exception: records then carry only the values that moved
+past their deadband, and polls where nothing moved write no record. "refresh"
+re-sends unchanged values after that many seconds; "registers" and "tags" set
+deadbands for individual registers and map tags::
+
+    "deadband": {"absolute": 0, "percent": 1.0, "refresh": 300,
+                 "registers": [{"holding": ["10-12"], "absolute": 5}],
+                 "tags": {"flow": {"percent": 2}}}
+"""
+import argparse
+import json
+import logging
+import queue
+import signal
+import sys
+import threading
+import time
+
+from capture import frame_capture
+from client import FUNCTION_CODES
+from deadband import ChangeFilter
+from device_cache import DeviceCache
+from logs import start_logging, stop_logging
+from metrics import transaction_stats
+from poller import BusPoller, PollTarget
+from pool import pool
+from scanner import scan_rtu
+from tcp_scan import run_tcp_scan
+
+REGISTER_TYPES = {code: name for name, code in FUNCTION_CODES.items()}
+
+# Serial framing keys passed through to ModbusToolClient
+SERIAL_KEYS = ('baudrate', 'parity', 'bytesize', 'stopbits')
+
+# Seconds between checks of the stop flag while idle
+IDLE_WAIT = 0.5
+
+
+def parse_addresses(spec):
+    """Expand a list of addresses and "start-end" ranges into a set"""
+    addresses = set()
+    for item in spec:
+        if isinstance(item, str) and '-' in item:
+            start, end = item.split('-', 1)
+            addresses.update(range(int(start), int(end) + 1))
+        else:
+            addresses.add(int(item))
+    return addresses
+
+
+def load_config(path):
+    """Read a config file and check that every connection is usable"""
+    with open(path, 'r') as f:
+        config = json.load(f)
+    connections = config.get('connections')
+    if not connections:
+        raise ValueError(f"{path} defines no connections")
+    for connection in connections:
+        mode = connection.get('mode', 'rtu')
+        if mode == 'rtu' and 'port' not in connection:
+            raise ValueError("RTU connections need a 'port'")
+        if mode == 'tcp' and 'host' not in connection:
+            raise ValueError("TCP connections need a 'host'")
+        if mode not in ('rtu', 'tcp'):
+            raise ValueError(f"Unknown connection mode '{mode}'")
+        seen = set()
+        for target in connection.get('targets', []):
+            if 'unit' not in target:
+                raise ValueError("Targets need a 'unit'")
+            key = (target['unit'], target.get('group', 'default'))
+            if key in seen:
+                raise ValueError(f"Unit {key[0]} is listed twice in group '{key[1]}'")
+            seen.add(key)
+    return config
+
+
+def connection_name(connection):
+    if connection.get('mode', 'rtu') == 'rtu':
+        return connection['port']
+    return f"{connection['host']}:{connection.get('port', 502)}"
+
+
+def serial_line(connection):
+    """Framing settings of an RTU connection with the GUI's defaults"""
+    line = dict(baudrate=9600, parity='N', bytesize=8, stopbits=1)
+    line.update({key: connection[key] for key in SERIAL_KEYS if key in connection})
+    line['parity'] = line['parity'][0].upper()
+    return line
+
+
+def build_change_filter(spec):
+    """ChangeFilter for a target's "deadband" config"""
+    change_filter = ChangeFilter(spec.get('absolute', 0.0), spec.get('percent', 0.0), spec.get('refresh'))
+    for entry in spec.get('registers', []):
+        for name, code in FUNCTION_CODES.items():
+            for address in parse_addresses(entry.get(name, [])):
+                change_filter.set_deadband((code, address), entry.get('absolute', 0.0), entry.get('percent', 0.0))
+    for name, band in spec.get('tags', {}).items():
+        change_filter.set_deadband(name, band.get('absolute', 0.0), band.get('percent', 0.0))
+    return change_filter
+
+
+def client_settings(connection):
+    """Pool arguments for a connection"""
+    if connection.get('mode', 'rtu') == 'rtu':
+        settings = dict(port=connection['port'], **serial_line(connection))
+    else:
+        settings = dict(host=connection['host'], port=connection.get('port', 502))
+    if 'timeout' in connection:
+        settings['timeout'] = connection['timeout']
+    return settings
+
+
+class JsonLinesWriter:
+    """Thread-safe JSON Lines output"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._lock = threading.Lock()
+
+    def write(self, record):
+        line = json.dumps(record, separators=(',', ':'))
+        with self._lock:
+            self.stream.write(line + '\n')
+            self.stream.flush()
+
+
+def run_scan(config, args, out, stop):
+    cache = None
+    if args.cache:
+        cache = DeviceCache(args.cache)
+        cache.load()
+    for connection in config['connections']:
+        if stop.is_set():
+            break
+        scan = connection.get('scan', {})
+        units = range(scan.get('start', args.start), scan.get('end', args.end) + 1)
+        if connection.get('mode', 'rtu') == 'rtu':
+            name = connection_name(connection)
+            line = serial_line(connection)
+            if cache is not None and args.known:
+                units = [entry['unit'] for entry in cache.known(connection['port'], line)]
+
+            def on_found(unit, identity):
+                if cache is not None:
+                    cache.update(connection['port'], line, unit, identity)
+                out.write({'time': time.time(), 'port': name, 'unit': unit, **identity})
+
+            scan_rtu(
+                connection['port'],
+                line,
+                units,
+                confirm_misses=scan.get('confirm', args.confirm),
+                timeout=connection.get('timeout'),
+                on_found=on_found,
+                should_stop=stop.is_set,
+            )
+            if cache is not None:
+                cache.save()
+        else:
+            run_tcp_scan(
+                connection['host'],
+                units=units,
+                port=connection.get('port', 502),
+                timeout=connection.get('timeout', 0.5),
+                on_found=lambda host, unit: out.write({'time': time.time(), 'host': host, 'unit': unit}),
+            )
+    return 0
+
+
+class SourceQueue:
+    """Puts (source, result) pairs on a shared queue for one poller"""
+
+    def __init__(self, results, source):
+        self.results = results
+        self.source = source
+        # (unit, group) -> configured addresses; blocks may span unrequested gaps
+        self.wanted = {}
+        # (unit, group) -> RegisterMap for targets that name one
+        self.maps = {}
+        # (unit, group) -> ChangeFilter for targets with a deadband
+        self.filters = {}
+
+    def put(self, result):
+        self.results.put((self, result))
+
+
+def start_pollers(config, results):
+    """Connect every connection that has targets and start its BusPoller"""
+    max_gap = config.get('max_gap', 8)
+    pollers = []
+    try:
+        for connection in config['connections']:
+            targets = connection.get('targets', [])
+            if not targets:
+                continue
+            client = pool.get(connection.get('mode', 'rtu'), **client_settings(connection))
+            if client is None:
+                raise ConnectionError(f"Failed to open {connection_name(connection)}")
+            source = SourceQueue(results, connection_name(connection))
+            poller = BusPoller(client, source)
+            pollers.append(poller)
+            for target in targets:
+                unit, group = target['unit'], target.get('group', 'default')
+                key = (unit, group)
+                wanted = {
+                    code: parse_addresses(target[name])
+                    for name, code in FUNCTION_CODES.items() if target.get(name)
+                }
+                if target.get('map'):
+                    from register_map import RegisterMap
+
+                    register_map = RegisterMap.load(target['map'])
+                    source.maps[key] = register_map
+                    for code, addresses in register_map.wanted().items():
+                        wanted.setdefault(code, set()).update(addresses)
+                source.wanted[key] = wanted
+                deadband = target.get('deadband', config.get('deadband'))
+                if deadband is not None:
+                    source.filters[key] = build_change_filter(deadband)
+                poller.add_target(PollTarget(unit, wanted, target.get('interval', 1.0), max_gap, group))
+    except Exception:
+        stop_pollers(pollers)
+        raise
+    for poller in pollers:
+        poller.start()
+    return pollers
+
+
+def stop_pollers(pollers):
+    """Stop the pollers and return their clients once no read is in progress"""
+    # Signal every poller first so their last reads finish in parallel
+    for poller in pollers:
+        poller.stop(wait=False)
+    for poller in pollers:
+        poller.stop()
+        pool.put(poller.client)
+
+
+def poll_record(source, result):
+    """JSON record for a BusResult; values are None when the unit did not answer.
+
+    With a deadband only the values that moved are kept, and None is
+    returned when nothing did.
+    """
+    target = (result.unit, result.group)
+    record = {'time': result.timestamp, 'source': source.source, 'unit': result.unit}
+    if result.group != 'default':
+        record['group'] = result.group
+    if result.values is None:
+        record['values'] = None
+        return record
+
+    wanted = source.wanted.get(target, {})
+    read = {key: value for key, value in result.values.items() if key[1] in wanted.get(key[0], ())}
+    tags = None
+    register_map = source.maps.get(target)
+    if register_map is not None:
+        tags = {}
+        for function_code in register_map.wanted():
+            registers = {a: v for (code, a), v in result.values.items() if code == function_code}
+            tags.update(register_map.decode(function_code, registers))
+
+    change_filter = source.filters.get(target)
+    if change_filter is not None:
+        read = change_filter.filter(result.timestamp, read)
+        if tags is not None:
+            tags = change_filter.filter(result.timestamp, tags)
+        if not read and not tags:
+            return None
+
+    values = {}
+    for (function_code, address), value in sorted(read.items()):
+        values.setdefault(REGISTER_TYPES[function_code], {})[str(address)] = int(value)
+    record['values'] = values
+    if tags is not None:
+        record['tags'] = tags
+    return record
+
+
+def run_poll(config, args, out, stop):
+    if args.capture:
+        frame_capture.start()
+    results = queue.Queue()
+    pollers = start_pollers(config, results)
+    if not pollers:
+        print("No targets to poll", file=sys.stderr)
+        return 1
+
+    deadline = time.monotonic() + args.duration if args.duration else None
+    next_stats = time.monotonic() + args.stats if args.stats else None
+    try:
+        while not stop.is_set():
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            try:
+                source, result = results.get(timeout=IDLE_WAIT)
+                record = poll_record(source, result)
+                if record is not None:
+                    out.write(record)
+            except queue.Empty:
+                pass
+            if next_stats is not None and time.monotonic() >= next_stats:
+                next_stats += args.stats
+                for poller in pollers:
+                    print(json.dumps({'source': poller.results.source, 'stats': poller.stats()}),
+                          file=sys.stderr)
+    finally:
+        stop_pollers(pollers)
+        if args.export_stats:
+            transaction_stats.export(args.export_stats)
+        if args.capture:
+            frame_capture.dump(args.capture)
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Headless Modbus scanning and polling")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    scan = commands.add_parser('scan', help="List the unit IDs that answer on each connection")
+    scan.add_argument('config', help="JSON config file")
+    scan.add_argument('--start', type=int, default=1, help="First unit ID (default 1)")
+    scan.add_argument('--end', type=int, default=247, help="Last unit ID (default 247)")
+    scan.add_argument('--confirm', action='store_true',
+                      help="Re-probe RTU misses once with a longer timeout")
+    scan.add_argument('--cache', default=None, metavar='PATH',
+                      help="Store RTU devices found, with their identification, in this cache file")
+    scan.add_argument('--known', action='store_true',
+                      help="Only re-verify the RTU devices already in --cache")
+
+    poll = commands.add_parser('poll', help="Poll the configured targets until stopped")
+    poll.add_argument('config', help="JSON config file")
+    poll.add_argument('--duration', type=float, default=None,
+                      help="Stop after this many seconds (default: run until signalled)")
+    poll.add_argument('--stats', type=float, default=None, metavar='SECONDS',
+                      help="Print poller statistics to stderr at this interval")
+    poll.add_argument('--export-stats', default=None, metavar='PATH',
+                      help="Write per-unit transaction statistics (.csv or .json) on exit")
+    poll.add_argument('--capture', default=None, metavar='PATH',
+                      help="Capture raw frames and write the most recent ones here on exit")
+
+    for command in (scan, poll):
+        command.add_argument('--output', '-o', default=None,
+                             help="Append JSON lines to this file instead of stdout")
+        command.add_argument('--log-file', default=None,
+                             help="Also write diagnostics to this rotating log file")
+        command.add_argument('--log-level', default='WARNING',
+                             choices=('DEBUG', 'INFO', 'WARNING', 'ERROR'),
+                             help="Minimum level of diagnostics (default WARNING)")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == 'scan' and args.known and not args.cache:
+        parser.error("--known needs --cache")
+    try:
+        config = load_config(args.config)
+    except (OSError, ValueError) as e:
+        print(f"Error loading config: {e}", file=sys.stderr)
+        return 2
+
+    # Diagnostics go to stderr and the optional log file; stdout carries records
+    start_logging(args.log_file, getattr(logging, args.log_level))
+    stream = open(args.output, 'a') if args.output else sys.stdout
+    out = JsonLinesWriter(stream)
+
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.set())
+
+    try:
+        if args.command == 'scan':
+            return run_scan(config, args, out, stop)
+        return run_poll(config, args, out, stop)
+    except BrokenPipeError:
+        # The reader went away, e.g. piped into head
+        return 0
+    except (ConnectionError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        pool.close_all()
+        stop_logging()
+        if args.output:
+            stream.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
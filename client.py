@@ -1,76 +1,337 @@
 from pymodbus.client import ModbusTcpClient, ModbusSerialClient
-from pymodbus.exceptions import ModbusException
-import serial
-import serial.tools.list_ports
+from pymodbus.exceptions import ModbusException, ModbusIOException
+import copy
+import threading
 import time
+from collections import namedtuple
 from contextlib import contextmanager
 
+from logs import get_logger
+from metrics import CRC, ERROR, EXCEPTION, OK, TIMEOUT, WireTap, transaction_stats
+
+log = get_logger('client')
+
+# Register types used by the GUI, by read function code
+FUNCTION_CODES = {'coils': 1, 'discrete': 2, 'holding': 3, 'input': 4}
+
+# Protocol limit on the quantity of a single read, by function code
+MAX_READ_COUNT = {1: 2000, 2: 2000, 3: 125, 4: 125}
+
+# Protocol limit on the quantity of a single multiple write, by function code
+MAX_WRITE_COUNT = {15: 1968, 16: 123}
+
+# Read requests by function code: pymodbus method, response field, log name
+READ_REQUESTS = {
+    1: ('read_coils', 'bits', 'Read coils'),
+    2: ('read_discrete_inputs', 'bits', 'Read discrete inputs'),
+    3: ('read_holding_registers', 'registers', 'Read holding registers'),
+    4: ('read_input_registers', 'registers', 'Read input registers'),
+}
+
+# Write requests by function code: pymodbus method, value argument, log name
+WRITE_REQUESTS = {
+    5: ('write_coil', 'value', 'Write coil'),
+    6: ('write_register', 'value', 'Write register'),
+    15: ('write_coils', 'values', 'Write coils'),
+    16: ('write_registers', 'values', 'Write registers'),
+}
+
+# Read function code used to verify a multiple write
+READBACK_CODES = {15: 1, 16: 3}
+
+# Read Device Identification (FC43/14) categories
+DEVICE_ID_BASIC = 0x01
+DEVICE_ID_REGULAR = 0x02
+
+# Settings that define the serial line; timeout and retries are per client
+LINE_SETTINGS = ('baudrate', 'parity', 'bytesize', 'stopbits')
+
+ReadBlock = namedtuple('ReadBlock', ['function_code', 'address', 'count'])
+WriteBlock = namedtuple('WriteBlock', ['function_code', 'address', 'values'])
+
+
+def plan_reads(addresses, function_code, max_gap=0):
+    """Merge wanted addresses into the fewest reads the protocol allows.
+
+    Args:
+        addresses (iterable): 0-based addresses to read
+        function_code (int): Read function code (1-4)
+        max_gap (int): Unwanted addresses tolerated inside a block. Reading a
+            few extra registers is usually cheaper than another round trip.
+
+    Returns:
+        list of ReadBlock sorted by address
+    """
+    if function_code not in MAX_READ_COUNT:
+        raise ValueError(f"Unsupported read function code: {function_code}")
+    limit = MAX_READ_COUNT[function_code]
+
+    blocks = []
+    start = end = None
+    for addr in sorted(set(addresses)):
+        if not 0 <= addr <= 0xFFFF:
+            raise ValueError(f"Address out of range: {addr}")
+        if start is not None and addr - end - 1 <= max_gap and addr - start < limit:
+            end = addr
+            continue
+        if start is not None:
+            blocks.append(ReadBlock(function_code, start, end - start + 1))
+        start = end = addr
+    if start is not None:
+        blocks.append(ReadBlock(function_code, start, end - start + 1))
+    return blocks
+
+
+def plan_poll(wanted, max_gap=0):
+    """Plan the reads for one poll cycle.
+
+    Args:
+        wanted (dict): Function code -> iterable of 0-based addresses
+        max_gap (int): Gap tolerance passed to plan_reads
+
+    Returns:
+        list of ReadBlock ordered by function code and address
+    """
+    blocks = []
+    for function_code in sorted(wanted):
+        blocks.extend(plan_reads(wanted[function_code], function_code, max_gap))
+    return blocks
+
+
+def plan_writes(values, function_code):
+    """Split pending writes into contiguous FC15/FC16 transactions.
+
+    Args:
+        values (dict): 0-based address -> value to write
+        function_code (int): 15 (coils) or 16 (holding registers)
+
+    Returns:
+        list of WriteBlock sorted by address
+    """
+    if function_code not in MAX_WRITE_COUNT:
+        raise ValueError(f"Unsupported write function code: {function_code}")
+    limit = MAX_WRITE_COUNT[function_code]
+
+    blocks = []
+    run = []
+    start = None
+    for addr in sorted(values):
+        if run and (addr != start + len(run) or len(run) >= limit):
+            blocks.append(WriteBlock(function_code, start, run))
+            run = []
+        if not run:
+            start = addr
+        run.append(values[addr])
+    if run:
+        blocks.append(WriteBlock(function_code, start, run))
+    return blocks
+
+
+def write_requests(values, function_code):
+    """Plan the requests for pending writes.
+
+    Contiguous runs go out as one FC15/FC16 request; single values use
+    FC05/FC06 so devices without the multiple-write codes still work.
+
+    Returns:
+        list of WriteBlock carrying the function code to send
+    """
+    single = 5 if function_code == 15 else 6
+    return [
+        block._replace(function_code=single) if len(block.values) == 1 else block
+        for block in plan_writes(values, function_code)
+    ]
+
+
+def write_value(block):
+    """Value argument of a planned write: the value for FC05/FC06, else the list"""
+    return block.values[0] if block.function_code in (5, 6) else block.values
+
+
+def store_block(results, block, values):
+    """Put the values of a planned read into a (function_code, address) dict"""
+    for offset, value in enumerate(values):
+        results[(block.function_code, block.address + offset)] = value
+
+
+def write_mismatches(function_code, written, read):
+    """Addresses whose read-back value differs from the one written.
+
+    Args:
+        function_code (int): 15 (coils) or 16 (holding registers)
+        written (dict): 0-based address -> value written
+        read (dict): read_addresses() result of reading them back
+    """
+    coils = function_code == 15
+    read_code = READBACK_CODES[function_code]
+    failed = []
+    for addr, value in written.items():
+        actual = read.get((read_code, addr))
+        if actual is None or (bool(actual) != bool(value) if coils else actual != value):
+            failed.append(addr)
+    return failed
+
+
+class GarbledReplyError(ModbusIOException):
+    """Reply bytes arrived but did not make a valid frame.
+
+    Something answered, so the unit is there even though the reply was
+    lost to noise, a bad CRC or a timeout too short for its length.
+    """
+
+
+class Transaction:
+    """Latency, retries and outcome of one request, counted in stats.
+
+    A request that gets no valid reply is a CRC error when bytes did
+    arrive (garbled or truncated frames) and a timeout when the line
+    stayed silent. Without a WireTap (None) neither retries nor CRC errors
+    can be seen.
+    """
+
+    def __init__(self, stats, unit, function_code, tap):
+        self.stats = stats
+        self.unit = unit
+        self.function_code = function_code
+        self.tap = tap
+        self.sent, self.received = (tap.sent, tap.received) if tap else (0, 0)
+        self.start = time.perf_counter()
+
+    def failed(self, error):
+        """Count a request that raised instead of returning a response.
+
+        Returns:
+            The outcome recorded: CRC, TIMEOUT or ERROR
+        """
+        if isinstance(error, ModbusIOException):
+            outcome = CRC if self.tap and self.tap.received > self.received else TIMEOUT
+        else:
+            outcome = ERROR
+        self._record(outcome)
+        return outcome
+
+    def flush(self):
+        """Capture the reply bytes of the request"""
+        if self.tap:
+            self.tap.flush()
+
+    def done(self, result):
+        """Count a response; returns it"""
+        if result.isError():
+            self._record(EXCEPTION, getattr(result, 'exception_code', None))
+        else:
+            self._record(OK)
+        return result
+
+    def _record(self, outcome, exception_code=None):
+        retries = max(0, self.tap.sent - self.sent - 1) if self.tap else 0
+        self.stats.record(self.unit, self.function_code, time.perf_counter() - self.start,
+                          outcome, retries, exception_code)
+
+
 class PortManager:
+    """Long-lived serial session shared by every client on a port.
+
+    The serial client stays open across devices (the unit ID is part of each
+    request) and is only reopened when the line settings change.
+    """
     _instances = {}
+    _instances_lock = threading.Lock()
     
     @classmethod
     def get_instance(cls, port):
-        if port not in cls._instances:
-            cls._instances[port] = cls(port)
-        return cls._instances[port]
+        with cls._instances_lock:
+            if port not in cls._instances:
+                cls._instances[port] = cls(port)
+            return cls._instances[port]
     
     @classmethod
     def release_all(cls):
-        """Release all managed ports"""
-        for manager in cls._instances.values():
-            manager.release()
-        cls._instances.clear()
+        """Close all managed ports"""
+        with cls._instances_lock:
+            for manager in cls._instances.values():
+                manager.close()
+            cls._instances.clear()
     
     def __init__(self, port):
         self.port = port
-        self.in_use = False
-        self._serial = None
+        self.users = 0
+        self.settings = None
+        self._client = None
+        self._lock = threading.Lock()
+        # Serialises transactions from every client sharing this port
+        self.bus_lock = threading.RLock()
+    
+    @property
+    def in_use(self):
+        return self.users > 0
     
-    def acquire(self):
-        # Always release first to ensure clean state
-        self.release()
+    def acquire(self, settings):
+        """Get the open serial client for ``settings``.
         
-        try:
-            # First check if port exists
-            ports = [port.device for port in serial.tools.list_ports.comports()]
-            if self.port not in ports:
-                print(f"Port {self.port} not found")
-                return False
+        Reuses the current session when the line settings match and the port
+        is still open; otherwise the port is reopened with the new settings.
+        Timeout and retries do not count: each client applies its own to the
+        shared handle per request.
+        
+        Returns:
+            ModbusSerialClient, or None if the port could not be opened
+        """
+        line = {key: settings.get(key) for key in LINE_SETTINGS}
+        with self._lock:
+            if self._client is not None:
+                if line != self.settings or not self._client.is_socket_open():
+                    # Let a transaction in progress on the old handle finish
+                    with self.bus_lock:
+                        self._close_client()
             
-            # Try to close any existing connections on this port
-            try:
-                temp = serial.Serial(self.port)
-                temp.close()
-            except:
-                pass
-                
-            time.sleep(0.5)  # Wait longer for port to be released
+            if self._client is None:
+                client = ModbusSerialClient(port=self.port, **settings)
+                try:
+                    opened = client.connect()
+                except Exception as e:
+                    log.error("Cannot open port: %s", e, extra={'port': self.port})
+                    opened = False
+                if not opened:
+                    client.close()
+                    return None
+                self._client = client
+                self.settings = line
             
-            # Now try to acquire the port
-            self._serial = serial.Serial(self.port)
-            self._serial.close()
-            time.sleep(0.2)
-            self.in_use = True
-            return True
-        except Exception as e:
-            print(f"Port acquisition error: {e}")
-            self.release()
-            return False
+            self.users += 1
+            return self._client
+    
+    def release(self, close_if_unused=False):
+        """Drop one user; the port stays open for the next device"""
+        with self._lock:
+            self.users = max(0, self.users - 1)
+            if close_if_unused and not self.users:
+                self._close()
+    
+    def close(self):
+        """Close the serial session"""
+        with self._lock:
+            self._close()
     
-    def release(self):
-        self.in_use = False  # Mark as not in use first
+    def _close(self):
+        self._close_client()
+        self.users = 0
+
+    def _close_client(self):
         try:
-            if self._serial:
-                self._serial.close()
-                self._serial = None
-            time.sleep(0.5)  # Wait longer after release
+            if self._client:
+                self._client.close()
         except:
             pass
+        self._client = None
+        self.settings = None
 
 class ModbusToolClient:
-    def __init__(self, mode='tcp', host='localhost', port=502, timeout=3, baudrate=9600, parity='N', bytesize=8, stopbits=1):
+    def __init__(self, mode='tcp', host='localhost', port=502, timeout=3, baudrate=9600, parity='N', bytesize=8, stopbits=1, retries=3, stats=None):
         self.port_manager = None
         self.port = port  # Store port separately
+        self.lock = threading.RLock()
+        self.stats = stats if stats is not None else transaction_stats
         """Initialize Modbus client.
         
         Args:
@@ -78,18 +339,27 @@ class ModbusToolClient:
             host (str): IP address for TCP mode
             port (int): Port number for TCP mode
             timeout (int): Connection timeout in seconds
+            retries (int): Retries on a missing response before giving up
+            stats (TransactionStats): Where transactions are counted,
+                defaults to the shared metrics.transaction_stats
         """
         self.mode = mode
+        self.timeout = timeout
+        self.retries = retries
+        # Client owning the connection; differs for with_timing() views
+        self.base = self
         if mode == 'tcp':
-            self.client = ModbusTcpClient(host=host, port=port, timeout=timeout)
+            self.client = ModbusTcpClient(host=host, port=port, timeout=timeout, retries=retries)
         elif mode == 'rtu':
-            self.client = ModbusSerialClient(
-                port=port,
+            # The serial client is shared through the port's session on connect
+            self.client = None
+            self.serial_settings = dict(
                 timeout=timeout,
                 baudrate=baudrate,
                 parity=parity,
                 bytesize=bytesize,
-                stopbits=stopbits
+                stopbits=stopbits,
+                retries=retries
             )
         else:
             raise ValueError("Mode must be 'tcp' or 'rtu'")
@@ -97,98 +367,245 @@ class ModbusToolClient:
     def connect(self):
         """Connect to the Modbus device."""
         if self.mode == 'rtu':
-            # Release any existing port managers for this port
-            PortManager.release_all()
-            time.sleep(0.5)  # Wait for cleanup
-            
-            # Try to acquire the port
+            # Reuse the open session on this port when the settings match
+            if self.port_manager:
+                self.port_manager.release()
             self.port_manager = PortManager.get_instance(self.port)
-            if not self.port_manager.acquire():
-                return False
+            self.lock = self.port_manager.bus_lock
+            self.client = self.port_manager.acquire(self.serial_settings)
+            return self.client is not None
             
         return self.client.connect()
 
+    def is_connected(self):
+        """Check whether the underlying transport is still open."""
+        if self.client is None:
+            return False
+        if self.mode == 'rtu' and not self.port_manager:
+            return False
+        try:
+            return self.client.is_socket_open()
+        except Exception:
+            return False
+
     def disconnect(self):
         """Disconnect from the Modbus device."""
+        if self.mode == 'rtu':
+            # Leave the port open for the next device on the bus
+            if self.port_manager:
+                self.port_manager.release()
+                self.port_manager = None
+            return
+            
         try:
-            if hasattr(self.client, 'socket') and self.client.socket:
-                self.client.socket.close()
-            if hasattr(self.client, 'serial') and self.client.serial:
-                if self.client.serial.is_open:
-                    self.client.serial.close()
             self.client.close()
         except:
             pass  # Ensure we don't throw errors during cleanup
-        finally:
-            # Release all port managers to ensure clean state
-            PortManager.release_all()
+
+    def close(self):
+        """Disconnect and close the serial port if no other client uses it."""
+        if self.mode == 'rtu' and self.port_manager:
+            self.port_manager.release(close_if_unused=True)
             self.port_manager = None
-            time.sleep(0.5)  # Wait for cleanup
+            return
+        self.disconnect()
 
-    def read_coils(self, address, count, unit=1):
-        """Read coils (function code 01)."""
+    def with_timing(self, timeout=3, retries=3):
+        """Client sharing this one's connection with its own timeout and retries.
+
+        Scans, polling and writes borrow the same pooled connection but wait
+        for replies differently; the view applies its timing per request.
+        """
+        if (timeout, retries) == (self.timeout, self.retries):
+            return self
+        view = copy.copy(self)
+        view.timeout = timeout
+        view.retries = retries
+        return view
+
+    def _apply_timing(self):
+        """Put this client's timeout and retries on the shared handle"""
+        client = self.client
+        if client.comm_params.timeout_connect != self.timeout:
+            client.comm_params.timeout_connect = self.timeout
+            if self.mode == 'rtu' and client.socket:
+                client.socket.timeout = self.timeout
+        client.transaction.retries = self.retries
+
+    def request(self, function_code, unit, method, **kwargs):
+        """Run one request on the bus and record its latency and outcome.
+
+        Returns:
+            The response, exception responses included; raises when the
+            device did not answer, GarbledReplyError if bytes arrived but
+            did not make a valid reply
+        """
+        with self.lock:
+            transaction = Transaction(self.stats, unit, function_code, WireTap.attach(self.client))
+            try:
+                self._apply_timing()
+                result = getattr(self.client, method)(slave=unit, **kwargs)
+            except Exception as e:
+                if transaction.failed(e) == CRC:
+                    raise GarbledReplyError(str(e)) from e
+                raise
+            finally:
+                transaction.flush()
+            return transaction.done(result)
+
+    def read(self, function_code, address, count, unit=1):
+        """Read coils, discrete inputs or registers (function codes 1-4).
+
+        Returns:
+            list of values, or None if the read failed or was rejected
+        """
+        method, field, name = READ_REQUESTS[function_code]
+        extra = {'unit': unit, 'address': address, 'count': count}
         try:
-            result = self.client.read_coils(address=address, count=count, slave=unit)
-            if hasattr(result, 'bits'):
-                return result.bits
+            result = self.request(function_code, unit, method, address=address, count=count)
         except ModbusException as e:
-            print(f"Error reading coils: {e}")
-        return None
+            log.warning("%s failed: %s", name, e, extra=extra)
+            return None
+        # An exception response carries an empty value list, not a failure
+        if result.isError():
+            log.warning("%s rejected: %s", name, result, extra=extra)
+            return None
+        return getattr(result, field)
+
+    def read_coils(self, address, count, unit=1):
+        """Read coils (function code 01)."""
+        return self.read(1, address, count, unit)
 
     def read_discrete_inputs(self, address, count, unit=1):
         """Read discrete inputs (function code 02)."""
-        try:
-            result = self.client.read_discrete_inputs(address=address, count=count, slave=unit)
-            if hasattr(result, 'bits'):
-                return result.bits
-        except ModbusException as e:
-            print(f"Error reading discrete inputs: {e}")
-        return None
+        return self.read(2, address, count, unit)
 
     def read_holding_registers(self, address, count, unit=1):
         """Read holding registers (function code 03)."""
+        return self.read(3, address, count, unit)
+
+    def read_input_registers(self, address, count, unit=1):
+        """Read input registers (function code 04)."""
+        return self.read(4, address, count, unit)
+
+    def read_device_identification(self, unit=1, read_code=DEVICE_ID_REGULAR):
+        """Read Device Identification (function code 43, MEI type 14).
+
+        Returns:
+            The response, an exception response if the device rejected the
+            request, or None if it did not answer. A garbled or truncated
+            reply raises GarbledReplyError.
+        """
         try:
-            result = self.client.read_holding_registers(address=address, count=count, slave=unit)
-            if hasattr(result, 'registers'):
-                return result.registers
+            return self.request(43, unit, 'read_device_information', read_code=read_code)
+        except GarbledReplyError:
+            raise
         except ModbusException as e:
-            print(f"Error reading holding registers: {e}")
+            log.debug("Read device identification failed: %s", e, extra={'unit': unit})
         return None
 
-    def read_input_registers(self, address, count, unit=1):
-        """Read input registers (function code 04)."""
+    def report_server_id(self, unit=1):
+        """Report Server ID (function code 17).
+
+        Returns:
+            The response, an exception response if the device rejected the
+            request, or None if it did not answer. A garbled or truncated
+            reply raises GarbledReplyError.
+        """
         try:
-            result = self.client.read_input_registers(address=address, count=count, slave=unit)
-            if hasattr(result, 'registers'):
-                return result.registers
+            return self.request(17, unit, 'report_slave_id')
+        except GarbledReplyError:
+            raise
         except ModbusException as e:
-            print(f"Error reading input registers: {e}")
+            log.debug("Report server ID failed: %s", e, extra={'unit': unit})
         return None
 
+    def read_block(self, block, unit=1):
+        """Read a planned ReadBlock; returns the values or None."""
+        values = self.read(block.function_code, block.address, block.count, unit)
+        if values is None:
+            return None
+        # Bit reads are padded to a whole byte
+        return values[:block.count]
 
-        
-    def write_register(self, address, value, unit=1):
-        """Write to a single holding register."""
+    def read_addresses(self, wanted, unit=1, max_gap=0):
+        """Read scattered addresses with the minimum number of requests.
+
+        Args:
+            wanted (dict): Function code -> iterable of 0-based addresses
+            unit (int): Slave address
+            max_gap (int): Gap tolerance passed to plan_reads
+
+        Returns:
+            dict mapping (function_code, address) to value. Addresses in a
+            block that failed to read are left out.
+        """
+        results = {}
+        for block in plan_poll(wanted, max_gap):
+            values = self.read_block(block, unit)
+            if values is not None:
+                store_block(results, block, values)
+        return results
+
+    def write(self, function_code, address, value, unit=1):
+        """Write coils or holding registers (function codes 5, 6, 15, 16).
+
+        Args:
+            value: The value for FC05/FC06, a list of values for FC15/FC16
+
+        Returns:
+            True if the device accepted the write
+        """
+        method, argument, name = WRITE_REQUESTS[function_code]
+        extra = {'unit': unit, 'address': address}
+        if argument == 'values':
+            extra['count'] = len(value)
         try:
-            print(f"Writing to register - Address: {address}, Value: {value}, Unit: {unit}")
-            result = self.client.write_register(address=address, value=value, slave=unit)
+            log.debug(name, extra=dict(extra, value=value))
+            result = self.request(function_code, unit, method, address=address, **{argument: value})
             if result.isError():
-                print(f"Error writing to register: {result}")
+                log.warning("%s rejected: %s", name, result, extra=extra)
                 return False
             return True
         except Exception as e:
-            print(f"Exception writing to register: {e}")
+            log.warning("%s failed: %s", name, e, extra=extra)
             return False
-        
+
+    def write_register(self, address, value, unit=1):
+        """Write to a single holding register."""
+        return self.write(6, address, value, unit)
+
     def write_coil(self, address, value, unit=1):
         """Write to a single coil."""
-        try:
-            print(f"Writing to coil - Address: {address}, Value: {value}, Unit: {unit}")
-            result = self.client.write_coil(address=address, value=value, slave=unit)
-            if result.isError():
-                print(f"Error writing to coil {address}: {result}")
-                return False
-            return True
-        except ModbusException as e:
-            print(f"Error writing to coil: {e}")
-            return False
+        return self.write(5, address, value, unit)
+
+    def write_registers(self, address, values, unit=1):
+        """Write a block of holding registers (function code 16)."""
+        return self.write(16, address, values, unit)
+
+    def write_coils(self, address, values, unit=1):
+        """Write a block of coils (function code 15)."""
+        return self.write(15, address, values, unit)
+
+    def write_values(self, function_code, values, unit=1, verify=False):
+        """Write pending values in as few transactions as possible.
+
+        Args:
+            function_code (int): 15 (coils) or 16 (holding registers)
+            values (dict): 0-based address -> value
+            unit (int): Slave address
+            verify (bool): Read the written values back in batched reads
+
+        Returns:
+            sorted list of addresses that failed to write or verify
+        """
+        failed = []
+        for block in write_requests(values, function_code):
+            if not self.write(block.function_code, block.address, write_value(block), unit):
+                failed.extend(range(block.address, block.address + len(block.values)))
+
+        if verify:
+            written = {addr: value for addr, value in values.items() if addr not in failed}
+            read = self.read_addresses({READBACK_CODES[function_code]: written}, unit)
+            failed.extend(write_mismatches(function_code, written, read))
+        return sorted(failed)
@@ -0,0 +1,106 @@
+"""Report-by-exception: pass on only values that moved past a deadband.
+
+A ChangeFilter sits between a poller and its consumers (table, graph,
+recorder, CLI output). Most registers on a quiet plant hold the same value
+poll after poll, so consumers that only see changes do a fraction of the
+work. A forced refresh re-sends every value now and then so a consumer that
+starts late, or a reader of the recorded data, still sees steady values.
+"""
+import threading
+from collections import namedtuple
+
+Deadband = namedtuple('Deadband', ['absolute', 'percent'])
+
+# Any change at all is reported
+NO_DEADBAND = Deadband(0.0, 0.0)
+
+
+class ChangeFilter:
+    """Per-key deadband filter with a forced refresh interval.
+
+    A value is passed on when its key has not been reported yet, when it
+    differs from the last reported value by more than the key's deadband, or
+    when the last report is older than ``refresh`` seconds. The deadband is
+    the larger of the absolute band and ``percent`` of the last reported
+    value's magnitude. Keys are whatever the caller uses to name a value,
+    e.g. (function_code, address) or a tag name.
+    """
+
+    def __init__(self, absolute=0.0, percent=0.0, refresh=None):
+        """Create a filter.
+
+        Args:
+            absolute (float): Default absolute deadband
+            percent (float): Default deadband in percent of the last value
+            refresh (float): Seconds after which an unchanged value is sent
+                again, or None to never resend
+        """
+        self.default = Deadband(float(absolute), float(percent))
+        self.refresh = refresh
+        self._deadbands = {}
+        self._last = {}
+        self._lock = threading.Lock()
+        self.received = 0
+        self.passed = 0
+
+    def set_deadband(self, key, absolute=0.0, percent=0.0):
+        """Give one key its own deadband instead of the default"""
+        self._deadbands[key] = Deadband(float(absolute), float(percent))
+
+    def clear_deadband(self, key):
+        self._deadbands.pop(key, None)
+
+    def deadband(self, key):
+        return self._deadbands.get(key, self.default)
+
+    def filter(self, timestamp, values):
+        """Keep the values that should be reported.
+
+        Args:
+            timestamp (float): Time of the read the values came from
+            values (dict): key -> value
+
+        Returns:
+            dict holding only the reported keys, possibly empty
+        """
+        changed = {}
+        deadbands = self._deadbands
+        default = self.default
+        refresh = self.refresh
+        with self._lock:
+            last = self._last
+            for key, value in values.items():
+                previous = last.get(key)
+                if previous is not None:
+                    last_value, last_time = previous
+                    band = deadbands.get(key, default)
+                    limit = max(band.absolute, band.percent / 100.0 * abs(last_value))
+                    fresh = refresh is None or timestamp - last_time < refresh
+                    if fresh and abs(value - last_value) <= limit:
+                        continue
+                last[key] = (value, timestamp)
+                changed[key] = value
+            self.received += len(values)
+            self.passed += len(changed)
+        return changed
+
+    def forget(self, keys):
+        """Drop the last reported values so the keys' next values pass"""
+        with self._lock:
+            for key in keys:
+                self._last.pop(key, None)
+
+    def reset(self):
+        """Forget every reported value; deadbands are kept"""
+        with self._lock:
+            self._last.clear()
+            self.received = 0
+            self.passed = 0
+
+    def stats(self):
+        """Values received and passed on since the last reset"""
+        return {
+            'received': self.received,
+            'passed': self.passed,
+            'suppressed': self.received - self.passed,
+        }
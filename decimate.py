@@ -0,0 +1,37 @@
+import numpy as np
+
+
+def minmax_decimate(x, y, buckets):
+    """Downsample a line to the min and max of each bucket.
+
+    Keeping both extremes per bucket preserves spikes that plain striding
+    would drop, while the point count is bounded by the canvas width.
+
+    Args:
+        x (ndarray): Sample positions, ascending
+        y (ndarray): Sample values
+        buckets (int): Number of buckets, usually the plot width in pixels
+
+    Returns:
+        (x, y) with at most ``2 * buckets + 1`` points, in order
+    """
+    n = len(y)
+    if buckets < 1 or n <= 2 * buckets:
+        return x, y
+
+    # Pad the last bucket with the newest value so every sample is covered
+    size = -(-n // buckets)
+    padded = np.concatenate([y, np.repeat(y[-1:], size * buckets - n)])
+    blocks = padded.reshape(buckets, size)
+    offsets = np.arange(buckets) * size
+    lows = np.minimum(blocks.argmin(axis=1) + offsets, n - 1)
+    highs = np.minimum(blocks.argmax(axis=1) + offsets, n - 1)
+
+    # Interleave each bucket's extremes in time order and keep the newest sample
+    first = np.minimum(lows, highs)
+    second = np.maximum(lows, highs)
+    index = np.empty(2 * buckets + 1, dtype=np.intp)
+    index[0:-1:2] = first
+    index[1:-1:2] = second
+    index[-1] = n - 1
+    return x[index], y[index]
@@ -0,0 +1,96 @@
+import json
+import os
+import threading
+import time
+
+# Serial settings stored with each device
+LINE_KEYS = ('baudrate', 'parity', 'bytesize', 'stopbits')
+
+
+class DeviceCache:
+    """Devices found by earlier scans, kept in a JSON file between sessions.
+
+    Entries are keyed by port and unit ID and hold the identity reported by
+    the device (vendor, model, ...), the serial settings it answered on and
+    when it was last seen, so start-up only has to re-verify known devices
+    instead of scanning the whole address range.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._devices = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(port, unit):
+        return f"{port}:{unit}"
+
+    def load(self):
+        """Read the cache file; a missing or unreadable file gives an empty cache"""
+        try:
+            with open(self.path, 'r') as f:
+                devices = json.load(f).get('devices', [])
+        except (OSError, ValueError, AttributeError):
+            devices = []
+        with self._lock:
+            self._devices = {
+                self.key(entry['port'], entry['unit']): entry
+                for entry in devices if 'port' in entry and 'unit' in entry
+            }
+        return len(self._devices)
+
+    def save(self):
+        """Write the cache, replacing the old file only once it is complete"""
+        with self._lock:
+            devices = sorted(self._devices.values(), key=lambda e: (e['port'], e['unit']))
+        temp = f"{self.path}.tmp"
+        with open(temp, 'w') as f:
+            json.dump({'devices': devices}, f, indent=2)
+        os.replace(temp, self.path)
+
+    def update(self, port, line, unit, identity):
+        """Record that a device answered.
+
+        Args:
+            port (str): Serial port or host
+            line (dict): Serial settings the device answered on
+            unit (int): Slave address
+            identity (dict): Fields from scanner.identify_unit; an empty dict
+                keeps the identity already known
+
+        Returns:
+            The stored entry
+        """
+        with self._lock:
+            key = self.key(port, unit)
+            entry = dict(self._devices.get(key, {}))
+            entry.update(identity)
+            entry.update({k: line[k] for k in LINE_KEYS if k in line})
+            entry.update(port=port, unit=unit, last_seen=time.time())
+            self._devices[key] = entry
+            return entry
+
+    def get(self, port, unit):
+        return self._devices.get(self.key(port, unit))
+
+    def remove(self, port, unit):
+        with self._lock:
+            self._devices.pop(self.key(port, unit), None)
+
+    def known(self, port, line=None):
+        """Entries for a port, by unit; with ``line``, only those seen on it"""
+        with self._lock:
+            entries = [e for e in self._devices.values() if e['port'] == port]
+        if line:
+            entries = [e for e in entries if all(e.get(k, line[k]) == line[k] for k in LINE_KEYS if k in line)]
+        return sorted(entries, key=lambda e: e['unit'])
+
+
+def describe(entry):
+    """Short device description for lists, e.g. ``Acme PM5560``"""
+    if not entry:
+        return ''
+    name = ' '.join(entry[k] for k in ('vendor', 'model') if entry.get(k))
+    if not name:
+        name = ' '.join(entry[k] for k in ('vendor', 'product_code') if entry.get(k))
+    return name or entry.get('server_id', '')
@@ -0,0 +1,122 @@
+import logging
+import logging.handlers
+import queue
+import sys
+
+# Parent of every logger in the tool
+ROOT_LOGGER = 'modbus_tool'
+
+LOG_FORMAT = '%(asctime)s.%(msecs)03d %(levelname)-7s %(name)s %(message)s'
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Rotation: five files of 5 MB each
+MAX_BYTES = 5 * 1024 * 1024
+BACKUP_COUNT = 5
+
+# LogRecord attributes that are not structured fields passed through extra=
+_RECORD_FIELDS = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+_listener = None
+_log_path = None
+
+
+def get_logger(name):
+    """Logger under the tool's root, e.g. get_logger('client')"""
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+class StructuredFormatter(logging.Formatter):
+    """Appends fields given through ``extra=`` as key=value pairs"""
+
+    def format(self, record):
+        line = super().format(record)
+        fields = {k: v for k, v in vars(record).items() if k not in _RECORD_FIELDS}
+        if fields:
+            line += ' ' + ' '.join(f"{k}={v}" for k, v in fields.items())
+        return line
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Queues records unformatted so formatting happens on the listener thread.
+
+    The stock QueueHandler formats in the caller; callers here only pass
+    immutable arguments, so the record can be handed over as it is.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+def start_logging(path=None, level=logging.INFO, console=True):
+    """Route the tool's loggers through a queue to a background writer.
+
+    Args:
+        path (str): Rotating log file, or None for no file
+        level (int): Minimum level recorded
+        console (bool): Also write to stderr
+
+    Returns:
+        The started QueueListener
+    """
+    global _listener, _log_path
+    stop_logging()
+    _log_path = path
+
+    formatter = StructuredFormatter(LOG_FORMAT, DATE_FORMAT)
+    handlers = []
+    if path:
+        file_handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=MAX_BYTES, backupCount=BACKUP_COUNT, encoding='utf-8'
+        )
+        handlers.append(file_handler)
+    if console:
+        handlers.append(logging.StreamHandler(sys.stderr))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    records = queue.SimpleQueue()
+    logger = logging.getLogger(ROOT_LOGGER)
+    logger.handlers = [_DeferredQueueHandler(records)]
+    logger.setLevel(level)
+    logger.propagate = False
+
+    _listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def stop_logging():
+    """Write out queued records and close the log file"""
+    global _listener
+    if _listener is None:
+        return
+    logger = logging.getLogger(ROOT_LOGGER)
+    logger.handlers = []
+    logger.propagate = True
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
+
+
+def export_log(dest):
+    """Copy the current log and its rotated backups, oldest first, to ``dest``.
+
+    Returns:
+        False if file logging is not enabled
+    """
+    if not _log_path:
+        return False
+    # Everything queued so far should be in the file before copying
+    if _listener is not None:
+        _listener.stop()
+        _listener.start()
+    files = [f"{_log_path}.{n}" for n in range(BACKUP_COUNT, 0, -1)] + [_log_path]
+    with open(dest, 'wb') as out:
+        for name in files:
+            try:
+                with open(name, 'rb') as f:
+                    out.write(f.read())
+            except FileNotFoundError:
+                continue
+    return True
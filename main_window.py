@@ -1,19 +1,59 @@
+import time
+
+# Start of module load, for the time-to-first-window measurement
+STARTUP_BEGIN = time.perf_counter()
+
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog, simpledialog
 import serial.tools.list_ports
 import json
 import os
-from matplotlib.figure import Figure
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from collections import defaultdict
-import time
+import sys
 import threading
-from client import ModbusToolClient
+from client import PortManager, FUNCTION_CODES
+from pool import pool
+from poller import PollWorker, PollResult
+from scanner import scan_rtu
+from series import TimeSeriesStore
+from stats_window import StatsWindow
+from capture_window import CaptureWindow
+from register_table import RegisterTable, item_address
+from deadband import ChangeFilter
+from device_cache import DeviceCache, describe
+from metrics import transaction_stats
+from logs import get_logger, start_logging, stop_logging, export_log
 from time import sleep
 from datetime import datetime
-import matplotlib.dates as mdates
 import serial
 
+# matplotlib, numpy and the recorder/replay modules are imported on first
+# use; together they took most of the startup time
+
+IMPORTS_DONE = time.perf_counter()
+
+log = get_logger('main_window')
+
+# Startup budget from module load to the first drawn window, in seconds
+FIRST_WINDOW_TARGET = 1.0
+
+# Seconds of headroom added when the graph x-axis scrolls
+GRAPH_X_STEP = 60
+
+# Largest register map the table can browse
+MAX_REGISTERS = 65536
+
+# Milliseconds between refreshes of the bus statistics summary
+BUS_STATS_INTERVAL = 1000
+
+# Poll worker groups: the visible page and the graphed registers are read
+# at their own rates
+VIEW_GROUP = 'view'
+GRAPH_GROUP = 'graph'
+
+# Seconds after which unchanged values are passed to the table, graph and
+# recorder again
+FORCED_REFRESH = 10.0
+
 class CommSetupDialog(tk.Toplevel):
     def __init__(self, parent):
         super().__init__(parent)
@@ -125,16 +165,20 @@ class MainWindow(tk.Tk):
         self.scanning = False
         self.scan_thread = None
         self.value_entry = None
-        self.modified_values = set()
+        self.modified_values = {}
         self.connected_device = None
         self.modbus_client = None
+        self.poll_worker = None
+        self.poll_results_job = None
         
         # Graph data storage
-        self.graph_data = defaultdict(lambda: {'times': [], 'values': []})
+        self.MAX_TIME_WINDOW = 15 * 60  # 15 minutes in seconds
+        self.MAX_HISTORY = 4 * 60 * 60  # 4 hours in seconds
+        self.MAX_HISTORY_POINTS = 36000  # 4 hours at a 400 ms interval
+        self.graph_data = TimeSeriesStore(capacity=self.MAX_HISTORY_POINTS, max_age=self.MAX_HISTORY)
         self.selected_for_graph = set()
         self.graph_window = None
         self.graph_update_job = None
-        self.MAX_TIME_WINDOW = 15 * 60  # 15 minutes in seconds
         self.graph_start_time = None
         
         # Style configuration
@@ -233,6 +277,14 @@ class MainWindow(tk.Tk):
         self.stop_scan_btn = ttk.Button(button_frame, text="Stop Scan", command=self.stop_scan, state=tk.DISABLED)
         self.stop_scan_btn.pack(side=tk.LEFT)
         
+        # Optional second pass over addresses that did not answer
+        self.confirm_misses_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            self.discovery_frame,
+            text="Confirm misses",
+            variable=self.confirm_misses_var
+        ).pack(anchor=tk.W, pady=(5, 0))
+        
         # Progress bar frame
         self.progress_frame = ttk.Frame(self.discovery_frame)
         self.progress_frame.pack(fill=tk.X, pady=(10, 0))
@@ -245,13 +297,30 @@ class MainWindow(tk.Tk):
         self.status_label = ttk.Label(self.progress_frame, text="")
         self.status_label.pack(fill=tk.X)
         
+        # Transaction summary; Stats opens the per-unit breakdown
+        bus_stats_frame = ttk.Frame(self.progress_frame)
+        bus_stats_frame.pack(fill=tk.X, pady=(5, 0))
+        self.bus_stats_label = ttk.Label(bus_stats_frame, text="")
+        self.bus_stats_label.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        ttk.Button(bus_stats_frame, text="Log", width=5, command=self.export_log).pack(side=tk.RIGHT)
+        ttk.Button(bus_stats_frame, text="Frames", width=7, command=self.show_capture).pack(side=tk.RIGHT)
+        ttk.Button(bus_stats_frame, text="Stats", width=6, command=self.show_stats).pack(side=tk.RIGHT)
+        
+        # Achieved start jitter of each live poll rate
+        self.poll_stats_label = ttk.Label(self.progress_frame, text="")
+        self.poll_stats_label.pack(fill=tk.X)
+        
         # Device list
         ttk.Label(self.discovery_frame, text="Discovered Devices:").pack(anchor=tk.W, pady=(10, 5))
-        self.device_list = ttk.Treeview(self.discovery_frame, columns=("address", "status"), show="headings", height=6)
-        self.device_list.heading("address", text="Device Address")
+        self.device_list = ttk.Treeview(
+            self.discovery_frame, columns=("address", "status", "device"), show="headings", height=6
+        )
+        self.device_list.heading("address", text="Address")
         self.device_list.heading("status", text="Status")
-        self.device_list.column("address", width=100)
-        self.device_list.column("status", width=100)
+        self.device_list.heading("device", text="Device")
+        self.device_list.column("address", width=60)
+        self.device_list.column("status", width=80)
+        self.device_list.column("device", width=140)
         self.device_list.pack(fill=tk.X)
         
         # Bind double-click event for connection
@@ -284,6 +353,19 @@ class MainWindow(tk.Tk):
                 command=self.read_registers
             ).pack(side=tk.LEFT, padx=8)
         
+        # Commit pending edits as batched FC15/FC16 writes
+        self.verify_writes_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            self.register_type_frame,
+            text="Verify",
+            variable=self.verify_writes_var
+        ).pack(side=tk.RIGHT, padx=8)
+        ttk.Button(
+            self.register_type_frame,
+            text="Write Pending",
+            command=self.write_pending_values
+        ).pack(side=tk.RIGHT)
+        
         # Register count and device info frame
         info_frame = ttk.Frame(self.registers_frame)
         info_frame.pack(fill=tk.X, pady=(0, 10))
@@ -322,49 +404,66 @@ class MainWindow(tk.Tk):
         self.polling_interval.insert(0, "1000")
         self.polling_interval.pack(side=tk.LEFT, padx=5)
         
+        # Graphed registers are read at their own rate
+        ttk.Label(info_frame, text="Graph (ms):").pack(side=tk.LEFT, padx=2)
+        self.graph_interval = ttk.Entry(info_frame, width=6)
+        self.graph_interval.insert(0, "500")
+        self.graph_interval.pack(side=tk.LEFT, padx=5)
+        
         # Graph button
         self.graph_button = ttk.Button(info_frame, text="Graph", command=self.show_graph, state=tk.DISABLED)
         self.graph_button.pack(side=tk.LEFT, padx=5)
         
-        # Initialize polling variables
-        self.polling_job = None
+        # Record live polls to disk and replay earlier captures
+        self.record_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(info_frame, text="Record", variable=self.record_var).pack(side=tk.LEFT, padx=5)
+        ttk.Button(info_frame, text="Replay", command=self.show_replay).pack(side=tk.LEFT, padx=5)
+        self.recorder = None
         
-        # Register values display
-        self.register_display = ttk.Treeview(
-            self.registers_frame,
-            columns=("address", "value", "new_value", "graph"),
-            show="headings",
-            height=20
+        # Typed register map decoding raw registers into engineering values
+        ttk.Button(info_frame, text="Map", command=self.load_register_map).pack(side=tk.LEFT, padx=5)
+        self.register_map = None
+        
+        # Register values display; it shows the pending edits and graph marks
+        self.register_table = RegisterTable(
+            self.registers_frame, self.modified_values, self.selected_for_graph, self.on_table_view_change
         )
-        self.register_display.heading("address", text="Address")
-        self.register_display.heading("value", text="Value")
-        self.register_display.heading("new_value", text="New Value")
-        self.register_display.heading("graph", text="Plot")
-        self.register_display.column("address", width=100)
-        self.register_display.column("value", width=100)
-        self.register_display.column("new_value", width=100)
-        self.register_display.column("graph", width=60)
-        
-        # Configure tag for checkbox column
-        self.register_display.tag_configure('checkbox_cell', background='#f0f0f0')
-        self.register_display.pack(fill=tk.BOTH, expand=True)
+        self.register_table.pack(fill=tk.BOTH, expand=True)
+        rows = self.register_table.tree
         
         # Bind checkbox click
-        self.register_display.bind('<ButtonRelease-1>', self.handle_checkbox_click)
+        rows.bind('<ButtonRelease-1>', self.handle_checkbox_click)
         
         # Bind double-click to create entry widget
-        self.register_display.bind('<Double-1>', self.create_value_entry)
+        rows.bind('<Double-1>', self.create_value_entry)
+        
+        # Right-click sets a register's deadband
+        rows.bind('<Button-3>', self.set_register_deadband)
+        self.displayed_type = None
         
         # Store entry widget reference
         self.value_entry = None
         
-        # Store modified values
-        self.modified_values = set()
+        # Only values that left their deadband reach the table, graph and
+        # recorder; keys are (unit, function code, address)
+        self.change_filter = ChangeFilter(refresh=FORCED_REFRESH)
+        
+        # Close the serial session when the window closes
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        
+        self.update_bus_stats()
+        
+        # Devices found in earlier sessions
+        cache_dir = os.path.dirname(os.path.abspath(__file__))
+        self.device_cache = DeviceCache(os.path.join(cache_dir, 'device_cache.json'))
+        self.device_cache.load()
         
         # Load last configuration
         self.config = self.load_configuration()
         if self.config:
             self.update_config_display(self.config)
+            # Re-verify the known devices instead of scanning the whole range
+            self.after(0, self.verify_known_devices)
 
     def show_comm_setup(self):
         dialog = CommSetupDialog(self)
@@ -431,19 +530,61 @@ class MainWindow(tk.Tk):
         for item in self.device_list.get_children():
             self.device_list.delete(item)
             
+        self.begin_scan(range(start, end + 1), self.confirm_misses_var.get())
+        
+    def verify_known_devices(self):
+        """List the cached devices for the configured line and check they still answer"""
+        if self.scanning or not self.config:
+            return
+        known = self.device_cache.known(self.config['port'], self.serial_line())
+        if not known:
+            return
+        for entry in known:
+            self.show_device(entry['unit'], "Cached", entry)
+        self.begin_scan([entry['unit'] for entry in known], verify=True)
+        
+    def begin_scan(self, units, confirm_misses=False, verify=False):
+        """Start probing the given addresses on the scan thread"""
         # Reset progress bar and status
         self.progress_var.set(0)
-        self.status_label.config(text="Initializing scan...")
+        self.status_label.config(text="Verifying known devices..." if verify else "Initializing scan...")
         
         self.scanning = True
         self.start_scan_btn.config(state=tk.DISABLED)
         self.stop_scan_btn.config(state=tk.NORMAL)
         
         # Start scanning thread
-        self.scan_thread = threading.Thread(target=self.scan_worker, args=(start, end))
+        self.scan_thread = threading.Thread(target=self.scan_worker, args=(list(units), confirm_misses, verify))
         self.scan_thread.daemon = True
         self.scan_thread.start()
         
+    def show_device(self, unit, status, entry=None):
+        """Add or update a row of the device list"""
+        item = f"dev_{unit}"
+        if self.device_list.exists(item):
+            self.device_list.set(item, "status", status)
+            if entry is not None:
+                self.device_list.set(item, "device", describe(entry))
+        else:
+            self.device_list.insert("", tk.END, item, values=(unit, status, describe(entry)))
+            
+    def on_device_found(self, unit, identity):
+        """Record a device that answered a probe; called from the scan thread"""
+        entry = self.device_cache.update(self.config['port'], self.serial_line(), unit, identity)
+        status = "Connected" if unit == self.connected_device else "Available"
+        self.after(0, lambda: self.show_device(unit, status, entry))
+        
+    def serial_line(self):
+        """Serial settings of the configured line"""
+        # Convert parity from text to single letter
+        parity_map = {'none': 'N', 'even': 'E', 'odd': 'O'}
+        return dict(
+            baudrate=int(self.config['baudrate']),
+            parity=parity_map.get(self.config['parity'].lower(), 'N'),
+            bytesize=int(self.config['bytesize']),
+            stopbits=int(self.config['stopbits'])
+        )
+        
     def stop_scan(self):
         """Stop the device discovery scan"""
         self.scanning = False
@@ -455,81 +596,52 @@ class MainWindow(tk.Tk):
         if self.scan_thread and self.scan_thread.is_alive():
             self.scan_thread.join(timeout=1.0)
         
-    def scan_worker(self, start_addr, end_addr):
+    def scan_worker(self, units, confirm_misses=False, verify=False):
         """Worker function for device scanning"""
-        client = None
         try:
             # Ensure any previous client is properly disconnected
-            if hasattr(self, 'modbus_client') and self.modbus_client:
-                self.modbus_client.disconnect()
-                self.modbus_client = None
-                sleep(1.0)  # Give extra time for port cleanup
-            
-            # Convert parity from text to single letter
-            parity_map = {'none': 'N', 'even': 'E', 'odd': 'O'}
-            parity = parity_map.get(self.config['parity'].lower(), 'N')
+            # Tk calls have to run on the main thread
+            if self.modbus_client:
+                self.after(0, self.disconnect_device)
             
-            # Create Modbus client
-            client = ModbusToolClient(
-                mode='rtu',
-                port=self.config['port'],
-                baudrate=int(self.config['baudrate']),
-                parity=parity_map[self.config['parity'].lower()],
-                bytesize=int(self.config['bytesize']),
-                stopbits=int(self.config['stopbits']),
-                timeout=0.05
+            found = scan_rtu(
+                self.config['port'],
+                self.serial_line(),
+                units,
+                confirm_misses=confirm_misses,
+                on_found=self.on_device_found,
+                on_progress=self.on_scan_progress,
+                should_stop=lambda: not self.scanning
             )
+            self.device_cache.save()
             
-            # Try to connect multiple times
-            max_retries = 3
-            for retry in range(max_retries):
-                if client.connect():
-                    break
-                sleep(1.0)  # Wait between retries
-                if retry == max_retries - 1:
-                    raise Exception("Failed to connect to COM port after multiple attempts")
-            
-            total_devices = end_addr - start_addr + 1
-            devices_scanned = 0
-            timeout = 0.05  # Reduced timeout for faster scanning
-            
-            for addr in range(start_addr, end_addr + 1):
-                if not self.scanning:
-                    break
-                
-                # Update progress
-                devices_scanned += 1
-                progress = (devices_scanned / total_devices) * 100
-                self.after(0, lambda p=progress: self.progress_var.set(p))
-                self.after(0, lambda a=addr: self.status_label.config(
-                    text=f"Scanning device {a} ({devices_scanned}/{total_devices})")
-                )
-                
-                # Try to read from device with shorter timeout
-                try:
-                    result = client.read_holding_registers(0, 1, unit=addr)
-                    if result is not None:
-                        self.after(0, lambda a=addr: self.device_list.insert("", tk.END, values=(a, "Available"), tags=()))
-                except:
-                    pass  # Skip errors for faster scanning
-                
-                sleep(timeout)  # Reduced delay between scans
-            
-            self.after(0, lambda: self.status_label.config(text="Scan complete"))
+            if verify:
+                missing = [unit for unit in units if unit not in found]
+                for unit in missing:
+                    self.after(0, lambda unit=unit: self.show_device(unit, "No response"))
+                message = f"{len(found)} of {len(units)} known devices answered"
+            else:
+                message = "Scan complete"
+            self.after(0, lambda: self.status_label.config(text=message))
             
         except Exception as e:
             error_msg = str(e)
             self.after(0, lambda: messagebox.showerror("Error", f"Scan error: {error_msg}"))
         finally:
-            # Ensure client is properly disconnected
-            if client:
-                try:
-                    client.disconnect()
-                    sleep(1.0)  # Give time for port cleanup
-                except:
-                    pass
             self.after(0, self.stop_scan)
             
+    def on_scan_progress(self, stage, addr, n, total):
+        """Show scan progress; called from the scan thread"""
+        if stage == 'scan':
+            self.after(0, lambda: self.progress_var.set(n / total * 100))
+            self.after(0, lambda: self.status_label.config(
+                text=f"Scanning device {addr} ({n}/{total})")
+            )
+        else:
+            self.after(0, lambda: self.status_label.config(
+                text=f"Confirming device {addr} ({n}/{total})")
+            )
+            
     def __del__(self):
         """Cleanup when the window is destroyed"""
         if hasattr(self, 'modbus_client') and self.modbus_client:
@@ -540,15 +652,15 @@ class MainWindow(tk.Tk):
     
     def clear_register_display(self):
         """Clear the register display"""
-        for item in self.register_display.get_children():
-            self.register_display.delete(item)
+        self.register_table.clear()
+        self.change_filter.reset()
         self.modified_values.clear()
         
     def create_value_entry(self, event):
         """Create an entry widget for editing values"""
         # Get the clicked item and column
-        item = self.register_display.identify_row(event.y)
-        column = self.register_display.identify_column(event.x)
+        item = self.register_table.tree.identify_row(event.y)
+        column = self.register_table.tree.identify_column(event.x)
         
         # Only create entry for new_value column
         if not item or column != '#3':
@@ -561,11 +673,11 @@ class MainWindow(tk.Tk):
             return
             
         # Get column box coordinates
-        x, y, w, h = self.register_display.bbox(item, 'new_value')
+        x, y, w, h = self.register_table.tree.bbox(item, 'new_value')
         
         # Create and position entry widget
-        entry = ttk.Entry(self.register_display, width=15)
-        current_value = self.register_display.set(item, 'new_value')
+        entry = ttk.Entry(self.register_table.tree, width=15)
+        current_value = self.register_table.tree.set(item, 'new_value')
         entry.insert(0, current_value)
         entry.select_range(0, tk.END)
         
@@ -582,56 +694,82 @@ class MainWindow(tk.Tk):
         entry.bind('<FocusOut>', lambda e: self.cancel_edit())
         
     def save_value(self, item):
-        """Save the edited value and write to register"""
-        if not self.value_entry or not self.modbus_client or not self.connected_device:
-            print("Cannot write: No entry widget, client, or device connected")
+        """Stage the edited value; Write Pending sends all staged values"""
+        if not self.value_entry or not self.poll_worker or not self.connected_device:
+            log.warning("Cannot write: no entry widget, client or device connected")
             self.cancel_edit()
             return
             
         try:
             # Get the new value
             new_value = int(self.value_entry.get())
-            address = int(self.register_display.set(item, 'address'))
             reg_type = self.register_type.get()
-            print(f"Writing to {reg_type} register {address} (0-based: {address-1}), value: {new_value}")
             
             # Only allow writes to coils and holding registers
-            if reg_type not in ['holding', 'coil']:
-                print(f"Cannot write to {reg_type} registers")
+            if reg_type not in ['holding', 'coils']:
+                log.warning("Cannot write to %s registers", reg_type)
                 messagebox.showerror("Error", f"Cannot write to {reg_type} registers")
-                self.cancel_edit()
                 return
+            if reg_type == 'coils' and new_value not in (0, 1):
+                raise ValueError("Coil values must be 0 or 1")
+            if reg_type == 'holding' and not 0 <= new_value <= 0xFFFF:
+                raise ValueError("Register values must be between 0-65535")
             
-            # Write value based on register type
-            success = False
-            unit = self.connected_device  # Get the connected device unit ID
-            if reg_type == 'holding':
-                print(f"Writing {new_value} to holding register {address} on unit {unit}")
-                success = self.modbus_client.write_register(address-1, new_value, unit=unit)
-            elif reg_type == 'coil':
-                print(f"Writing {bool(new_value)} to coil {address} on unit {unit}")
-                success = self.modbus_client.write_coil(address-1, bool(new_value), unit=unit)
-                
-            print(f"Write {'successful' if success else 'failed'}")
-            
-            if success:
-                # Update display
-                self.register_display.set(item, 'value', str(new_value))  # Update original value
-                self.register_display.set(item, 'new_value', str(new_value))  # Update new value
-                # Clear modified state since value is now written
-                self.modified_values.discard(item)
-                self.register_display.item(item, tags=())
-            else:
-                messagebox.showerror("Error", "Failed to write value to register")
+            # Mark the row as modified until the value is written
+            self.modified_values[item] = new_value
+            self.register_table.tree.set(item, 'new_value', str(new_value))
+            self.register_table.tree.item(item, tags=('modified',))
         except ValueError as e:
-            print(f"Value error: {e}")
+            log.info("Rejected value: %s", e)
             messagebox.showerror("Error", "Invalid value entered")
-        except Exception as e:
-            print(f"Error writing value: {e}")
-            messagebox.showerror("Error", f"Error writing value: {e}")
         finally:
             self.cancel_edit()
             
+    def write_pending_values(self):
+        """Write every staged edit in as few transactions as possible"""
+        if not self.modified_values:
+            return
+        if not self.poll_worker or not self.connected_device:
+            messagebox.showerror("Error", "Please connect to a device first")
+            return
+            
+        reg_type = self.register_type.get()
+        function_code = 16 if reg_type == 'holding' else 15
+        values = {item_address(item): value for item, value in self.modified_values.items()}
+        log.info("Writing %d %s values", len(values), reg_type, extra={'unit': self.connected_device})
+        self.poll_worker.submit(
+            self.modbus_client.write_values, function_code, values,
+            self.connected_device, self.verify_writes_var.get(),
+            callback=lambda failed, error, t=reg_type, v=values: self.on_values_written(t, v, failed, error)
+        )
+            
+    def on_values_written(self, reg_type, values, failed, error):
+        """Handle the outcome of a batched write submitted to the poll worker"""
+        if error:
+            log.error("Error writing values: %s", error)
+            messagebox.showerror("Error", f"Error writing values: {error}")
+            return
+        if reg_type != self.register_type.get():
+            return
+            
+        failed = set(failed)
+        for index, value in values.items():
+            if index in failed:
+                continue
+            item = f"reg_{index}"
+            # Clear modified state unless the value was edited again meanwhile
+            if self.modified_values.get(item) != value:
+                continue
+            del self.modified_values[item]
+            self.register_table.set_value(index, value)
+                
+        if not failed:
+            log.info("Write successful")
+            return
+        log.warning("Write failed for %d of %d values", len(failed), len(values))
+        addresses = ", ".join(str(index + 1) for index in sorted(failed)[:10])
+        messagebox.showerror("Error", f"Failed to write values at addresses: {addresses}")
+            
     def cancel_edit(self):
         """Cancel the value edit"""
         if self.value_entry:
@@ -639,71 +777,298 @@ class MainWindow(tk.Tk):
             self.value_entry = None
             
     def read_registers(self, *args):
-        """Read registers based on selected type"""
+        """Request a read of the registers based on selected type"""
         if not hasattr(self, 'modbus_client') or not self.modbus_client or not self.connected_device:
             self.clear_register_display()
             return
 
         try:
             count = int(self.register_count.get())
-            if not (1 <= count <= 100):
+            if not (1 <= count <= MAX_REGISTERS):
                 raise ValueError
         except ValueError:
-            messagebox.showerror("Error", "Invalid register count. Use numbers between 1-100")
+            messagebox.showerror("Error", f"Invalid register count. Use numbers between 1-{MAX_REGISTERS}")
+            return
+
+        # Values cached for another register type are no longer valid
+        reg_type = self.register_type.get()
+        if reg_type != self.displayed_type:
+            self.displayed_type = reg_type
+            self.register_table.clear()
+            self.change_filter.reset()
+            self.modified_values.clear()
+
+        self.register_table.set_size(count)
+        self.request_registers()
+
+    def request_registers(self):
+        """Point the poll worker at the visible page, prefetch and graphed registers"""
+        map_size = self.register_table.map_size
+        if not self.poll_worker or not map_size:
             return
+        first, last = self.register_table.prefetch_range()
+        addresses = set(range(first, last))
+        if self.register_map:
+            # Read every register of a tag that starts in range, even past the page
+            tag_span = self.register_map.wanted().get(FUNCTION_CODES[self.register_type.get()], ())
+            addresses.update(a for a in tag_span if first <= a < last + 3)
+        graphed = {int(reg_id) - 1 for reg_id in self.selected_for_graph if int(reg_id) <= map_size}
+        reg_type = self.register_type.get()
+        self.poll_worker.set_request(reg_type, addresses - graphed, self.connected_device, group=VIEW_GROUP)
+        if graphed:
+            self.poll_worker.set_request(reg_type, graphed, self.connected_device, group=GRAPH_GROUP)
+            if self.live_var.get():
+                try:
+                    self.poll_worker.start_polling(self.poll_interval(self.graph_interval), group=GRAPH_GROUP)
+                except ValueError:
+                    messagebox.showerror("Error", "Invalid graph interval")
+        else:
+            self.poll_worker.remove_request(GRAPH_GROUP)
+        if not self.poll_worker.polling:
+            self.poll_worker.poll_once()
+
+    def poll_interval(self, entry):
+        """Seconds entered in milliseconds in an interval field.
 
-        # Clear existing values
-        for item in self.register_display.get_children():
-            self.register_display.delete(item)
+        Raises:
+            ValueError: The entry is not a whole number of at least 100 ms
+        """
+        interval = int(entry.get())
+        if interval < 100:
+            raise ValueError("Interval must be at least 100ms")
+        return interval / 1000.0
+
+    def on_table_view_change(self):
+        """The table scrolled or resized: drop the open edit and re-point the reads"""
+        self.cancel_edit()
+        self.request_registers()
+
+    def start_poll_worker(self):
+        """Start the background poll engine for the connected client"""
+        self.poll_worker = PollWorker(self.modbus_client)
+        self.poll_worker.start()
+        self.process_poll_results()
+
+    def stop_poll_worker(self, on_stopped=None):
+        """Stop the background poll engine without waiting for it.
+
+        ``on_stopped`` runs once the worker no longer uses its client; the
+        read in progress may take a full timeout, so the UI does not wait.
+        """
+        if self.poll_results_job:
+            self.after_cancel(self.poll_results_job)
+            self.poll_results_job = None
+        worker, self.poll_worker = self.poll_worker, None
+        if worker:
+            worker.stop_async(on_stopped)
+        elif on_stopped:
+            on_stopped()
+
+    def process_poll_results(self):
+        """Drain results handed back by the poll worker"""
+        worker = self.poll_worker
+        if not worker:
+            return
+        while not worker.results.empty():
+            result = worker.results.get_nowait()
+            if isinstance(result, PollResult):
+                result = self.filter_result(result)
+                self.record_result(result)
+                self.display_registers(result)
+            elif result.callback:
+                result.callback(result.result, result.error)
+        self.poll_results_job = self.after(20, self.process_poll_results)
+
+    def filter_result(self, result):
+        """Drop the values of a poll that stayed inside their deadband"""
+        if not result.values:
+            return result
+        function_code = FUNCTION_CODES[result.reg_type]
+        changed = self.change_filter.filter(result.timestamp, {
+            (result.unit, function_code, index): value for index, value in result.values.items()
+        })
+        return result._replace(values={index: value for (_, _, index), value in changed.items()})
+
+    def resend_registers(self, indexes):
+        """Let the next read of these 0-based addresses through the deadband"""
+        if self.connected_device:
+            function_code = FUNCTION_CODES[self.register_type.get()]
+            self.change_filter.forget((self.connected_device, function_code, index) for index in indexes)
+
+    def display_registers(self, result):
+        """Show a completed register read in the table and graph"""
+        # Ignore reads that were requested before the view changed
+        if result.unit != self.connected_device or result.reg_type != self.register_type.get():
+            return
+        if not result.values:
+            return
 
         try:
-            # Read values based on selected type
-            reg_type = self.register_type.get()
-            current_time = time.time()
-
-            if reg_type == "coils":
-                values = self.modbus_client.read_coils(0, count, self.connected_device)
-            elif reg_type == "discrete":
-                values = self.modbus_client.read_discrete_inputs(0, count, self.connected_device)
-            elif reg_type == "holding":
-                values = self.modbus_client.read_holding_registers(0, count, self.connected_device)
-            else:  # input registers
-                values = self.modbus_client.read_input_registers(0, count, self.connected_device)
-
-            if values is not None:
-                for i, value in enumerate(values):
-                    item_id = f"reg_{i}"
-                    addr = i + 1  # Start addresses from 1
-                    reg_id = str(addr)
-
-                    # Store data for graphing if register is selected
-                    if reg_id in self.selected_for_graph:
-                        self.graph_data[reg_id]['times'].append(current_time)
-                        self.graph_data[reg_id]['values'].append(value)
-                        # Keep only last 100 points
-                        if len(self.graph_data[reg_id]['times']) > 100:
-                            self.graph_data[reg_id]['times'].pop(0)
-                            self.graph_data[reg_id]['values'].pop(0)
-
-                    # Add checkbox state
-                    checkbox_state = '☒' if reg_id in self.selected_for_graph else '☐'
-
-                    # Check if item exists
-                    if item_id in self.register_display.get_children():
-                        current_values = self.register_display.item(item_id)['values']
-                        new_value = current_values[2] if len(current_values) > 2 else str(value)
-                        self.register_display.item(item_id, values=(addr, value, new_value, checkbox_state))
-                    else:
-                        self.register_display.insert("", tk.END, item_id, values=(addr, value, value, checkbox_state))
-
-                    # Restore modified tag if needed
-                    if item_id in self.modified_values:
-                        self.register_display.tag_configure('modified', background='#E6F3FF')
-                        self.register_display.item(item_id, tags=('modified',))
+            # Store data for graphing if register is selected
+            for index, value in result.values.items():
+                reg_id = str(index + 1)
+                if reg_id in self.selected_for_graph:
+                    self.graph_data.append(reg_id, result.timestamp, value)
+
+            function_code = FUNCTION_CODES[result.reg_type]
+            dropped = self.register_table.show_values(result.values)
+            if self.register_map:
+                self.register_table.show_tags(self.register_map, function_code)
+            # Uncached rows must be reported again when they scroll back in
+            self.change_filter.forget((result.unit, function_code, i) for i in dropped)
+
+        except Exception:
+            log.exception("Error displaying registers")
+
+    def load_register_map(self):
+        """Load a tag definition file that types and scales the registers"""
+        path = filedialog.askopenfilename(
+            parent=self,
+            filetypes=[("Register maps", "*.json"), ("All files", "*.*")]
+        )
+        if not path:
+            return
+        try:
+            from register_map import RegisterMap
+            self.register_map = RegisterMap.load(path)
+        except (OSError, ValueError, KeyError) as e:
+            messagebox.showerror("Error", f"Cannot load register map: {e}")
+            return
+        log.info("Loaded register map", extra={'path': path, 'tags': len(self.register_map)})
+        self.register_table.clear_tags()
+        self.request_registers()
+
+    def set_register_deadband(self, event):
+        """Ask for the deadband of the register under the pointer"""
+        item = self.register_table.tree.identify_row(event.y)
+        if not item or not self.connected_device:
+            return
+        index = item_address(item)
+        key = (self.connected_device, FUNCTION_CODES[self.register_type.get()], index)
+        band = self.change_filter.deadband(key)
+        current = f"{band.percent:g}%" if band.percent else f"{band.absolute:g}"
+        text = simpledialog.askstring(
+            "Deadband",
+            f"Deadband for register {index + 1}, e.g. 5 or 2% (empty for none):",
+            initialvalue=current, parent=self
+        )
+        if text is None:
+            return
+        text = text.strip()
+        try:
+            if not text:
+                self.change_filter.clear_deadband(key)
+            elif text.endswith('%'):
+                self.change_filter.set_deadband(key, percent=float(text[:-1]))
+            else:
+                self.change_filter.set_deadband(key, absolute=float(text))
+        except ValueError:
+            messagebox.showerror("Error", "Enter a number, optionally followed by %")
 
+    def recordings_dir(self):
+        """Directory where captures are written"""
+        return os.path.join(os.path.dirname(os.path.abspath(__file__)), 'recordings')
+
+    def start_recording(self):
+        """Start streaming polled values to a new capture file"""
+        from recorder import Recorder
+        
+        os.makedirs(self.recordings_dir(), exist_ok=True)
+        path = os.path.join(self.recordings_dir(), f"capture_{datetime.now():%Y%m%d_%H%M%S}.mbrec")
+        self.recorder = Recorder(path)
+        self.recorder.start()
+
+    def stop_recording(self):
+        """Flush and close the current capture"""
+        if self.recorder:
+            self.recorder.stop()
+            self.recorder = None
+
+    def record_result(self, result):
+        """Queue every value of a poll for the recorder"""
+        if not self.recorder or not result.values:
+            return
+        from recorder import channel_key
+        
+        function_code = FUNCTION_CODES[result.reg_type]
+        self.recorder.record_many(result.timestamp, (
+            (channel_key(result.unit, function_code, index), value)
+            for index, value in result.values.items()
+        ))
+
+    def show_replay(self):
+        """Open a capture file and plot it"""
+        path = filedialog.askopenfilename(
+            parent=self,
+            initialdir=self.recordings_dir(),
+            filetypes=[("Recordings", "*.mbrec"), ("All files", "*.*")]
+        )
+        if not path:
+            return
+        try:
+            from replay_window import ReplayWindow
+            ReplayWindow(self, path)
         except Exception as e:
-            print(f"Error reading registers: {e}")
-            
+            messagebox.showerror("Error", f"Cannot open recording: {e}")
+
+    def update_bus_stats(self):
+        """Refresh the one-line transaction summary"""
+        totals = transaction_stats.totals()
+        if totals['count']:
+            failed = totals['count'] - totals['ok']
+            text = (
+                f"Tx {totals['count']}  err {100.0 * failed / totals['count']:.1f}%  "
+                f"p99 {totals['latency_p99'] * 1000:.0f} ms"
+            )
+            filtered = self.change_filter.stats()
+            if filtered['received']:
+                text += f"  unchanged {100.0 * filtered['suppressed'] / filtered['received']:.0f}%"
+            self.bus_stats_label.config(text=text)
+        self.update_poll_stats()
+        self.after(BUS_STATS_INTERVAL, self.update_bus_stats)
+
+    def update_poll_stats(self):
+        """Show the start jitter of each live poll rate"""
+        lines = []
+        if self.poll_worker:
+            for group, stats in sorted(self.poll_worker.stats().items()):
+                if not stats['runs']:
+                    continue
+                lines.append(
+                    f"{group.title()} {stats['interval'] * 1000:.0f} ms  "
+                    f"jitter {stats['jitter_mean'] * 1000:.0f}/{stats['jitter_max'] * 1000:.0f} ms  "
+                    f"skipped {stats['skipped']}"
+                )
+        self.poll_stats_label.config(text="\n".join(lines))
+
+    def show_stats(self):
+        """Open the per-unit transaction statistics"""
+        StatsWindow(self)
+
+    def show_capture(self):
+        """Open the raw frame capture view"""
+        CaptureWindow(self)
+
+    def export_log(self):
+        """Save the communication log as a text file"""
+        path = filedialog.asksaveasfilename(
+            parent=self,
+            defaultextension=".txt",
+            filetypes=[("Text", "*.txt"), ("All files", "*.*")]
+        )
+        if not path:
+            return
+        try:
+            if not export_log(path):
+                messagebox.showerror("Error", "File logging is not enabled")
+        except OSError as e:
+            messagebox.showerror("Error", f"Cannot export log: {e}")
+
+    def disconnect_device(self):
+        """Stop polling and hand the client back once the worker is done with it"""
+        client, self.modbus_client = self.modbus_client, None
+        self.stop_poll_worker(on_stopped=(lambda: pool.put(client)) if client else None)
+
     def connect_to_device(self, event):
         """Connect to the selected device"""
         if not self.config:
@@ -719,50 +1084,52 @@ class MainWindow(tk.Tk):
         
         # If clicking the same device, disconnect it
         if self.connected_device == address:
-            if self.modbus_client:
-                self.modbus_client.disconnect()
-                self.modbus_client = None
+            self.disconnect_device()
             self.connected_device = None
-            self.device_list.item(selection[0], values=(address, "Available"), tags=())
+            self.device_list.set(selection[0], "status", "Available")
+            self.device_list.item(selection[0], tags=())
             # Clear display and update device label when disconnecting
             self.clear_register_display()
             self.connected_device_label.config(text="None")
             return
             
         # Disconnect from any previously connected device
-        if self.modbus_client:
-            self.modbus_client.disconnect()
+        self.disconnect_device()
             
         # Convert parity from text to single letter
         parity_map = {'none': 'N', 'even': 'E', 'odd': 'O'}
         parity = parity_map.get(self.config['parity'].lower(), 'N')
         
         try:
-            # Create new Modbus client
-            self.modbus_client = ModbusToolClient(
+            # Get a pooled Modbus client for the configured port
+            self.modbus_client = pool.get(
+                'rtu',
                 port=self.config['port'],
-                mode='rtu',
                 baudrate=int(self.config['baudrate']),
                 parity=parity,
                 bytesize=int(self.config['bytesize'])
             )
             
-            if self.modbus_client.connect():
+            if self.modbus_client:
                 # Update previously connected device (if any)
                 if self.connected_device:
                     for item in self.device_list.get_children():
                         if int(self.device_list.item(item)['values'][0]) == self.connected_device:
-                            self.device_list.item(item, values=(self.connected_device, "Available"), tags=())
+                            self.device_list.set(item, "status", "Available")
+                            self.device_list.item(item, tags=())
                             break
                 
                 # Update new connected device
                 self.connected_device = address
-                self.device_list.item(selection[0], values=(address, "Connected"), tags=("connected",))
+                self.device_list.set(selection[0], "status", "Connected")
+                self.device_list.item(selection[0], tags=("connected",))
                 self.device_list.tag_configure("connected", background="#90EE90")
                 # Update connected device label and read registers
                 self.connected_device_label.config(text=str(address))
                 self.clear_register_display()
+                self.start_poll_worker()
                 self.read_registers()
+                self.schedule_next_poll()
             else:
                 messagebox.showerror("Error", "Failed to connect to device")
         except Exception as e:
@@ -775,14 +1142,12 @@ class MainWindow(tk.Tk):
             messagebox.showerror("Error", "Please connect to a device first")
             return
             
-        try:
-            interval = int(self.polling_interval.get())
-            if interval < 100:
-                messagebox.showerror("Error", "Interval must be at least 100ms")
+        for entry, name in ((self.polling_interval, "polling"), (self.graph_interval, "graph")):
+            try:
+                self.poll_interval(entry)
+            except ValueError:
+                messagebox.showerror("Error", f"Invalid {name} interval, use at least 100 ms")
                 return
-        except ValueError:
-            messagebox.showerror("Error", "Invalid polling interval")
-            return
             
         if not self.live_var.get():
             self.start_live_polling()
@@ -795,6 +1160,8 @@ class MainWindow(tk.Tk):
         self.live_button_frame.configure(background='green')
         self.live_button.configure(bg='green')
         self.update_graph_button()
+        if self.record_var.get():
+            self.start_recording()
         self.schedule_next_poll()
         
     def stop_live_polling(self):
@@ -809,19 +1176,19 @@ class MainWindow(tk.Tk):
             self.graph_window.destroy()
             self.graph_window = None
             
-        if hasattr(self, 'polling_job') and self.polling_job:
-            self.after_cancel(self.polling_job)
-            self.polling_job = None
+        if self.poll_worker:
+            self.poll_worker.stop_polling()
+        self.stop_recording()
             
     def schedule_next_poll(self):
-        """Schedule the next polling cycle"""
-        if not self.live_var.get():
+        """Hand the polling cycle to the background poll worker"""
+        if not self.live_var.get() or not self.poll_worker:
             return
             
         try:
-            interval = int(self.polling_interval.get())
+            interval = self.poll_interval(self.polling_interval)
             self.read_registers()
-            self.polling_job = self.after(interval, self.schedule_next_poll)
+            self.poll_worker.start_polling(interval, group=VIEW_GROUP)
         except ValueError:
             self.stop_live_polling()
             messagebox.showerror("Error", "Invalid polling interval")
@@ -831,34 +1198,47 @@ class MainWindow(tk.Tk):
         self.stop_live_polling()
         self.disconnect_device()
 
+    def on_close(self):
+        """Stop polling and close the serial session before exiting"""
+        self.scanning = False
+        self.disconnect_device()
+        self.stop_recording()
+        pool.close_all()
+        PortManager.release_all()
+        self.destroy()
+
     def handle_checkbox_click(self, event):
         """Handle checkbox click in the graph column"""
-        region = self.register_display.identify_region(event.x, event.y)
+        region = self.register_table.tree.identify_region(event.x, event.y)
         if region != "cell":
             return
             
-        item = self.register_display.identify_row(event.y)
-        column = self.register_display.identify_column(event.x)
+        item = self.register_table.tree.identify_row(event.y)
+        column = self.register_table.tree.identify_column(event.x)
         
         # Check if click was in the graph column
-        if self.register_display.column(column, "id") != "graph":
+        if self.register_table.tree.column(column, "id") != "graph":
             return
             
         # Toggle checkbox
-        values = self.register_display.item(item, "values")
-        reg_id = values[0]  # Address is in first column
+        values = self.register_table.tree.item(item, "values")
+        reg_id = str(values[0])  # Address is in first column
         
         # Always allow toggling, regardless of graph window state
         if reg_id in self.selected_for_graph:
             self.selected_for_graph.remove(reg_id)
-            new_values = values[:3] + ('☐',)
+            new_values = values[:3] + ('☐',) + values[4:]
         else:
             self.selected_for_graph.add(reg_id)
-            new_values = values[:3] + ('☒',)
+            new_values = values[:3] + ('☒',) + values[4:]
+            self.resend_registers([int(reg_id) - 1])
             
-        self.register_display.item(item, values=new_values)
+        self.register_table.tree.item(item, values=new_values)
         self.update_graph_button()
         
+        # Graphed registers are polled even when scrolled out of view
+        self.request_registers()
+        
     def update_graph_button(self):
         """Update graph button state based on conditions"""
         if self.live_var.get() and self.selected_for_graph:
@@ -871,6 +1251,11 @@ class MainWindow(tk.Tk):
         if self.graph_window is not None:
             self.graph_window.lift()
             return
+        
+        # The plotting stack is loaded the first time a graph is opened
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from matplotlib.ticker import FuncFormatter
             
         self.graph_window = tk.Toplevel(self)
         self.graph_window.title("Live Data Graph")
@@ -881,7 +1266,7 @@ class MainWindow(tk.Tk):
         
         # Clear existing data
         self.graph_data.clear()
-        self.graph_data = defaultdict(lambda: {'times': [], 'values': []})
+        self.resend_registers(int(reg_id) - 1 for reg_id in self.selected_for_graph)
         
         # Handle window close
         self.graph_window.protocol("WM_DELETE_WINDOW", self.on_graph_window_close)
@@ -891,11 +1276,19 @@ class MainWindow(tk.Tk):
         self.ax = self.fig.add_subplot(111)
         self.canvas = FigureCanvasTkAgg(self.fig, master=self.graph_window)
         
-        # Configure plot
+        # Configure plot once; updates only touch the line data
         self.ax.set_xlabel('Time (minutes)')
-        self.ax.set_ylabel('Value')
+        self.ax.set_ylabel('Register Value')
         self.ax.set_title('Live Register Values')
-        self.ax.grid(True)
+        self.ax.grid(True, linestyle='--', alpha=0.7)
+        self.ax.xaxis.set_major_formatter(FuncFormatter(self.format_elapsed_minutes))
+        self.ax.set_xlim([self.graph_start_time, self.graph_start_time + GRAPH_X_STEP])
+        self.graph_lines = {}
+        self.graph_background = None
+        self.fig.tight_layout()
+        
+        # Recapture the static background after every full draw (incl. resize)
+        self.canvas.mpl_connect('draw_event', self.on_graph_draw)
         
         # Pack canvas
         self.canvas.draw()
@@ -904,47 +1297,95 @@ class MainWindow(tk.Tk):
         # Start update loop
         self.update_graph()
         
+    def on_graph_draw(self, event):
+        """Cache the axes background and redraw the animated lines"""
+        self.graph_background = self.canvas.copy_from_bbox(self.ax.bbox)
+        for line in self.graph_lines.values():
+            self.ax.draw_artist(line)
+            
     def update_graph(self):
         """Update the graph with new data"""
         if not hasattr(self, 'graph_window') or not self.graph_window:
             return
+        import numpy as np
+        from decimate import minmax_decimate
             
-        self.ax.clear()
         current_time = time.time()
-        elapsed_time = current_time - self.graph_start_time
-        
-        # Plot data for each selected register
-        for reg_id in self.selected_for_graph:
-            data = self.graph_data[reg_id]
-            if data['times'] and data['values']:
-                # Calculate elapsed minutes for each point
-                elapsed_minutes = [(t - self.graph_start_time) / 60 for t in data['times']]
-                self.ax.plot(elapsed_minutes, data['values'], label=f'Register {reg_id}', marker='o')
-        
-        # Configure axes
-        self.ax.set_xlabel('Time (minutes)')
-        self.ax.set_ylabel('Register Value')
-        
-        # Set x-axis limits
-        max_time = max(1, elapsed_time / 60)  # At least 1 minute window
-        self.ax.set_xlim([0, max_time])
-        
-        # Add grid
-        self.ax.grid(True, linestyle='--', alpha=0.7)
-        
-        # Update plot appearance
-        self.ax.grid(True)
-        self.ax.legend()
-        
-        # Adjust layout to prevent label cutoff
-        self.fig.tight_layout()
-        
-        # Draw the updated plot
-        self.canvas.draw()
+        full_redraw = self.sync_graph_lines()
+        
+        # Only the last MAX_TIME_WINDOW is shown; older samples stay in the store
+        xmin, xmax = self.ax.get_xlim()
+        if current_time > xmax:
+            # Scroll in steps so the axes are only redrawn now and then
+            xmax = current_time + GRAPH_X_STEP
+            xmin = max(self.graph_start_time, xmax - self.MAX_TIME_WINDOW)
+            self.ax.set_xlim([xmin, xmax])
+            full_redraw = True
+        
+        # Point the persistent lines at the new data window, decimated to
+        # about two points per pixel column of the plot area
+        buckets = max(1, int(self.ax.bbox.width))
+        ymin = ymax = None
+        for reg_id, line in self.graph_lines.items():
+            series = self.graph_data.series(reg_id)
+            if series is None:
+                continue
+            # Timestamps are plotted as-is so the buffer is read without copying
+            times, values = (np.frombuffer(view) for view in series.window(xmin))
+            times, values = minmax_decimate(times, values, buckets)
+            line.set_data(times, values)
+            if len(values):
+                ymin = values.min() if ymin is None else min(ymin, values.min())
+                ymax = values.max() if ymax is None else max(ymax, values.max())
+        
+        # Rescale the y-axis only when the data leaves the current limits
+        if ymin is not None:
+            low, high = self.ax.get_ylim()
+            if ymin < low or ymax > high:
+                margin = max((ymax - ymin) * 0.1, 1)
+                self.ax.set_ylim([ymin - margin, ymax + margin])
+                full_redraw = True
+        
+        if full_redraw or self.graph_background is None:
+            # draw_event recaptures the background and draws the lines
+            self.canvas.draw()
+        else:
+            self.canvas.restore_region(self.graph_background)
+            for line in self.graph_lines.values():
+                self.ax.draw_artist(line)
+            self.canvas.blit(self.ax.bbox)
         
         # Schedule next update
         self.graph_update_job = self.after(1000, self.update_graph)  # Update every second
         
+    def sync_graph_lines(self):
+        """Create and remove lines to match the selected registers.
+        
+        Returns True when the set of lines (and so the legend) changed.
+        """
+        changed = False
+        for reg_id in list(self.graph_lines):
+            if reg_id not in self.selected_for_graph:
+                self.graph_lines.pop(reg_id).remove()
+                changed = True
+        for reg_id in sorted(self.selected_for_graph, key=int):
+            if reg_id not in self.graph_lines:
+                # Values arrive only on change, so hold each one until the next
+                line, = self.ax.plot([], [], label=f'Register {reg_id}', marker='o',
+                                     drawstyle='steps-post', animated=True)
+                self.graph_lines[reg_id] = line
+                changed = True
+        if changed:
+            if self.graph_lines:
+                self.ax.legend(loc='upper left')
+            elif self.ax.get_legend():
+                self.ax.get_legend().remove()
+        return changed
+        
+    def format_elapsed_minutes(self, timestamp, pos=None):
+        """Label a timestamp axis tick as minutes since the graph opened"""
+        return f"{(timestamp - self.graph_start_time) / 60:.1f}"
+        
     def on_graph_window_close(self):
         """Handle graph window closing"""
         if self.graph_update_job:
@@ -955,6 +1396,38 @@ class MainWindow(tk.Tk):
         self.graph_start_time = None
         self.graph_data.clear()
 
+def logs_dir():
+    """Directory of the rotating communication log"""
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), 'logs')
+
+
+def report_startup(app, exit_after=False):
+    """Log time to first window; with exit_after print it as JSON and quit"""
+    app.update_idletasks()
+    now = time.perf_counter()
+    timings = {
+        'import_seconds': IMPORTS_DONE - STARTUP_BEGIN,
+        'first_window_seconds': now - STARTUP_BEGIN,
+        'target_seconds': FIRST_WINDOW_TARGET,
+    }
+    if timings['first_window_seconds'] > FIRST_WINDOW_TARGET:
+        log.warning("First window after %.0f ms, over the %.0f ms target",
+                    timings['first_window_seconds'] * 1000, FIRST_WINDOW_TARGET * 1000)
+    else:
+        log.info("First window after %.0f ms", timings['first_window_seconds'] * 1000)
+    if exit_after:
+        print(json.dumps(timings))
+        app.on_close()
+
+
 if __name__ == "__main__":
-    app = MainWindow()
-    app.mainloop()
+    # --profile-startup prints startup timings as JSON and exits; see bench.py
+    profile_startup = '--profile-startup' in sys.argv
+    os.makedirs(logs_dir(), exist_ok=True)
+    start_logging(os.path.join(logs_dir(), 'modbus_tool.log'))
+    try:
+        app = MainWindow()
+        app.after_idle(report_startup, app, profile_startup)
+        app.mainloop()
+    finally:
+        stop_logging()
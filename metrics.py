@@ -0,0 +1,246 @@
+import csv
+import json
+import threading
+import time
+from bisect import bisect_left
+
+from capture import RX, TX, frame_capture
+from logs import get_logger
+
+log = get_logger('metrics')
+
+# Upper edges of the latency histogram buckets in seconds; the last bucket
+# catches everything slower
+LATENCY_BUCKETS = (0.0002, 0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0, 5.0)
+
+# Transaction outcomes
+OK = 'ok'
+TIMEOUT = 'timeout'
+CRC = 'crc'
+EXCEPTION = 'exception'
+ERROR = 'error'
+OUTCOMES = (OK, TIMEOUT, CRC, EXCEPTION, ERROR)
+
+EXPORT_FIELDS = ('unit', 'function_code', 'count') + OUTCOMES + (
+    'retries', 'exception_codes', 'latency_mean', 'latency_p50', 'latency_p99', 'latency_max'
+)
+
+
+class WireTap:
+    """Counts frames sent and bytes received on a pymodbus sync client.
+
+    pymodbus retries a request internally and drops replies that fail the
+    CRC check, so the response alone cannot say whether a transaction was
+    retried or whether a garbled reply arrived. Comparing the counters
+    before and after a transaction answers both.
+
+    While ``capture`` is enabled the raw frames are also copied into it;
+    reply chunks are gathered into one RX frame per request.
+    """
+
+    def __init__(self, client, capture=frame_capture):
+        self.sent = 0
+        self.received = 0
+        self.capture = capture
+        params = client.comm_params
+        self.source = params.host if not params.port else f"{params.host}:{params.port}"
+        self._rx = bytearray()
+        self._rx_start = None
+        self._install(client)
+
+    def _install(self, client):
+        self._recv = client.recv
+        self._trace_packet = client.transaction.trace_packet
+        client.recv = self._tap_recv
+        client.transaction.trace_packet = self._tap_packet
+
+    @classmethod
+    def attach(cls, client):
+        """Get the tap on a pymodbus client, installing it on first use.
+
+        The tap wraps pymodbus internals. Returns None when the installed
+        version lacks them; transactions are then timed without retry
+        counts or CRC detection, and nothing is captured.
+        """
+        tap = getattr(client, 'wire_tap', None)
+        if tap is None and client is not None:
+            try:
+                tap = cls(client)
+            except AttributeError as e:
+                log.warning("Wire tap unavailable with this pymodbus version: %s", e)
+                tap = False
+            client.wire_tap = tap
+        return tap or None
+
+    def _tap_packet(self, sending, data):
+        if sending:
+            self.sent += 1
+            if self.capture.enabled:
+                self.flush()
+                self.capture.add(TX, self.source, data)
+        return self._trace_packet(sending, data)
+
+    def _tap_recv(self, size):
+        data = self._recv(size)
+        self._count_received(data)
+        return data
+
+    def _count_received(self, data):
+        self.received += len(data)
+        if data and self.capture.enabled:
+            if not self._rx:
+                self._rx_start = time.perf_counter()
+            self._rx += data
+
+    def flush(self):
+        """Capture the reply bytes received since the last request"""
+        if self._rx:
+            self.capture.add(RX, self.source, self._rx, self._rx_start)
+            self._rx = bytearray()
+
+
+class AsyncWireTap(WireTap):
+    """WireTap for a pymodbus asyncio client.
+
+    Async clients are handed their bytes by the event loop instead of
+    calling recv, so the protocol's data_received is wrapped instead.
+    """
+
+    def _install(self, client):
+        protocol = client.ctx
+        self._data_received = protocol.data_received
+        self._trace_packet = protocol.trace_packet
+        protocol.data_received = self._tap_data_received
+        protocol.trace_packet = self._tap_packet
+
+    def _tap_data_received(self, data):
+        self._count_received(data)
+        self._data_received(data)
+
+
+class _Counter:
+    """Outcome counts and latency histogram for one unit and function code"""
+
+    def __init__(self):
+        self.outcomes = dict.fromkeys(OUTCOMES, 0)
+        self.exception_codes = {}
+        self.retries = 0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+
+    @property
+    def count(self):
+        return sum(self.outcomes.values())
+
+    def percentile(self, fraction):
+        """Latency percentile estimated as the upper edge of its bucket"""
+        target = fraction * self.count
+        seen = 0
+        for edge, n in zip(LATENCY_BUCKETS, self.buckets):
+            seen += n
+            if n and seen >= target:
+                return min(edge, self.latency_max)
+        return self.latency_max
+
+    def snapshot(self):
+        count = self.count
+        return dict(
+            count=count,
+            retries=self.retries,
+            exception_codes=dict(self.exception_codes),
+            latency_mean=self.latency_sum / count if count else 0.0,
+            latency_p50=self.percentile(0.5),
+            latency_p99=self.percentile(0.99),
+            latency_max=self.latency_max,
+            histogram=list(self.buckets),
+            **self.outcomes
+        )
+
+
+class TransactionStats:
+    """Per unit and function code transaction counters.
+
+    ModbusToolClient records every request here with its latency, outcome
+    and retry count, so slow or unreliable slaves show up by address.
+    """
+
+    def __init__(self):
+        self._counters = {}
+        self._lock = threading.Lock()
+        self.started = time.time()
+
+    def record(self, unit, function_code, latency, outcome, retries=0, exception_code=None):
+        """Count one transaction.
+
+        Args:
+            unit (int): Slave address
+            function_code (int): Request function code
+            latency (float): Seconds from send to reply or give-up
+            outcome (str): One of OUTCOMES
+            retries (int): Resends pymodbus needed
+            exception_code (int): Modbus exception code for EXCEPTION outcomes
+        """
+        with self._lock:
+            counter = self._counters.get((unit, function_code))
+            if counter is None:
+                counter = self._counters[(unit, function_code)] = _Counter()
+            counter.outcomes[outcome] += 1
+            counter.retries += retries
+            if exception_code is not None:
+                counter.exception_codes[exception_code] = counter.exception_codes.get(exception_code, 0) + 1
+            counter.buckets[bisect_left(LATENCY_BUCKETS, latency)] += 1
+            counter.latency_sum += latency
+            counter.latency_max = max(counter.latency_max, latency)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self.started = time.time()
+
+    def snapshot(self):
+        """Current counters.
+
+        Returns:
+            dict mapping (unit, function_code) to a dict of counts, retries,
+            exception codes and latency mean/p50/p99/max in seconds
+        """
+        with self._lock:
+            return {key: counter.snapshot() for key, counter in sorted(self._counters.items())}
+
+    def totals(self):
+        """Counts and worst p99 latency across every unit"""
+        rows = self.snapshot().values()
+        totals = dict.fromkeys(('count', 'retries') + OUTCOMES, 0)
+        for row in rows:
+            for key in totals:
+                totals[key] += row[key]
+        totals['latency_p99'] = max((row['latency_p99'] for row in rows), default=0.0)
+        return totals
+
+    def export(self, path):
+        """Write the counters to a .json or .csv file"""
+        rows = [
+            dict(unit=unit, function_code=function_code, **row)
+            for (unit, function_code), row in self.snapshot().items()
+        ]
+        with open(path, 'w', newline='') as f:
+            if path.lower().endswith('.csv'):
+                writer = csv.DictWriter(f, EXPORT_FIELDS, extrasaction='ignore')
+                writer.writeheader()
+                for row in rows:
+                    row['exception_codes'] = ' '.join(
+                        f"{code:#04x}:{n}" for code, n in sorted(row['exception_codes'].items())
+                    )
+                    writer.writerow(row)
+            else:
+                json.dump({
+                    'started': self.started,
+                    'exported': time.time(),
+                    'latency_buckets': LATENCY_BUCKETS,
+                    'transactions': rows,
+                }, f, indent=2)
+
+
+# Shared by every ModbusToolClient unless one is given its own
+transaction_stats = TransactionStats()
@@ -0,0 +1,390 @@
+import queue
+import threading
+import time
+from collections import namedtuple
+
+from client import FUNCTION_CODES, plan_poll
+from logs import get_logger
+
+log = get_logger('poller')
+
+
+PollResult = namedtuple('PollResult', ['reg_type', 'unit', 'timestamp', 'values'])
+JobResult = namedtuple('JobResult', ['callback', 'result', 'error'])
+BusResult = namedtuple('BusResult', ['unit', 'group', 'timestamp', 'values'])
+
+
+class RateGroup:
+    """Drift-free schedule for one poll rate.
+
+    Slots sit on a fixed grid (start + n * interval) of the monotonic clock,
+    so bus time never stretches the period. A run that overruns into later
+    slots skips them instead of queueing catch-up reads.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.next_due = None
+        self.runs = 0
+        self.overruns = 0
+        self.skipped = 0
+        self.max_jitter = 0.0
+        self._jitter_mean = 0.0
+        self._jitter_m2 = 0.0
+
+    def due(self, now):
+        """Whether a slot has been reached; the first call starts the grid"""
+        if self.next_due is None:
+            self.next_due = now
+        return now >= self.next_due
+
+    def mark_run(self, started, finished):
+        """Record a run and move to the next slot that is still ahead"""
+        jitter = started - self.next_due
+        self.runs += 1
+        delta = jitter - self._jitter_mean
+        self._jitter_mean += delta / self.runs
+        self._jitter_m2 += delta * (jitter - self._jitter_mean)
+        self.max_jitter = max(self.max_jitter, jitter)
+
+        self.next_due += self.interval
+        if finished > self.next_due:
+            missed = int((finished - self.next_due) // self.interval) + 1
+            self.overruns += 1
+            self.skipped += missed
+            self.next_due += missed * self.interval
+
+    def stats(self):
+        """Run, overrun and start-jitter statistics in seconds"""
+        return {
+            'interval': self.interval,
+            'runs': self.runs,
+            'overruns': self.overruns,
+            'skipped': self.skipped,
+            'jitter_mean': self._jitter_mean,
+            'jitter_max': self.max_jitter,
+            'jitter_std': (self._jitter_m2 / self.runs) ** 0.5 if self.runs else 0.0,
+        }
+
+
+class PollWorker:
+    """Background poll engine that owns a ModbusToolClient.
+
+    All bus traffic runs on the worker thread. Results are handed back to the
+    GUI through ``results`` so blocking reads never stall the Tk main loop.
+    A PollResult's values map 0-based address to value, or are None when the
+    device did not answer.
+
+    Requests are kept in named groups, each polled at its own rate on a
+    RateGroup schedule, e.g. fast analog values every 100 ms and setpoints
+    every 10 s.
+    """
+
+    def __init__(self, client, results=None, max_gap=8):
+        self.client = client
+        self.max_gap = max_gap
+        self.results = results if results is not None else queue.Queue()
+        self._requests = {}
+        self._rates = {}
+        self._pending_read = False
+        self._jobs = queue.Queue()
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread = None
+        self._exit_lock = threading.Lock()
+        self._exited = True
+        self._on_stopped = None
+
+    def start(self):
+        """Start the worker thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping = False
+        self._on_stopped = None
+        self._exited = False
+        self._thread = threading.Thread(target=self._run, name="PollWorker")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop_async(self, on_stopped=None):
+        """Ask the worker thread to stop without waiting for it.
+
+        A read in progress on a silent device can block for the client's
+        whole timeout, so the GUI must not join the thread. ``on_stopped``
+        is called once the thread has finished with the client, on the
+        worker thread, or right away if it is not running.
+        """
+        self._stopping = True
+        self._rates = {}
+        with self._exit_lock:
+            running = not self._exited
+            if running:
+                self._on_stopped = on_stopped
+        self._wake.set()
+        self._thread = None
+        if not running and on_stopped:
+            on_stopped()
+
+    def set_request(self, reg_type, addresses, unit, group='default'):
+        """Set the 0-based addresses a group reads on every poll cycle.
+
+        The addresses are merged into as few reads as the protocol allows,
+        so scattered registers cost a handful of round trips.
+        """
+        self._requests[group] = (reg_type, frozenset(addresses), unit)
+
+    def remove_request(self, group):
+        """Stop reading a group, periodically or otherwise"""
+        self._requests.pop(group, None)
+        self._rates.pop(group, None)
+
+    def poll_once(self):
+        """Read every group's request once as soon as possible"""
+        self._pending_read = True
+        self._wake.set()
+
+    def start_polling(self, interval, group='default'):
+        """Read a group's request every ``interval`` seconds.
+
+        A group already polled at this interval keeps its schedule and
+        statistics.
+        """
+        rate = self._rates.get(group)
+        if rate is not None and rate.interval == interval:
+            return
+        self._rates[group] = RateGroup(interval)
+        self._wake.set()
+
+    def stop_polling(self, group=None):
+        """Stop periodic reads of one group, or all; queued jobs still run"""
+        if group is None:
+            self._rates = {}
+        else:
+            self._rates.pop(group, None)
+        self._wake.set()
+
+    @property
+    def polling(self):
+        return bool(self._rates)
+
+    def stats(self):
+        """Per-group schedule statistics, see RateGroup.stats"""
+        return {group: rate.stats() for group, rate in list(self._rates.items())}
+
+    def submit(self, func, *args, callback=None):
+        """Run ``func(*args)`` on the worker thread.
+
+        When ``callback`` is given, a JobResult is put on the results queue
+        once the call finishes so the GUI can handle it on the main thread.
+        """
+        self._jobs.put((func, args, callback))
+        self._wake.set()
+
+    def _run(self):
+        try:
+            self._poll_loop()
+        finally:
+            with self._exit_lock:
+                on_stopped, self._on_stopped = self._on_stopped, None
+                self._exited = True
+            if on_stopped:
+                on_stopped()
+
+    def _poll_loop(self):
+        while not self._stopping:
+            rates = list(self._rates.items())
+            timeout = None
+            if rates:
+                now = time.monotonic()
+                timeout = max(0.0, min(
+                    now if rate.next_due is None else rate.next_due for _, rate in rates
+                ) - now)
+            self._wake.wait(timeout)
+            self._wake.clear()
+            if self._stopping:
+                break
+
+            self._run_jobs()
+
+            if self._pending_read:
+                self._pending_read = False
+                for request in list(self._requests.values()):
+                    self._read_cycle(request)
+
+            for group, rate in list(self._rates.items()):
+                started = time.monotonic()
+                if not rate.due(started):
+                    continue
+                request = self._requests.get(group)
+                if request is not None:
+                    self._read_cycle(request)
+                rate.mark_run(started, time.monotonic())
+
+    def _run_jobs(self):
+        while True:
+            try:
+                func, args, callback = self._jobs.get_nowait()
+            except queue.Empty:
+                return
+            result = error = None
+            try:
+                result = func(*args)
+            except Exception as e:
+                error = e
+            if callback:
+                self.results.put(JobResult(callback, result, error))
+
+    def _read_cycle(self, request):
+        reg_type, addresses, unit = request
+        function_code = FUNCTION_CODES[reg_type]
+        timestamp = time.time()
+        try:
+            read = self.client.read_addresses({function_code: addresses}, unit, self.max_gap)
+            values = {address: value for (_, address), value in read.items()} or None
+        except Exception as e:
+            log.warning("Error reading registers: %s", e, extra={'unit': unit})
+            values = None
+        self.results.put(PollResult(reg_type, unit, timestamp, values))
+
+
+class PollTarget(RateGroup):
+    """A unit ID on a shared bus with its own register set and interval.
+
+    One unit may have several targets in different groups, e.g. fast
+    process values and slowly changing setpoints.
+
+    Args:
+        unit (int): Slave address
+        wanted (dict): Function code -> iterable of 0-based addresses
+        interval (float): Seconds between reads of this target
+        max_gap (int): Gap tolerance passed to the read planner
+        group (str): Name telling apart the targets of one unit
+    """
+
+    def __init__(self, unit, wanted, interval, max_gap=0, group='default'):
+        super().__init__(interval)
+        self.unit = unit
+        self.group = group
+        self.wanted = wanted
+        self.blocks = plan_poll(wanted, max_gap)
+
+
+class BusPoller:
+    """Round-robin poller for many unit IDs sharing one open client.
+
+    Create one poller per serial port or gateway connection so the bus
+    stays busy without reconnecting per device. Each completed target read
+    is put on ``results`` as a BusResult whose values map (function_code,
+    address) to value; ``values`` is None when the unit did not answer any
+    block.
+    """
+
+    def __init__(self, client, results=None):
+        self.client = client
+        self.results = results if results is not None else queue.Queue()
+        self._targets = {}
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread = None
+        self.reset_stats()
+
+    def add_target(self, target):
+        """Add or replace the poll target for ``target.unit`` and ``target.group``"""
+        self._targets[(target.unit, target.group)] = target
+        self._wake.set()
+
+    def remove_target(self, unit, group='default'):
+        self._targets.pop((unit, group), None)
+
+    def start(self):
+        """Start the poll thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="BusPoller")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self, wait=True):
+        """Stop the poll thread.
+
+        Args:
+            wait (bool): Wait for the thread to exit. It stops after the read
+                in progress, which can take the client's whole timeout and
+                retries; only once it has exited may the client be closed.
+        """
+        self._stopping = True
+        self._wake.set()
+        if wait and self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def reset_stats(self):
+        self._started = time.monotonic()
+        self._busy = 0.0
+        self._cycles = 0
+        self._last_cycle = None
+
+    def stats(self):
+        """Achieved cycle time and bus utilisation since the last reset.
+
+        Returns:
+            dict with ``cycles``, ``cycle_time`` (seconds for the last pass
+            over all due units), ``utilisation`` (0-1 share of wall time
+            spent in bus transactions) and ``units`` (unit -> group ->
+            schedule statistics, see RateGroup.stats)
+        """
+        elapsed = time.monotonic() - self._started
+        units = {}
+        for (unit, group), target in list(self._targets.items()):
+            units.setdefault(unit, {})[group] = target.stats()
+        return {
+            'cycles': self._cycles,
+            'cycle_time': self._last_cycle,
+            'utilisation': self._busy / elapsed if elapsed > 0 else 0.0,
+            'units': units,
+        }
+
+    def _run(self):
+        while not self._stopping:
+            targets = list(self._targets.values())
+            now = time.monotonic()
+            due = [t for t in targets if t.due(now)]
+            if not due:
+                timeout = min((t.next_due for t in targets), default=None)
+                if timeout is not None:
+                    timeout = max(0.0, timeout - now)
+                self._wake.wait(timeout)
+                self._wake.clear()
+                continue
+
+            cycle_start = time.monotonic()
+            for target in due:
+                if self._stopping:
+                    return
+                started = time.monotonic()
+                self._poll_target(target)
+                target.mark_run(started, time.monotonic())
+            self._cycles += 1
+            self._last_cycle = time.monotonic() - cycle_start
+
+    def _poll_target(self, target):
+        start = time.monotonic()
+        timestamp = time.time()
+        values = {}
+        answered = False
+        for block in target.blocks:
+            if self._stopping:
+                return
+            try:
+                block_values = self.client.read_block(block, target.unit)
+            except Exception as e:
+                log.warning("Error polling unit: %s", e, extra={'unit': target.unit})
+                block_values = None
+            if block_values is None:
+                continue
+            answered = True
+            for offset, value in enumerate(block_values):
+                values[(block.function_code, block.address + offset)] = value
+        self._busy += time.monotonic() - start
+        self.results.put(BusResult(target.unit, target.group, timestamp, values if answered else None))
@@ -0,0 +1,144 @@
+import threading
+import time
+from contextlib import contextmanager
+
+from client import ModbusToolClient
+
+
+class PoolExhausted(Exception):
+    """Raised when every pooled connection is in use and the pool is full"""
+
+
+# Settings that pick the connection, with ModbusToolClient's defaults
+TRANSPORT_SETTINGS = {
+    'tcp': {'host': 'localhost', 'port': 502},
+    'rtu': {'port': 502, 'baudrate': 9600, 'parity': 'N', 'bytesize': 8, 'stopbits': 1},
+}
+
+# Per-caller settings applied to the shared connection per request
+TIMING_SETTINGS = ('timeout', 'retries')
+
+
+class _PoolEntry:
+    def __init__(self, client):
+        self.client = client
+        self.users = 0
+        self.last_used = time.monotonic()
+        # Serialises (re)connects without holding the pool lock
+        self.connect_lock = threading.Lock()
+
+
+class ConnectionPool:
+    """Shared, health-checked ModbusToolClient connections.
+
+    Connections are keyed by transport settings (mode, host/port and serial
+    framing) so scans, live polling and one-off writes reuse the same socket
+    or serial handle instead of tearing it down and rebuilding it. Timeout
+    and retries are per caller: get() hands out a view of the shared client
+    that applies them per request.
+    """
+
+    def __init__(self, max_size=8, idle_timeout=300.0):
+        """Create a pool.
+
+        Args:
+            max_size (int): Maximum number of open connections
+            idle_timeout (float): Seconds an unused connection is kept open
+        """
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(mode='tcp', **settings):
+        """Pool key for a set of ModbusToolClient arguments"""
+        defaults = TRANSPORT_SETTINGS.get(mode, {})
+        return (mode,) + tuple((name, settings.get(name, default)) for name, default in defaults.items())
+
+    def get(self, mode='tcp', **settings):
+        """Get a connected client for the given settings.
+
+        Args:
+            mode (str): Connection mode ('tcp' or 'rtu')
+            **settings: Remaining ModbusToolClient arguments
+
+        Returns:
+            ModbusToolClient, or None if the connection could not be opened
+        """
+        key = self.key(mode, **settings)
+        with self._lock:
+            self._evict_idle()
+            entry = self._entries.get(key)
+            if entry is None:
+                if len(self._entries) >= self.max_size and not self._evict_lru():
+                    raise PoolExhausted(f"All {self.max_size} pooled connections are in use")
+                entry = _PoolEntry(ModbusToolClient(mode=mode, **settings))
+                self._entries[key] = entry
+            # Held while connecting so the entry is not evicted meanwhile
+            entry.users += 1
+            entry.last_used = time.monotonic()
+
+        # Health check: reopen connections that dropped since last use. A
+        # connect can take its whole timeout, so other callers are not held up.
+        with entry.connect_lock:
+            try:
+                connected = entry.client.is_connected() or entry.client.connect()
+            except Exception:
+                connected = False
+        if not connected:
+            with self._lock:
+                entry.users = max(0, entry.users - 1)
+                if not entry.users and self._entries.get(key) is entry:
+                    del self._entries[key]
+            return None
+
+        timing = {name: settings[name] for name in TIMING_SETTINGS if name in settings}
+        return entry.client.with_timing(**timing)
+
+    def put(self, client):
+        """Return a client obtained from get()"""
+        with self._lock:
+            for entry in self._entries.values():
+                if entry.client is client.base:
+                    entry.users = max(0, entry.users - 1)
+                    entry.last_used = time.monotonic()
+                    break
+            self._evict_idle()
+
+    @contextmanager
+    def connection(self, mode='tcp', **settings):
+        """Borrow a client for the duration of a with block"""
+        client = self.get(mode, **settings)
+        if client is None:
+            raise ConnectionError("Failed to connect to device")
+        try:
+            yield client
+        finally:
+            self.put(client)
+
+    def close_all(self):
+        """Close every pooled connection"""
+        with self._lock:
+            for entry in self._entries.values():
+                entry.client.close()
+            self._entries.clear()
+
+    def _evict_idle(self):
+        now = time.monotonic()
+        for key, entry in list(self._entries.items()):
+            if not entry.users and now - entry.last_used > self.idle_timeout:
+                entry.client.close()
+                del self._entries[key]
+
+    def _evict_lru(self):
+        idle = [(entry.last_used, key) for key, entry in self._entries.items() if not entry.users]
+        if not idle:
+            return False
+        _, key = min(idle)
+        self._entries.pop(key).client.close()
+        return True
+
+
+# Pool shared by the GUI and worker threads
+pool = ConnectionPool()
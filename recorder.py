@@ -0,0 +1,212 @@
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+FILE_MAGIC = b'MBTREC1\0'
+CHUNK_MAGIC = b'CHNK'
+
+# Chunk header: magic, record count, first and last timestamp
+CHUNK_HEADER = struct.Struct('<4sIdd')
+# Record: timestamp, channel, value
+RECORD = struct.Struct('<dId')
+RECORD_DTYPE = np.dtype([('t', '<f8'), ('channel', '<u4'), ('value', '<f8')])
+
+# Records per chunk and the longest a sample may wait before hitting disk
+CHUNK_RECORDS = 4096
+FLUSH_INTERVAL = 2.0
+
+
+def channel_key(unit, function_code, address):
+    """Pack unit ID, function code and 0-based address into one channel number"""
+    return (unit << 24) | (function_code << 16) | address
+
+
+def split_channel(channel):
+    """Inverse of channel_key: (unit, function_code, address)"""
+    return channel >> 24, (channel >> 16) & 0xFF, channel & 0xFFFF
+
+
+class Recorder:
+    """Background writer that appends polled samples to a chunked binary log.
+
+    Samples are queued by the caller and written on a dedicated thread. Each
+    chunk starts with a header holding its record count and time span, which
+    RecordingReader uses as a time index for random-access replay.
+    """
+
+    def __init__(self, path, chunk_records=CHUNK_RECORDS, flush_interval=FLUSH_INTERVAL):
+        self.path = path
+        self.chunk_records = chunk_records
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue()
+        self._thread = None
+
+    def start(self):
+        """Open the log and start the writer thread"""
+        new_file = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        self._file = open(self.path, 'ab')
+        if new_file:
+            self._file.write(FILE_MAGIC)
+        self._thread = threading.Thread(target=self._run, name="Recorder")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Write any buffered samples and close the log"""
+        if not self._thread:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+        self._file.close()
+
+    def record_many(self, timestamp, samples):
+        """Queue samples taken at one timestamp.
+
+        Args:
+            timestamp (float): Unix time of the read
+            samples (iterable): (channel, value) pairs
+        """
+        self._queue.put((timestamp, list(samples)))
+
+    def _run(self):
+        buffer = bytearray()
+        count = 0
+        first = last = None
+        deadline = time.monotonic() + self.flush_interval
+        stopping = False
+        while not stopping:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = ()
+            if item is None:
+                stopping = True
+            elif item:
+                timestamp, samples = item
+                for channel, value in samples:
+                    buffer += RECORD.pack(timestamp, channel, float(value))
+                count += len(samples)
+                if count:
+                    first = timestamp if first is None else first
+                    last = timestamp
+
+            if count and (stopping or count >= self.chunk_records or time.monotonic() >= deadline):
+                self._file.write(CHUNK_HEADER.pack(CHUNK_MAGIC, count, first, last))
+                self._file.write(buffer)
+                self._file.flush()
+                buffer = bytearray()
+                count = 0
+                first = last = None
+            if time.monotonic() >= deadline:
+                deadline = time.monotonic() + self.flush_interval
+
+
+class RecordingReader:
+    """Memory-mapped random-access reader for Recorder logs.
+
+    Opening a log only walks the chunk headers, so even multi-day captures
+    load quickly; records are read lazily as NumPy views over the mapping.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        if size < len(FILE_MAGIC):
+            raise ValueError(f"{path} is not a recording")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(FILE_MAGIC)] != FILE_MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a recording")
+        self._index = self._build_index(size)
+        self._starts = [chunk[2] for chunk in self._index]
+        self._ends = [chunk[3] for chunk in self._index]
+
+    def _build_index(self, size):
+        index = []
+        offset = len(FILE_MAGIC)
+        while offset + CHUNK_HEADER.size <= size:
+            magic, count, first, last = CHUNK_HEADER.unpack_from(self._map, offset)
+            data = offset + CHUNK_HEADER.size
+            # Stop at a truncated chunk left by an interrupted write
+            if magic != CHUNK_MAGIC or data + count * RECORD.size > size:
+                break
+            index.append((data, count, first, last))
+            offset = data + count * RECORD.size
+        return index
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    @property
+    def start_time(self):
+        return self._index[0][2] if self._index else None
+
+    @property
+    def end_time(self):
+        return self._index[-1][3] if self._index else None
+
+    def __len__(self):
+        return sum(chunk[1] for chunk in self._index)
+
+    def _span(self, start_time=None, end_time=None):
+        """Index entries of the chunks overlapping a time range"""
+        first = bisect_left(self._ends, start_time) if start_time is not None else 0
+        last = len(self._index)
+        if end_time is not None:
+            last = max(first, bisect_right(self._starts, end_time))
+        return self._index[first:last]
+
+    def _chunks(self, start_time=None, end_time=None, step=1):
+        for data, count, _, _ in self._span(start_time, end_time)[::step]:
+            yield np.frombuffer(self._map, dtype=RECORD_DTYPE, count=count, offset=data)
+
+    def count(self, start_time=None, end_time=None):
+        """Records in the chunks overlapping a time range, from the index alone"""
+        return sum(chunk[1] for chunk in self._span(start_time, end_time))
+
+    def split(self, start_time=None, end_time=None, max_records=None):
+        """Every channel's samples between two times, in one pass over the log.
+
+        Args:
+            start_time (float): First timestamp, or None for the start
+            end_time (float): Last timestamp, or None for the end
+            max_records (int): Read only every n-th chunk when the range
+                holds more records than this, for zoomed-out overviews
+
+        Returns:
+            dict of channel -> (times, values) NumPy arrays in time order
+        """
+        step = 1
+        if max_records:
+            step = max(1, -(-self.count(start_time, end_time) // max_records))
+        parts = list(self._chunks(start_time, end_time, step))
+        if not parts:
+            return {}
+        records = np.concatenate(parts)
+        if start_time is not None or end_time is not None:
+            low = start_time if start_time is not None else -np.inf
+            high = end_time if end_time is not None else np.inf
+            records = records[(records['t'] >= low) & (records['t'] <= high)]
+
+        # A stable sort on the channel keeps every channel's samples in time order
+        order = np.argsort(records['channel'], kind='stable')
+        channels = records['channel'][order]
+        times = records['t'][order]
+        values = records['value'][order]
+        bounds = np.flatnonzero(channels[1:] != channels[:-1]) + 1
+        starts = np.concatenate(([0], bounds))
+        ends = np.concatenate((bounds, [len(channels)]))
+        return {
+            int(channels[a]): (times[a:b], values[a:b])
+            for a, b in zip(starts, ends) if b > a
+        }
+
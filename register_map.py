@@ -0,0 +1,213 @@
+"""Typed register maps: engineering values decoded from raw 16-bit registers.
+
+A map file lists tags, each naming a value spread over one or more holding
+or input registers::
+
+    {
+        "word_order": "big",
+        "byte_order": "big",
+        "tags": [
+            {"name": "flow", "register": "holding", "address": 100,
+             "type": "float32", "units": "m3/h"},
+            {"name": "level", "register": "input", "address": 0,
+             "type": "int16", "scale": 0.1, "offset": -50, "units": "%"},
+            {"name": "energy", "register": "holding", "address": 200,
+             "type": "uint32", "word_order": "little", "units": "kWh"}
+        ]
+    }
+
+Addresses are 0-based. ``word_order`` and ``byte_order`` given at the top
+are the defaults for every tag; "big" is the Modbus convention of the most
+significant word and byte first. Values are ``raw * scale + offset``.
+"""
+import json
+from collections import namedtuple
+
+import numpy as np
+
+from client import FUNCTION_CODES
+
+# Big-endian dtype and register count per tag type
+TAG_TYPES = {
+    'uint16': ('>u2', 1),
+    'int16': ('>i2', 1),
+    'uint32': ('>u4', 2),
+    'int32': ('>i4', 2),
+    'float32': ('>f4', 2),
+    'uint64': ('>u8', 4),
+    'int64': ('>i8', 4),
+    'float64': ('>f8', 4),
+}
+
+ORDERS = ('big', 'little')
+
+# Only register reads carry typed values
+REGISTER_CODES = {name: FUNCTION_CODES[name] for name in ('holding', 'input')}
+
+Tag = namedtuple('Tag', [
+    'name', 'function_code', 'address', 'type', 'word_order', 'byte_order', 'scale', 'offset', 'units'
+])
+
+
+class _TagGroup:
+    """Tags sharing a function code, type and layout, decoded together.
+
+    Word order is applied by reading each tag's registers in reverse, byte
+    order by swapping the bytes of every register, so a whole group becomes
+    one gather, an optional byteswap and one frombuffer.
+    """
+
+    def __init__(self, function_code, tag_type, word_order, byte_order, tags):
+        dtype, words = TAG_TYPES[tag_type]
+        self.function_code = function_code
+        self.dtype = np.dtype(dtype)
+        self.words = words
+        self.swap_bytes = byte_order == 'little'
+        self.names = [tag.name for tag in tags]
+        self.addresses = np.array([tag.address for tag in tags], dtype=np.int64)
+        self.columns = np.arange(words)
+        if word_order == 'little':
+            self.columns = self.columns[::-1]
+        scale = np.array([tag.scale for tag in tags], dtype=np.float64)
+        offset = np.array([tag.offset for tag in tags], dtype=np.float64)
+        # Unscaled groups keep the raw integers, which float64 would round
+        self.scaled = bool(np.any(scale != 1.0) or np.any(offset != 0.0))
+        self.scale = scale
+        self.offset = offset
+
+    def decode(self, start, registers, present):
+        """Decode the tags whose registers were all read.
+
+        Args:
+            start (int): Address of ``registers[0]``
+            registers (ndarray): uint16 register values
+            present (ndarray): Bool mask of the registers actually read
+
+        Returns:
+            dict of tag name -> value
+        """
+        rel = self.addresses - start
+        inside = (rel >= 0) & (rel + self.words <= len(registers))
+        if not inside.any():
+            return {}
+        index = rel[inside, None] + self.columns
+        complete = present[index].all(axis=1)
+        index = index[complete]
+        inside[inside] = complete
+        if not len(index):
+            return {}
+
+        words = registers[index]
+        if self.swap_bytes:
+            words = words.byteswap()
+        values = np.frombuffer(words.astype('>u2').tobytes(), dtype=self.dtype)
+        if self.scaled:
+            values = values * self.scale[inside] + self.offset[inside]
+        names = [name for name, keep in zip(self.names, inside) if keep]
+        return dict(zip(names, values.tolist()))
+
+
+class RegisterMap:
+    """Tag definitions for one device, with vectorised decoding"""
+
+    def __init__(self, tags):
+        self.tags = {}
+        for tag in tags:
+            if tag.name in self.tags:
+                raise ValueError(f"Duplicate tag '{tag.name}'")
+            self.tags[tag.name] = tag
+
+        layouts = {}
+        for tag in self.tags.values():
+            key = (tag.function_code, tag.type, tag.word_order, tag.byte_order)
+            layouts.setdefault(key, []).append(tag)
+        self._groups = [_TagGroup(*key, group) for key, group in layouts.items()]
+
+    @classmethod
+    def load(cls, path):
+        """Read a map file; raises ValueError for an invalid definition"""
+        with open(path, 'r') as f:
+            definition = json.load(f)
+        return cls.from_dict(definition)
+
+    @classmethod
+    def from_dict(cls, definition):
+        word_order = definition.get('word_order', 'big')
+        byte_order = definition.get('byte_order', 'big')
+        return cls(parse_tag(spec, word_order, byte_order) for spec in definition.get('tags', []))
+
+    def __len__(self):
+        return len(self.tags)
+
+    def wanted(self):
+        """Function code -> set of 0-based addresses the tags occupy"""
+        wanted = {}
+        for tag in self.tags.values():
+            words = TAG_TYPES[tag.type][1]
+            wanted.setdefault(tag.function_code, set()).update(range(tag.address, tag.address + words))
+        return wanted
+
+    def decode(self, function_code, values):
+        """Decode every tag whose registers are all in a sparse read.
+
+        Args:
+            function_code (int): 3 or 4
+            values (dict): 0-based address -> raw register value
+
+        Returns:
+            dict of tag name -> engineering value
+        """
+        if not values:
+            return {}
+        addresses = np.fromiter(values.keys(), dtype=np.int64, count=len(values))
+        start = int(addresses.min())
+        registers = np.zeros(int(addresses.max()) - start + 1, dtype=np.uint16)
+        present = np.zeros(len(registers), dtype=bool)
+        registers[addresses - start] = np.fromiter(values.values(), dtype=np.uint16, count=len(values))
+        present[addresses - start] = True
+
+        decoded = {}
+        for group in self._groups:
+            if group.function_code == function_code:
+                decoded.update(group.decode(start, registers, present))
+        return decoded
+
+
+def parse_tag(spec, word_order='big', byte_order='big'):
+    """Build a Tag from one entry of a map file"""
+    name = spec.get('name')
+    if not name:
+        raise ValueError("Every tag needs a 'name'")
+    register = spec.get('register', 'holding')
+    if register not in REGISTER_CODES:
+        raise ValueError(f"Tag '{name}': register must be 'holding' or 'input'")
+    if 'address' not in spec:
+        raise ValueError(f"Tag '{name}' needs an 'address'")
+    tag_type = spec.get('type', 'uint16')
+    if tag_type not in TAG_TYPES:
+        raise ValueError(f"Tag '{name}': unknown type '{tag_type}'")
+    tag = Tag(
+        name=name,
+        function_code=REGISTER_CODES[register],
+        address=int(spec['address']),
+        type=tag_type,
+        word_order=spec.get('word_order', word_order),
+        byte_order=spec.get('byte_order', byte_order),
+        scale=float(spec.get('scale', 1.0)),
+        offset=float(spec.get('offset', 0.0)),
+        units=spec.get('units', ''),
+    )
+    if tag.word_order not in ORDERS or tag.byte_order not in ORDERS:
+        raise ValueError(f"Tag '{name}': word_order and byte_order must be 'big' or 'little'")
+    if not 0 <= tag.address <= 65536 - TAG_TYPES[tag_type][1]:
+        raise ValueError(f"Tag '{name}': address out of range")
+    return tag
+
+
+def format_tag(tag, value):
+    """Table text for a decoded value, e.g. ``flow = 12.5 m3/h``"""
+    if isinstance(value, float):
+        text = f"{value:.6g}"
+    else:
+        text = str(value)
+    return f"{tag.name} = {text} {tag.units}".rstrip()
@@ -0,0 +1,216 @@
+import tkinter as tk
+from tkinter import ttk
+
+# Table geometry used to work out how many rows are visible
+ROW_HEIGHT = 20
+HEADER_HEIGHT = 25
+
+
+def item_address(item):
+    """0-based address of a row item id"""
+    return int(item.split('_')[1])
+
+
+class RegisterTable(ttk.Frame):
+    """Virtual register table over a register map of up to 65536 entries.
+
+    Only the visible window of the map has rows; the scrollbar moves that
+    window over the map. Values read around the window are cached so polls
+    only touch changed cells. ``on_view_change`` is called after the window
+    moved or resized so the caller can re-point its reads.
+    """
+
+    def __init__(self, parent, pending, graphed, on_view_change):
+        """Create the table.
+
+        Args:
+            parent: Widget the table is packed into
+            pending (dict): Staged edits by row item id, shared with the caller
+            graphed (set): Register ids (1-based, as str) selected for the graph
+            on_view_change: Called without arguments when the window moved
+        """
+        super().__init__(parent)
+        self.pending = pending
+        self.graphed = graphed
+        self.on_view_change = on_view_change
+        self.view_start = 0
+        self.visible_rows = 20
+        self.map_size = 0
+        # Last value read per 0-based address around the visible window
+        self.row_values = {}
+        # Decoded tag text by the 0-based address the tag starts at
+        self.tag_values = {}
+
+        self.create_widgets()
+
+    def create_widgets(self):
+        ttk.Style(self).configure('Treeview', rowheight=ROW_HEIGHT)
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.on_scroll)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree = ttk.Treeview(
+            self,
+            columns=("address", "value", "new_value", "graph", "tag"),
+            show="headings",
+            height=20
+        )
+        self.tree.heading("address", text="Address")
+        self.tree.heading("value", text="Value")
+        self.tree.heading("new_value", text="New Value")
+        self.tree.heading("graph", text="Plot")
+        self.tree.heading("tag", text="Tag")
+        self.tree.column("address", width=100)
+        self.tree.column("value", width=100)
+        self.tree.column("new_value", width=100)
+        self.tree.column("graph", width=60)
+        self.tree.column("tag", width=220)
+        self.tree.tag_configure('checkbox_cell', background='#f0f0f0')
+        self.tree.tag_configure('modified', background='#E6F3FF')
+        self.tree.pack(fill=tk.BOTH, expand=True)
+
+        # Scrolling moves the window over the register map
+        self.tree.bind('<MouseWheel>', self.on_wheel)
+        self.tree.bind('<Button-4>', self.on_wheel)
+        self.tree.bind('<Button-5>', self.on_wheel)
+        self.tree.bind('<Configure>', self.on_resize)
+
+    def clear(self):
+        """Drop all rows and cached values and go back to the top"""
+        self.tree.delete(*self.tree.get_children())
+        self.row_values.clear()
+        self.tag_values.clear()
+        self.view_start = 0
+
+    def clear_tags(self):
+        """Drop the decoded tags, e.g. after loading another register map"""
+        self.tag_values.clear()
+        self.tree.delete(*self.tree.get_children())
+        self.render_rows()
+
+    def set_size(self, count):
+        """Browse the first ``count`` addresses of the map"""
+        self.map_size = count
+        self.view_start = max(0, min(self.view_start, count - self.visible_rows))
+        self.render_rows()
+
+    def prefetch_range(self):
+        """First and last (exclusive) address of the visible page and its prefetch"""
+        prefetch = self.visible_rows
+        first = max(0, self.view_start - prefetch)
+        last = min(self.map_size, self.view_start + self.visible_rows + prefetch)
+        return first, last
+
+    def row(self, index):
+        """Row values for a 0-based address"""
+        value = self.row_values.get(index, '')
+        # Keep a pending edit in the New Value column
+        new_value = self.pending.get(f"reg_{index}", value)
+        reg_id = str(index + 1)
+        checkbox_state = '☒' if reg_id in self.graphed else '☐'
+        return (index + 1, value, new_value, checkbox_state, self.tag_values.get(index, ''))
+
+    def refresh_row(self, index):
+        """Redraw one row if it is on screen"""
+        item_id = f"reg_{index}"
+        if self.view_start <= index < self.view_start + self.visible_rows and self.tree.exists(item_id):
+            self.tree.item(item_id, values=self.row(index))
+
+    def render_rows(self):
+        """Create rows for the visible window and drop the ones scrolled out"""
+        rows = self.tree
+        end = min(self.map_size, self.view_start + self.visible_rows)
+        visible = {f"reg_{index}" for index in range(self.view_start, end)}
+        stale = [item for item in rows.get_children() if item not in visible]
+        if stale:
+            rows.delete(*stale)
+        # Remaining rows are contiguous, so inserting by position keeps order
+        for pos, index in enumerate(range(self.view_start, end)):
+            item_id = f"reg_{index}"
+            if not rows.exists(item_id):
+                tags = ('modified',) if item_id in self.pending else ()
+                rows.insert("", pos, item_id, values=self.row(index), tags=tags)
+        self.update_scrollbar()
+
+    def update_scrollbar(self):
+        total = max(self.map_size, 1)
+        self.scrollbar.set(self.view_start / total, min(1.0, (self.view_start + self.visible_rows) / total))
+
+    def scroll_to(self, start):
+        """Move the visible window to start at a 0-based address"""
+        start = max(0, min(start, self.map_size - self.visible_rows))
+        if start == self.view_start:
+            return
+        self.view_start = start
+        self.render_rows()
+        self.on_view_change()
+
+    def on_scroll(self, *args):
+        """Scrollbar command: moveto fraction or scroll n units/pages"""
+        if args[0] == 'moveto':
+            self.scroll_to(int(float(args[1]) * self.map_size))
+        elif args[0] == 'scroll':
+            step = self.visible_rows if args[2] == 'pages' else 1
+            self.scroll_to(self.view_start + int(args[1]) * step)
+
+    def on_wheel(self, event):
+        """Scroll the register window with the mouse wheel"""
+        if event.num == 4 or event.delta > 0:
+            self.scroll_to(self.view_start - 3)
+        else:
+            self.scroll_to(self.view_start + 3)
+        return "break"
+
+    def on_resize(self, event):
+        """Match the number of rows to the table height"""
+        rows = max(1, (event.height - HEADER_HEIGHT) // ROW_HEIGHT)
+        if rows == self.visible_rows:
+            return
+        self.visible_rows = rows
+        self.view_start = max(0, min(self.view_start, self.map_size - rows))
+        self.render_rows()
+        self.on_view_change()
+
+    def show_values(self, values):
+        """Show freshly read values by 0-based address.
+
+        Returns:
+            list of addresses dropped from the cache; they must be reported
+            again when they scroll back in
+        """
+        for index, value in values.items():
+            # Only touch rows whose value changed since the last read
+            if index in self.row_values and self.row_values[index] == value:
+                continue
+            self.row_values[index] = value
+            self.refresh_row(index)
+
+        # Keep the cache bounded to the visible page and its prefetch
+        prefetch = self.visible_rows
+        if len(self.row_values) <= 4 * (self.visible_rows + 2 * prefetch):
+            return []
+        first = self.view_start - prefetch
+        last = self.view_start + self.visible_rows + prefetch
+        dropped = [i for i in self.row_values if not first <= i < last]
+        for i in dropped:
+            del self.row_values[i]
+        return dropped
+
+    def show_tags(self, register_map, function_code):
+        """Decode the map's tags from the cached registers in one pass"""
+        from register_map import format_tag
+
+        decoded = register_map.decode(function_code, self.row_values)
+        for name, value in decoded.items():
+            tag = register_map.tags[name]
+            text = format_tag(tag, value)
+            if self.tag_values.get(tag.address) == text:
+                continue
+            self.tag_values[tag.address] = text
+            self.refresh_row(tag.address)
+
+    def set_value(self, index, value):
+        """Show a value written by the user and clear its modified mark"""
+        self.row_values[index] = value
+        item = f"reg_{index}"
+        if self.tree.exists(item):
+            self.tree.set(item, 'value', str(value))
+            self.tree.item(item, tags=())
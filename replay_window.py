@@ -0,0 +1,122 @@
+import tkinter as tk
+from tkinter import ttk
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+from matplotlib.ticker import FuncFormatter
+
+from decimate import minmax_decimate
+from recorder import RecordingReader, split_channel
+
+# Channels plotted at once; larger captures show the first ones
+MAX_REPLAY_CHANNELS = 20
+
+# Seconds shown when a capture is opened, ending at its last sample
+INITIAL_SPAN = 6 * 60 * 60
+
+# Records read per redraw; wider views read every n-th chunk instead
+MAX_LOAD_RECORDS = 2000000
+
+# Milliseconds to wait after a pan or zoom before reading the new range
+RELOAD_DELAY = 200
+
+REGISTER_NAMES = {1: 'Coil', 2: 'Input', 3: 'Register', 4: 'Input Register'}
+
+
+class ReplayWindow(tk.Toplevel):
+    """Plot of a recording that reads only the visible time range.
+
+    Opening shows the last INITIAL_SPAN of the capture; panning and zooming
+    with the toolbar reads the new range through the chunk index, so
+    multi-day captures open without a pass over the whole file.
+    """
+
+    def __init__(self, parent, path):
+        super().__init__(parent)
+        self.title(f"Replay - {path}")
+        self.geometry("800x600")
+
+        self.reader = RecordingReader(path)
+        self.lines = {}
+        self.loaded = None
+        self.reload_job = None
+        self.create_widgets()
+        self.plot()
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    def create_widgets(self):
+        self.info_label = ttk.Label(self, text="")
+        self.info_label.pack(anchor=tk.W, padx=10, pady=5)
+
+        self.fig = Figure(figsize=(8, 6))
+        self.ax = self.fig.add_subplot(111)
+        self.canvas = FigureCanvasTkAgg(self.fig, master=self)
+        NavigationToolbar2Tk(self.canvas, self).update()
+        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+
+    def plot(self):
+        """Set up the axes and plot the most recent part of the capture"""
+        start = self.reader.start_time
+        if start is None:
+            self.info_label.config(text="Empty recording")
+            return
+        end = self.reader.end_time
+
+        self.ax.xaxis.set_major_formatter(
+            FuncFormatter(lambda t, pos: f"{(t - start) / 60:.1f}")
+        )
+        self.ax.set_xlabel('Time (minutes)')
+        self.ax.set_ylabel('Register Value')
+        self.ax.set_title('Recorded Register Values')
+        self.ax.grid(True, linestyle='--', alpha=0.7)
+        self.ax.set_xlim(max(start, end - INITIAL_SPAN), end)
+        self.load(*self.ax.get_xlim())
+        self.ax.callbacks.connect('xlim_changed', self.on_xlim_changed)
+        self.fig.tight_layout()
+        self.canvas.draw()
+
+    def load(self, xmin, xmax):
+        """Read and decimate every channel between two times"""
+        self.loaded = (xmin, xmax)
+        total = self.reader.count(xmin, xmax)
+        data = self.reader.split(xmin, xmax, max_records=MAX_LOAD_RECORDS)
+        buckets = max(1, int(self.ax.bbox.width))
+
+        for channel in sorted(data):
+            if channel not in self.lines and len(self.lines) < MAX_REPLAY_CHANNELS:
+                unit, function_code, address = split_channel(channel)
+                label = f"Unit {unit} {REGISTER_NAMES.get(function_code, 'FC')} {address + 1}"
+                # Recordings only hold changes, so each value holds until the next
+                self.lines[channel], = self.ax.plot([], [], label=label, drawstyle='steps-post')
+                self.ax.legend(loc='upper left')
+        for channel, line in self.lines.items():
+            times, values = data.get(channel, ((), ()))
+            if len(times):
+                times, values = minmax_decimate(times, values, buckets)
+            line.set_data(times, values)
+        self.ax.relim()
+        self.ax.autoscale(axis='y')
+
+        sampled = " (sampled, zoom in for every record)" if total > MAX_LOAD_RECORDS else ""
+        self.info_label.config(
+            text=f"{len(self.reader)} samples, {len(data)} channels in view{sampled}"
+        )
+
+    def on_xlim_changed(self, ax):
+        """Read the new range once the pan or zoom has settled"""
+        if self.reload_job:
+            self.after_cancel(self.reload_job)
+        self.reload_job = self.after(RELOAD_DELAY, self.reload)
+
+    def reload(self):
+        self.reload_job = None
+        xlim = self.ax.get_xlim()
+        if xlim == self.loaded:
+            return
+        self.load(*xlim)
+        self.canvas.draw_idle()
+
+    def on_close(self):
+        if self.reload_job:
+            self.after_cancel(self.reload_job)
+        self.reader.close()
+        self.destroy()
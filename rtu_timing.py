@@ -0,0 +1,53 @@
+# Above 19200 baud the spec fixes the inter-frame gap instead of scaling it
+FIXED_GAP_BAUDRATE = 19200
+FIXED_FRAME_GAP = 0.00175
+
+# FC03 probe for one register: request and worst-case (normal) reply sizes
+PROBE_REQUEST_BYTES = 8
+PROBE_REPLY_BYTES = 7
+
+# Identification request (FC43/14, one object id) and the largest RTU reply
+IDENTIFY_REQUEST_BYTES = 7
+IDENTIFY_REPLY_BYTES = 256
+
+# Slave processing time plus USB adapter latency allowed per transaction
+DEFAULT_TURNAROUND = 0.03
+
+
+def char_time(baudrate, bytesize=8, parity='N', stopbits=1):
+    """Seconds needed to send one character with the given framing"""
+    bits = 1 + bytesize + (0 if parity in ('N', 'none') else 1) + stopbits
+    return bits / float(baudrate)
+
+
+def frame_gap(baudrate, bytesize=8, parity='N', stopbits=1):
+    """Minimum silent interval (3.5 characters) between RTU frames"""
+    if baudrate > FIXED_GAP_BAUDRATE:
+        return FIXED_FRAME_GAP
+    return 3.5 * char_time(baudrate, bytesize, parity, stopbits)
+
+
+def transaction_time(request_bytes, reply_bytes, baudrate, bytesize=8, parity='N', stopbits=1,
+                     turnaround=DEFAULT_TURNAROUND):
+    """Worst-case time for one request/reply exchange on the line"""
+    chars = request_bytes + reply_bytes
+    return (chars * char_time(baudrate, bytesize, parity, stopbits)
+            + 2 * frame_gap(baudrate, bytesize, parity, stopbits)
+            + turnaround)
+
+
+def scan_timeout(baudrate, bytesize=8, parity='N', stopbits=1, turnaround=DEFAULT_TURNAROUND):
+    """Response timeout for a discovery probe at the given line settings"""
+    return transaction_time(PROBE_REQUEST_BYTES, PROBE_REPLY_BYTES, baudrate,
+                            bytesize, parity, stopbits, turnaround)
+
+
+def identify_timeout(baudrate, bytesize=8, parity='N', stopbits=1, turnaround=DEFAULT_TURNAROUND):
+    """Response timeout for a device identification request.
+
+    FC43 and FC17 replies carry vendor and model strings and can fill a
+    whole RTU frame, so the timeout allows for the largest reply rather
+    than the short FC03 probe reply.
+    """
+    return transaction_time(IDENTIFY_REQUEST_BYTES, IDENTIFY_REPLY_BYTES, baudrate,
+                            bytesize, parity, stopbits, turnaround)
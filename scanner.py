@@ -0,0 +1,199 @@
+from time import sleep
+
+from client import DEVICE_ID_BASIC, GarbledReplyError
+from pool import pool
+from rtu_timing import frame_gap, identify_timeout, scan_timeout
+
+# Timeout multiplier for the optional second pass over scan misses
+CONFIRM_TIMEOUT_FACTOR = 3
+
+# Attempts to open the port before a scan gives up
+CONNECT_ATTEMPTS = 3
+
+# Read Device Identification object ids -> identity fields
+DEVICE_ID_OBJECTS = {
+    0x00: 'vendor',
+    0x01: 'product_code',
+    0x02: 'revision',
+    0x03: 'vendor_url',
+    0x04: 'product_name',
+    0x05: 'model',
+}
+
+# Exception code for a category of device identification that is not supported
+ILLEGAL_DATA_VALUE = 0x03
+
+
+def connect_scan_client(port, line, timeout):
+    """Get the pooled client used for scanning"""
+    for attempt in range(CONNECT_ATTEMPTS):
+        # No pymodbus retries: a miss costs a single timeout
+        client = pool.get('rtu', port=port, timeout=timeout, retries=0, **line)
+        if client:
+            return client
+        sleep(1.0)  # Wait between retries
+    raise ConnectionError(f"Failed to connect to {port} after multiple attempts")
+
+
+def decode_text(data):
+    """Identification bytes as text, or hex when they are not printable"""
+    # Padding and the FC17 run indicator byte are not part of the text
+    text = data.strip(b'\x00\xff ').decode('latin-1')
+    return text if text.isascii() and text.isprintable() else data.hex()
+
+
+def device_identity(response):
+    """Identity fields of a successful Read Device Identification reply"""
+    return {
+        DEVICE_ID_OBJECTS[object_id]: decode_text(data)
+        for object_id, data in response.information.items()
+        if object_id in DEVICE_ID_OBJECTS and isinstance(data, bytes)
+    }
+
+
+def identify_unit(client, unit):
+    """Ask a unit what it is.
+
+    Read Device Identification (FC43) is tried first and Report Server ID
+    (FC17) when the unit rejects it. Any reply, exception responses and
+    garbled replies included, shows the unit is there, so devices that
+    reject register 0 are still found.
+
+    Returns:
+        dict of identity fields (empty if the unit identifies as nothing or
+        its replies were garbled), or None if it did not answer
+    """
+    try:
+        response = client.read_device_identification(unit)
+        if response is None:
+            return None
+        if response.isError() and getattr(response, 'exception_code', None) == ILLEGAL_DATA_VALUE:
+            # Only the basic category is implemented
+            basic = client.read_device_identification(unit, DEVICE_ID_BASIC)
+            if basic is not None:
+                response = basic
+        if not response.isError():
+            return device_identity(response)
+    except GarbledReplyError:
+        pass  # The unit answered; its FC17 reply may be shorter
+
+    try:
+        response = client.report_server_id(unit)
+    except GarbledReplyError:
+        response = None
+    if response is not None and not response.isError():
+        return {'server_id': decode_text(response.identifier), 'running': bool(response.status)}
+    return {}
+
+
+def probe_unit(client, unit, gap, id_timeout, fallback=False):
+    """Probe one slave address.
+
+    Presence is probed with Read Device Identification on the client's own
+    short timeout, so each silent address costs one scan timeout. Any reply
+    shows the unit is there, exception responses included, and so does a
+    reply garbled or cut short by that timeout. Only units that answered
+    without a complete identification are asked again through
+    identify_unit, waiting ``id_timeout`` for a full-length reply.
+
+    Args:
+        fallback (bool): Also try a holding register read when the unit is
+            silent on FC43, for devices that ignore unknown function codes
+
+    Returns:
+        dict of identity fields if it answered, else None
+    """
+    answered = False
+    try:
+        response = client.read_device_identification(unit)
+        if response is not None:
+            if not response.isError():
+                return device_identity(response)
+            answered = True
+        elif fallback:
+            # Any response, exception responses included, shows the unit is there
+            client.request(3, unit, 'read_holding_registers', address=0, count=1)
+            return {}
+    except GarbledReplyError:
+        answered = True
+    except Exception:
+        pass  # Skip errors for faster scanning
+
+    if not answered:
+        # Let a late reply clear the line before the next request
+        sleep(gap)
+        return None
+
+    try:
+        identity = identify_unit(client.with_timing(id_timeout, client.retries), unit)
+    except Exception:
+        identity = None  # The unit did answer the probe
+    return identity if identity is not None else {}
+
+
+def scan_rtu(port, line, units, confirm_misses=False, timeout=None,
+             on_found=None, on_progress=None, should_stop=None):
+    """Probe slave addresses on a serial line.
+
+    Args:
+        port (str): Serial port name
+        line (dict): baudrate, parity, bytesize and stopbits of the line
+        units (iterable): Slave addresses to probe, in order
+        confirm_misses (bool): Re-probe misses once with longer timeouts,
+            adding a holding register read for units that ignore FC43
+        timeout (float): Presence probe timeout, sized to the line when
+            None. Units that answer are identified with a timeout long
+            enough for a full-length reply.
+        on_found (callable): Called with (unit, identity) for each unit that
+            answers, see identify_unit
+        on_progress (callable): Called with (stage, unit, n, total) before
+            each probe; stage is 'scan' or 'confirm'
+        should_stop (callable): Returns True to abandon the scan
+
+    Returns:
+        list of the units that answered
+    """
+    units = list(units)
+    if timeout is None:
+        # Timeout sized to the character time of the configured line
+        timeout = scan_timeout(**line)
+    id_timeout = max(timeout, identify_timeout(**line))
+    gap = frame_gap(**line)
+    stopped = should_stop or (lambda: False)
+    found = []
+    misses = []
+
+    def probe(client, stage, unit, n, total):
+        if on_progress:
+            on_progress(stage, unit, n, total)
+        confirm = stage == 'confirm'
+        factor = CONFIRM_TIMEOUT_FACTOR if confirm else 1
+        identity = probe_unit(client, unit, gap, id_timeout * factor, fallback=confirm)
+        if identity is None:
+            return False
+        found.append(unit)
+        if on_found:
+            on_found(unit, identity)
+        return True
+
+    client = connect_scan_client(port, line, timeout)
+    try:
+        for n, unit in enumerate(units, 1):
+            if stopped():
+                break
+            if not probe(client, 'scan', unit, n, len(units)):
+                misses.append(unit)
+    finally:
+        pool.put(client)
+
+    # Re-probe misses once with a longer timeout to catch slow slaves
+    if misses and confirm_misses and not stopped():
+        client = connect_scan_client(port, line, timeout * CONFIRM_TIMEOUT_FACTOR)
+        try:
+            for n, unit in enumerate(misses, 1):
+                if stopped():
+                    break
+                probe(client, 'confirm', unit, n, len(misses))
+        finally:
+            pool.put(client)
+    return sorted(found)
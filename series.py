@@ -0,0 +1,108 @@
+from array import array
+from bisect import bisect_left, bisect_right
+
+# Default retention: 5 hours at a 1 s poll, 30 minutes at 100 ms
+DEFAULT_CAPACITY = 18000
+
+
+class RingSeries:
+    """Preallocated ring buffer of (timestamp, value) samples.
+
+    Every sample is written twice, at ``i`` and ``i + capacity``, so the
+    retained samples are always one contiguous slice and a window can be
+    handed to the plot as a memoryview without copying.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, max_age=None):
+        """Create a series.
+
+        Args:
+            capacity (int): Maximum number of samples kept
+            max_age (float): Seconds of history kept, or None for no limit
+        """
+        self.capacity = capacity
+        self.max_age = max_age
+        self._times = array('d', bytes(16 * capacity))
+        self._values = array('d', bytes(16 * capacity))
+        self._pos = 0
+        self._count = 0
+
+    def append(self, timestamp, value):
+        """Add a sample; timestamps must not go backwards"""
+        pos = self._pos
+        mirror = pos + self.capacity
+        self._times[pos] = self._times[mirror] = timestamp
+        self._values[pos] = self._values[mirror] = value
+        self._pos = (pos + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+
+    def clear(self):
+        self._pos = 0
+        self._count = 0
+
+    def _span(self):
+        """Start and end of the retained samples in the doubled arrays"""
+        end = self._pos + self.capacity
+        start = end - self._count
+        if self.max_age is not None and self._count:
+            newest = self._times[end - 1]
+            start = bisect_left(memoryview(self._times)[:end], newest - self.max_age, start)
+        return start, end
+
+    def __len__(self):
+        start, end = self._span()
+        return end - start
+
+    def window(self, start_time=None, end_time=None):
+        """Samples with start_time <= timestamp <= end_time.
+
+        Returns:
+            (times, values) memoryviews into the buffer. They are only valid
+            until the next append, so draw from them straight away.
+        """
+        start, end = self._span()
+        times = memoryview(self._times)
+        if start_time is not None:
+            start = bisect_left(times[:end], start_time, start)
+        if end_time is not None:
+            end = bisect_right(times[:end], end_time, start)
+        return times[start:end], memoryview(self._values)[start:end]
+
+    def latest(self):
+        """Most recent (timestamp, value), or None if empty"""
+        if not self._count:
+            return None
+        last = self._pos + self.capacity - 1
+        return self._times[last], self._values[last]
+
+
+class TimeSeriesStore:
+    """Per-register ring buffers sharing one retention policy"""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, max_age=None):
+        self.capacity = capacity
+        self.max_age = max_age
+        self._series = {}
+
+    def append(self, reg_id, timestamp, value):
+        series = self._series.get(reg_id)
+        if series is None:
+            series = self._series[reg_id] = RingSeries(self.capacity, self.max_age)
+        series.append(timestamp, value)
+
+    def series(self, reg_id):
+        """The RingSeries for a register, or None if it has no samples"""
+        return self._series.get(reg_id)
+
+    def discard(self, reg_id):
+        self._series.pop(reg_id, None)
+
+    def clear(self):
+        self._series.clear()
+
+    def __contains__(self, reg_id):
+        return reg_id in self._series
+
+    def __iter__(self):
+        return iter(self._series)
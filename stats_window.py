@@ -0,0 +1,99 @@
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+
+from metrics import transaction_stats
+
+# Milliseconds between table refreshes
+REFRESH_INTERVAL = 1000
+
+COLUMNS = (
+    ('unit', "Unit", 50),
+    ('function_code', "FC", 40),
+    ('count', "Requests", 70),
+    ('ok', "OK", 60),
+    ('timeout', "Timeouts", 70),
+    ('crc', "CRC", 50),
+    ('exception', "Exceptions", 110),
+    ('retries', "Retries", 60),
+    ('latency_mean', "Mean ms", 70),
+    ('latency_p50', "p50 ms", 70),
+    ('latency_p99', "p99 ms", 70),
+    ('latency_max', "Max ms", 70),
+)
+
+
+def format_exceptions(row):
+    """Exception count followed by the codes seen, e.g. '3 (02x2 0Bx1)'"""
+    if not row['exception']:
+        return "0"
+    codes = ' '.join(f"{code:02X}x{n}" for code, n in sorted(row['exception_codes'].items()))
+    return f"{row['exception']} ({codes})"
+
+
+class StatsWindow(tk.Toplevel):
+    """Live per-unit transaction statistics, slowest p99 first"""
+
+    def __init__(self, parent, stats=transaction_stats):
+        super().__init__(parent)
+        self.title("Bus Statistics")
+        self.geometry("900x400")
+        self.stats = stats
+        self.refresh_job = None
+
+        self.create_widgets()
+        self.refresh()
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    def create_widgets(self):
+        button_frame = ttk.Frame(self)
+        button_frame.pack(fill=tk.X, padx=10, pady=5)
+        ttk.Button(button_frame, text="Export", command=self.export).pack(side=tk.LEFT)
+        ttk.Button(button_frame, text="Reset", command=self.reset).pack(side=tk.LEFT, padx=5)
+
+        self.table = ttk.Treeview(self, columns=[c[0] for c in COLUMNS], show="headings")
+        for key, text, width in COLUMNS:
+            self.table.heading(key, text=text)
+            self.table.column(key, width=width, anchor=tk.CENTER)
+        self.table.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+
+    def refresh(self):
+        """Redraw the table from the current counters"""
+        rows = sorted(self.stats.snapshot().items(), key=lambda item: -item[1]['latency_p99'])
+        self.table.delete(*self.table.get_children())
+        for (unit, function_code), row in rows:
+            self.table.insert("", tk.END, values=(
+                unit,
+                function_code,
+                row['count'],
+                row['ok'],
+                row['timeout'],
+                row['crc'],
+                format_exceptions(row),
+                row['retries'],
+                f"{row['latency_mean'] * 1000:.1f}",
+                f"{row['latency_p50'] * 1000:.1f}",
+                f"{row['latency_p99'] * 1000:.1f}",
+                f"{row['latency_max'] * 1000:.1f}",
+            ))
+        self.refresh_job = self.after(REFRESH_INTERVAL, self.refresh)
+
+    def reset(self):
+        self.stats.reset()
+
+    def export(self):
+        path = filedialog.asksaveasfilename(
+            parent=self,
+            defaultextension=".csv",
+            filetypes=[("CSV", "*.csv"), ("JSON", "*.json")]
+        )
+        if not path:
+            return
+        try:
+            self.stats.export(path)
+        except OSError as e:
+            messagebox.showerror("Error", f"Cannot export statistics: {e}", parent=self)
+
+    def on_close(self):
+        if self.refresh_job:
+            self.after_cancel(self.refresh_job)
+        self.destroy()
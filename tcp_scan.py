@@ -0,0 +1,126 @@
+import asyncio
+import ipaddress
+
+from async_client import AsyncModbusToolClient
+
+# Gateway exception codes meaning the unit ID is not behind this gateway
+GATEWAY_EXCEPTIONS = (0x0A, 0x0B)
+
+
+async def _probe_unit(client, host, unit, limit, on_found):
+    """Probe one unit ID on an open connection; returns True if it answered"""
+    async with limit:
+        try:
+            result = await client.request(3, unit, 'read_holding_registers', address=0, count=1)
+        except Exception:
+            return False
+    # An exception response still proves the unit is there, unless the
+    # gateway is reporting that it could not reach it
+    if result.isError():
+        code = getattr(result, 'exception_code', None)
+        if code is None or code in GATEWAY_EXCEPTIONS:
+            return False
+    if on_found:
+        on_found(host, unit)
+    return True
+
+
+async def _probe_units(client, host, units, limit, on_found):
+    """Probe unit IDs one after another on one connection.
+
+    pymodbus serves one request at a time per connection, so probes sent
+    together would queue and a silent unit would eat the timeout of every
+    probe behind it. Sequential probes keep each timeout to its own request.
+    """
+    found = []
+    for unit in units:
+        if await _probe_unit(client, host, unit, limit, on_found):
+            found.append((host, unit))
+    return found
+
+
+async def _connect(host, port, units, timeout, limit):
+    """Open one scan connection; returns the client or None"""
+    client = AsyncModbusToolClient(host=host, port=port, timeout=timeout, retries=0)
+    # Silent unit IDs are expected; pymodbus would otherwise drop the
+    # connection after a few of them
+    client.client.set_max_no_responses(len(units))
+    async with limit:
+        try:
+            connected = await asyncio.wait_for(client.connect(), timeout)
+        except asyncio.TimeoutError:
+            connected = False
+    if not connected:
+        client.disconnect()
+        return None
+    return client
+
+
+async def _probe_host(host, port, units, timeout, limit, on_found, connections):
+    """Connect to one host and probe its unit IDs over several connections"""
+    clients = []
+    try:
+        # One connection first, so a host with nothing listening costs one attempt
+        first = await _connect(host, port, units, timeout, limit)
+        if first is None:
+            return []
+        clients.append(first)
+        more = await asyncio.gather(*(
+            _connect(host, port, units, timeout, limit) for _ in range(min(connections, len(units)) - 1)
+        ))
+        # Devices taking fewer connections refuse the rest
+        clients.extend(client for client in more if client is not None)
+
+        # Each connection works through an interleaved share of the unit IDs
+        shares = await asyncio.gather(*(
+            _probe_units(client, host, units[n::len(clients)], limit, on_found)
+            for n, client in enumerate(clients)
+        ))
+        return [device for share in shares for device in share]
+    finally:
+        for client in clients:
+            client.disconnect()
+
+
+async def scan_tcp(network, units=range(1, 248), port=502, concurrency=256, timeout=0.5, on_found=None,
+                   connections=None):
+    """Discover Modbus TCP devices across a range of hosts and unit IDs.
+
+    Probes on one connection run one at a time, so a host's unit IDs are
+    shared between several connections. By default every host gets an equal
+    share of ``concurrency`` as connections, up to one per unit ID: a single
+    gateway is probed in about one timeout, a /24 with one connection per
+    host. More connections finish sooner, but some gateways refuse them
+    (the scan keeps the ones accepted) or close their oldest connection
+    when a new one arrives, losing the probes in flight on it. Pass
+    ``connections`` to stay within such a device's limit.
+
+    Args:
+        network (str): Host address or CIDR range, e.g. '192.168.1.0/24'
+        units (iterable): Unit IDs probed on every host that accepts a connection
+        port (int): Modbus TCP port
+        concurrency (int): Maximum connects and probes in flight at once
+        timeout (float): Per-probe timeout in seconds
+        on_found (callable): Called with (host, unit) as each device answers
+        connections (int): Connections opened to each host, or None to
+            share ``concurrency`` between the hosts
+
+    Returns:
+        list of (host, unit) tuples sorted by host and unit
+    """
+    net = ipaddress.ip_network(network, strict=False)
+    hosts = [str(ip) for ip in net.hosts()] or [str(net.network_address)]
+    units = list(units)
+    if connections is None:
+        connections = max(1, concurrency // len(hosts))
+    limit = asyncio.Semaphore(concurrency)
+    results = await asyncio.gather(*(
+        _probe_host(host, port, units, timeout, limit, on_found, connections) for host in hosts
+    ))
+    found = [device for host_found in results for device in host_found]
+    return sorted(found, key=lambda d: (ipaddress.ip_address(d[0]), d[1]))
+
+
+def run_tcp_scan(network, **kwargs):
+    """Blocking wrapper around scan_tcp for use from worker threads"""
+    return asyncio.run(scan_tcp(network, **kwargs))
@@ -0,0 +1,51 @@
+import pytest
+
+from capture import RX, TX, FrameCapture, format_frame
+
+
+def filled(capture, count):
+    for i in range(count):
+        capture.add(TX if i % 2 == 0 else RX, 'COM1', bytes([i]))
+    return capture
+
+
+def test_since_returns_only_newer_frames():
+    capture = filled(FrameCapture(), 5)
+    assert [f.seq for f in capture.since()] == [0, 1, 2, 3, 4]
+    assert [f.seq for f in capture.since(2)] == [3, 4]
+    assert capture.since(4) == []
+    assert capture.since(10) == []
+
+
+def test_since_after_the_ring_dropped_frames():
+    capture = filled(FrameCapture(capacity=3), 5)
+    assert len(capture) == 3
+    # Frames 0 and 1 are gone; a reader that last saw 0 gets what is left
+    assert [f.seq for f in capture.since(0)] == [2, 3, 4]
+    assert [f.seq for f in capture.since(3)] == [4]
+
+
+def test_sequence_continues_after_clear():
+    capture = filled(FrameCapture(), 3)
+    capture.clear()
+    assert capture.since() == []
+    capture.add(TX, 'COM1', b'\x01')
+    assert [f.seq for f in capture.since(2)] == [3]
+
+
+def test_frames_keep_their_order_in_time():
+    capture = FrameCapture()
+    capture.add(TX, 'COM1', b'\x01\x03', counter=capture._counter_start + 1.0)
+    capture.add(RX, 'COM1', b'\x01\x83\x02', counter=capture._counter_start + 1.25)
+    tx, rx = capture.since()
+    assert rx.timestamp - tx.timestamp == pytest.approx(0.25)
+    assert format_frame(rx).endswith(" RX COM1 01 83 02")
+
+
+def test_dump(tmp_path):
+    capture = filled(FrameCapture(), 4)
+    path = tmp_path / 'frames.txt'
+    assert capture.dump(str(path)) == 4
+    lines = path.read_text().splitlines()
+    assert len(lines) == 4
+    assert lines[1].endswith(" RX COM1 01")
@@ -0,0 +1,49 @@
+import asyncio
+
+import pytest
+from pymodbus.exceptions import ModbusIOException
+from pymodbus.pdu import ExceptionResponse
+from pymodbus.pdu.register_message import ReadHoldingRegistersResponse
+
+from async_client import AsyncModbusToolClient
+from client import ModbusToolClient
+
+
+def reply(result):
+    """request() stand-in that answers every request with result"""
+    def request(function_code, unit, method, **kwargs):
+        if isinstance(result, Exception):
+            raise result
+        return result
+    return request
+
+
+RESULTS = [
+    (ReadHoldingRegistersResponse(registers=[1, 2]), [1, 2]),
+    # Illegal data address: the device answered, but with no values
+    (ExceptionResponse(3, 2), None),
+    (ModbusIOException("no response"), None),
+]
+
+
+@pytest.mark.parametrize('result, expected', RESULTS)
+def test_read(monkeypatch, result, expected):
+    client = ModbusToolClient(mode='tcp')
+    monkeypatch.setattr(client, 'request', reply(result))
+    assert client.read(3, 0, 2) == expected
+
+
+@pytest.mark.parametrize('result, expected', RESULTS)
+def test_async_read(monkeypatch, result, expected):
+    request = reply(result)
+
+    async def async_request(*args, **kwargs):
+        return request(*args, **kwargs)
+
+    async def read():
+        # The transport needs a running loop
+        client = AsyncModbusToolClient(mode='tcp')
+        monkeypatch.setattr(client, 'request', async_request)
+        return await client.read(3, 0, 2)
+
+    assert asyncio.run(read()) == expected
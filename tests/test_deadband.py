@@ -0,0 +1,71 @@
+from deadband import ChangeFilter
+
+
+def test_first_value_always_passes():
+    changes = ChangeFilter(absolute=10)
+    assert changes.filter(0.0, {'a': 1.0}) == {'a': 1.0}
+
+
+def test_absolute_deadband():
+    changes = ChangeFilter(absolute=1.0)
+    changes.filter(0.0, {'a': 10.0})
+    assert changes.filter(1.0, {'a': 11.0}) == {}
+    assert changes.filter(2.0, {'a': 11.5}) == {'a': 11.5}
+    # Compared with the last reported value, not the last received one
+    assert changes.filter(3.0, {'a': 12.0}) == {}
+
+
+def test_percent_deadband_scales_with_last_value():
+    changes = ChangeFilter(percent=10)
+    changes.filter(0.0, {'a': 100.0, 'b': -100.0})
+    assert changes.filter(1.0, {'a': 110.0, 'b': -89.0}) == {'b': -89.0}
+
+
+def test_larger_band_wins():
+    changes = ChangeFilter(absolute=5.0, percent=1.0)
+    changes.filter(0.0, {'a': 100.0})
+    assert changes.filter(1.0, {'a': 104.0}) == {}
+    assert changes.filter(2.0, {'a': 106.0}) == {'a': 106.0}
+
+
+def test_no_deadband_passes_every_change():
+    changes = ChangeFilter()
+    changes.filter(0.0, {'a': 1})
+    assert changes.filter(1.0, {'a': 1}) == {}
+    assert changes.filter(2.0, {'a': 2}) == {'a': 2}
+
+
+def test_per_key_deadband():
+    changes = ChangeFilter(absolute=10.0)
+    changes.set_deadband('b', absolute=0.5)
+    changes.filter(0.0, {'a': 0.0, 'b': 0.0})
+    assert changes.filter(1.0, {'a': 1.0, 'b': 1.0}) == {'b': 1.0}
+    changes.clear_deadband('b')
+    assert changes.deadband('b') == changes.default
+    assert changes.filter(2.0, {'b': 2.0}) == {}
+
+
+def test_refresh_resends_unchanged_values():
+    changes = ChangeFilter(absolute=1.0, refresh=10.0)
+    changes.filter(0.0, {'a': 5.0})
+    assert changes.filter(9.9, {'a': 5.0}) == {}
+    assert changes.filter(10.0, {'a': 5.0}) == {'a': 5.0}
+    # The refresh restarts the interval
+    assert changes.filter(15.0, {'a': 5.0}) == {}
+
+
+def test_forget_and_reset():
+    changes = ChangeFilter(absolute=1.0)
+    changes.filter(0.0, {'a': 1.0, 'b': 1.0})
+    changes.forget(['a'])
+    assert changes.filter(1.0, {'a': 1.0, 'b': 1.0}) == {'a': 1.0}
+    changes.reset()
+    assert changes.stats() == {'received': 0, 'passed': 0, 'suppressed': 0}
+    assert changes.filter(2.0, {'b': 1.0}) == {'b': 1.0}
+
+
+def test_stats_count_suppressed_values():
+    changes = ChangeFilter(absolute=1.0)
+    changes.filter(0.0, {'a': 1.0, 'b': 1.0})
+    changes.filter(1.0, {'a': 1.5, 'b': 3.0})
+    assert changes.stats() == {'received': 4, 'passed': 3, 'suppressed': 1}
@@ -0,0 +1,39 @@
+import numpy as np
+
+from decimate import minmax_decimate
+
+
+def test_short_lines_are_untouched():
+    x = np.arange(10.0)
+    y = np.sin(x)
+    dx, dy = minmax_decimate(x, y, 5)
+    assert dx is x and dy is y
+    assert minmax_decimate(x, y, 0)[1] is y
+
+
+def test_point_count_is_bounded():
+    x = np.arange(10000.0)
+    y = np.random.default_rng(1).normal(size=10000)
+    dx, dy = minmax_decimate(x, y, 100)
+    assert len(dx) == len(dy) <= 201
+
+
+def test_keeps_spikes_and_extremes():
+    x = np.arange(1000.0)
+    y = np.zeros(1000)
+    y[123] = 50.0
+    y[777] = -40.0
+    dx, dy = minmax_decimate(x, y, 10)
+    assert 50.0 in dy and -40.0 in dy
+    assert dx[list(dy).index(50.0)] == 123.0
+
+
+def test_points_stay_in_time_order_and_end_with_the_newest():
+    x = np.arange(1003.0)
+    y = np.cos(x / 7.0)
+    dx, dy = minmax_decimate(x, y, 20)
+    assert np.all(np.diff(dx) >= 0)
+    assert dx[0] == 0.0
+    assert dx[-1] == 1002.0 and dy[-1] == y[-1]
+    # Every point is a real sample
+    assert np.array_equal(dy, y[dx.astype(int)])
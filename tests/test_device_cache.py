@@ -0,0 +1,56 @@
+import json
+
+from device_cache import DeviceCache, describe
+
+LINE = dict(baudrate=9600, parity='N', bytesize=8, stopbits=1)
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / 'devices.json')
+    cache = DeviceCache(path)
+    cache.update('COM1', LINE, 2, {'vendor': 'Acme', 'model': 'PM5560'})
+    cache.update('COM1', LINE, 1, {})
+    cache.save()
+
+    loaded = DeviceCache(path)
+    assert loaded.load() == 2
+    assert [e['unit'] for e in loaded.known('COM1')] == [1, 2]
+    assert loaded.get('COM1', 2)['model'] == 'PM5560'
+    assert loaded.get('COM1', 2)['baudrate'] == 9600
+    assert not (tmp_path / 'devices.json.tmp').exists()
+
+
+def test_empty_identity_keeps_the_known_one(tmp_path):
+    cache = DeviceCache(str(tmp_path / 'devices.json'))
+    cache.update('COM1', LINE, 5, {'vendor': 'Acme'})
+    first_seen = cache.get('COM1', 5)['last_seen']
+    entry = cache.update('COM1', LINE, 5, {})
+    assert entry['vendor'] == 'Acme'
+    assert entry['last_seen'] >= first_seen
+
+
+def test_known_filters_by_port_and_line(tmp_path):
+    cache = DeviceCache(str(tmp_path / 'devices.json'))
+    cache.update('COM1', LINE, 1, {})
+    cache.update('COM1', dict(LINE, baudrate=19200), 2, {})
+    cache.update('COM2', LINE, 3, {})
+    assert [e['unit'] for e in cache.known('COM1')] == [1, 2]
+    assert [e['unit'] for e in cache.known('COM1', LINE)] == [1]
+    cache.remove('COM1', 1)
+    assert cache.known('COM1', LINE) == []
+
+
+def test_missing_or_broken_file_gives_an_empty_cache(tmp_path):
+    path = tmp_path / 'devices.json'
+    assert DeviceCache(str(path)).load() == 0
+    path.write_text('not json')
+    assert DeviceCache(str(path)).load() == 0
+    path.write_text(json.dumps({'devices': [{'unit': 1}]}))
+    assert DeviceCache(str(path)).load() == 0
+
+
+def test_describe():
+    assert describe(None) == ''
+    assert describe({'vendor': 'Acme', 'model': 'PM5560', 'product_code': 'X'}) == 'Acme PM5560'
+    assert describe({'product_code': 'X'}) == 'X'
+    assert describe({'server_id': '1234'}) == '1234'
@@ -0,0 +1,65 @@
+import json
+
+import pytest
+
+from metrics import CRC, EXCEPTION, OK, TIMEOUT, TransactionStats, _Counter
+
+
+def counter(latencies):
+    stats = TransactionStats()
+    for latency in latencies:
+        stats.record(1, 3, latency, OK)
+    return stats._counters[(1, 3)]
+
+
+def test_empty_counter_percentiles_are_zero():
+    assert _Counter().percentile(0.5) == 0.0
+    assert _Counter().percentile(0.99) == 0.0
+
+
+def test_percentile_is_the_upper_edge_of_its_bucket():
+    # 99 replies in the 0.5-1 ms bucket and one slow one
+    c = counter([0.0008] * 99 + [0.3])
+    assert c.percentile(0.5) == 0.001
+    assert c.percentile(0.99) == 0.001
+    # The slow reply's bucket ends at 0.5 s, past the slowest seen
+    assert c.percentile(1.0) == pytest.approx(0.3)
+
+
+def test_percentile_never_exceeds_the_maximum():
+    c = counter([0.0011, 0.0012])
+    assert c.percentile(0.5) == pytest.approx(0.0012)
+
+
+def test_latency_past_the_last_bucket_reports_the_maximum():
+    c = counter([0.01, 7.5])
+    assert c.buckets[-1] == 1
+    assert c.percentile(0.99) == 7.5
+
+
+def test_snapshot_and_totals():
+    stats = TransactionStats()
+    stats.record(1, 3, 0.004, OK)
+    stats.record(1, 3, 0.5, TIMEOUT, retries=2)
+    stats.record(1, 3, 0.01, EXCEPTION, exception_code=2)
+    stats.record(2, 4, 0.02, CRC)
+    row = stats.snapshot()[(1, 3)]
+    assert (row['count'], row['ok'], row['timeout'], row['exception']) == (3, 1, 1, 1)
+    assert row['retries'] == 2
+    assert row['exception_codes'] == {2: 1}
+    assert row['latency_mean'] == pytest.approx(0.514 / 3)
+    assert row['latency_max'] == 0.5
+    totals = stats.totals()
+    assert totals['count'] == 4
+    assert totals['crc'] == 1
+    assert totals['latency_p99'] == 0.5
+
+
+def test_export_json(tmp_path):
+    stats = TransactionStats()
+    stats.record(1, 3, 0.004, OK)
+    path = tmp_path / 'stats.json'
+    stats.export(str(path))
+    exported = json.loads(path.read_text())
+    assert exported['transactions'][0]['unit'] == 1
+    assert exported['transactions'][0]['latency_p50'] == 0.004
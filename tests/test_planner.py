@@ -0,0 +1,93 @@
+import pytest
+
+from client import (
+    MAX_READ_COUNT, MAX_WRITE_COUNT, ReadBlock, WriteBlock, plan_poll, plan_reads, plan_writes,
+    write_mismatches, write_requests,
+)
+
+
+def test_plan_reads_merges_contiguous_addresses():
+    assert plan_reads([3, 1, 2, 2], 3) == [ReadBlock(3, 1, 3)]
+
+
+def test_plan_reads_splits_on_gaps_without_tolerance():
+    assert plan_reads([0, 1, 5], 3) == [ReadBlock(3, 0, 2), ReadBlock(3, 5, 1)]
+
+
+def test_plan_reads_bridges_gaps_within_max_gap():
+    assert plan_reads([0, 1, 5], 3, max_gap=3) == [ReadBlock(3, 0, 6)]
+    assert plan_reads([0, 1, 5], 3, max_gap=2) == [ReadBlock(3, 0, 2), ReadBlock(3, 5, 1)]
+
+
+@pytest.mark.parametrize('function_code', sorted(MAX_READ_COUNT))
+def test_plan_reads_respects_protocol_limit(function_code):
+    limit = MAX_READ_COUNT[function_code]
+    blocks = plan_reads(range(limit + 1), function_code)
+    assert blocks == [ReadBlock(function_code, 0, limit), ReadBlock(function_code, limit, 1)]
+
+
+def test_plan_reads_gap_does_not_stretch_past_limit():
+    limit = MAX_READ_COUNT[3]
+    blocks = plan_reads([0, limit - 1, limit + 1], 3, max_gap=limit)
+    assert blocks == [ReadBlock(3, 0, limit), ReadBlock(3, limit + 1, 1)]
+    assert all(block.count <= limit for block in blocks)
+
+
+def test_plan_reads_rejects_bad_input():
+    with pytest.raises(ValueError):
+        plan_reads([0], 5)
+    with pytest.raises(ValueError):
+        plan_reads([0x10000], 3)
+    with pytest.raises(ValueError):
+        plan_reads([-1], 3)
+
+
+def test_plan_reads_empty():
+    assert plan_reads([], 1) == []
+
+
+def test_plan_poll_orders_by_function_code_and_address():
+    wanted = {4: [10, 11], 1: [7, 0], 3: [200, 100]}
+    assert plan_poll(wanted, max_gap=0) == [
+        ReadBlock(1, 0, 1),
+        ReadBlock(1, 7, 1),
+        ReadBlock(3, 100, 1),
+        ReadBlock(3, 200, 1),
+        ReadBlock(4, 10, 2),
+    ]
+
+
+def test_plan_poll_applies_max_gap_per_function_code():
+    assert plan_poll({3: [0, 4], 4: [0, 4]}, max_gap=3) == [ReadBlock(3, 0, 5), ReadBlock(4, 0, 5)]
+
+
+def test_plan_writes_groups_contiguous_runs():
+    values = {5: 50, 1: 10, 2: 20, 3: 30}
+    assert plan_writes(values, 16) == [WriteBlock(16, 1, [10, 20, 30]), WriteBlock(16, 5, [50])]
+
+
+@pytest.mark.parametrize('function_code', sorted(MAX_WRITE_COUNT))
+def test_plan_writes_respects_protocol_limit(function_code):
+    limit = MAX_WRITE_COUNT[function_code]
+    values = {addr: addr % 2 for addr in range(limit + 2)}
+    blocks = plan_writes(values, function_code)
+    assert [(block.address, len(block.values)) for block in blocks] == [(0, limit), (limit, 2)]
+    assert [v for block in blocks for v in block.values] == [values[a] for a in sorted(values)]
+
+
+def test_plan_writes_rejects_read_codes():
+    with pytest.raises(ValueError):
+        plan_writes({0: 1}, 3)
+
+
+def test_write_requests_send_single_values_as_fc05_fc06():
+    assert write_requests({0: 1, 1: 2, 9: 3}, 16) == [WriteBlock(16, 0, [1, 2]), WriteBlock(6, 9, [3])]
+    assert write_requests({4: True}, 15) == [WriteBlock(5, 4, [True])]
+
+
+def test_write_mismatches():
+    written = {0: 1, 1: 2, 2: 3}
+    read = {(3, 0): 1, (3, 1): 7}
+    assert sorted(write_mismatches(16, written, read)) == [1, 2]
+    # Coils compare as booleans
+    assert write_mismatches(15, {0: 1, 1: 0}, {(1, 0): True, (1, 1): False}) == []
@@ -0,0 +1,96 @@
+import pytest
+
+from client import ReadBlock
+from poller import BusPoller, PollTarget, PollWorker, RateGroup
+
+
+def test_first_call_starts_the_grid():
+    group = RateGroup(1.0)
+    assert group.due(100.0)
+    assert group.next_due == 100.0
+
+
+def test_slots_stay_on_the_grid():
+    group = RateGroup(1.0)
+    group.due(0.0)
+    group.mark_run(0.0, 0.2)
+    assert group.next_due == 1.0
+    assert not group.due(0.9)
+    # A late start does not shift later slots
+    group.mark_run(1.3, 1.5)
+    assert group.next_due == 2.0
+    assert group.stats()['skipped'] == 0
+
+
+def test_overrun_skips_missed_slots():
+    group = RateGroup(1.0)
+    group.due(0.0)
+    group.mark_run(0.0, 3.5)
+    stats = group.stats()
+    assert group.next_due == 4.0
+    assert stats['overruns'] == 1
+    assert stats['skipped'] == 3
+
+
+def test_run_ending_on_the_next_slot_is_not_an_overrun():
+    group = RateGroup(1.0)
+    group.due(0.0)
+    group.mark_run(0.0, 1.0)
+    assert group.next_due == 1.0
+    assert group.stats()['overruns'] == 0
+
+
+def test_skips_accumulate():
+    group = RateGroup(0.5)
+    group.due(0.0)
+    group.mark_run(0.0, 1.2)
+    group.mark_run(1.5, 1.7)
+    group.mark_run(2.0, 2.6)
+    stats = group.stats()
+    assert stats['runs'] == 3
+    assert stats['overruns'] == 2
+    assert stats['skipped'] == 3
+    assert group.next_due == 3.0
+
+
+def test_jitter_statistics():
+    group = RateGroup(1.0)
+    group.due(0.0)
+    group.mark_run(0.1, 0.2)
+    group.mark_run(1.3, 1.4)
+    stats = group.stats()
+    assert stats['jitter_mean'] == pytest.approx(0.2)
+    assert stats['jitter_max'] == pytest.approx(0.3)
+    assert stats['jitter_std'] == pytest.approx(0.1)
+
+
+def test_poll_target_plans_its_reads():
+    target = PollTarget(5, {3: [0, 1, 2], 1: [4]}, 0.5)
+    assert target.unit == 5
+    assert target.blocks == [ReadBlock(1, 4, 1), ReadBlock(3, 0, 3)]
+
+
+def test_poll_targets_of_one_unit_are_kept_per_group():
+    poller = BusPoller(client=None)
+    poller.add_target(PollTarget(1, {3: [0]}, 1.0))
+    poller.add_target(PollTarget(1, {3: [100]}, 30.0, group='setpoints'))
+    poller.add_target(PollTarget(1, {3: [0, 1]}, 0.5))
+    stats = poller.stats()['units']
+    assert sorted(stats[1]) == ['default', 'setpoints']
+    assert stats[1]['default']['interval'] == 0.5
+    poller.remove_target(1, 'setpoints')
+    assert list(poller.stats()['units'][1]) == ['default']
+
+
+def test_restarting_a_group_at_the_same_rate_keeps_its_schedule():
+    worker = PollWorker(client=None)
+    worker.start_polling(1.0, group='graph')
+    rate = worker._rates['graph']
+    rate.due(0.0)
+    rate.mark_run(0.1, 0.2)
+    worker.start_polling(1.0, group='graph')
+    assert worker.stats()['graph']['runs'] == 1
+    worker.start_polling(0.5, group='graph')
+    assert worker.stats()['graph']['runs'] == 0
+    worker.remove_request('graph')
+    assert not worker.polling
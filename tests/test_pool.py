@@ -0,0 +1,99 @@
+import pytest
+
+from client import ModbusToolClient
+from pool import ConnectionPool, PoolExhausted
+
+
+@pytest.fixture
+def connections(monkeypatch):
+    """Clients connect without a device; returns the clients closed so far"""
+    opened = set()
+    closed = []
+
+    def connect(self):
+        opened.add(self)
+        return True
+
+    def close(self):
+        opened.discard(self)
+        closed.append(self)
+
+    monkeypatch.setattr(ModbusToolClient, 'connect', connect)
+    monkeypatch.setattr(ModbusToolClient, 'is_connected', lambda self: self in opened)
+    monkeypatch.setattr(ModbusToolClient, 'close', close)
+    return closed
+
+
+def test_key_fills_transport_defaults():
+    assert ConnectionPool.key('tcp', host='10.0.0.1') == ConnectionPool.key('tcp', host='10.0.0.1', port=502)
+    assert ConnectionPool.key('rtu', port='COM1') == ConnectionPool.key('rtu', port='COM1', stopbits=1)
+    assert ConnectionPool.key('tcp', host='10.0.0.1') != ConnectionPool.key('tcp', host='10.0.0.2')
+
+
+def test_key_ignores_timing():
+    assert ConnectionPool.key('tcp', timeout=0.1, retries=0) == ConnectionPool.key('tcp', timeout=3)
+    assert ConnectionPool.key('rtu', port='COM1', baudrate=9600) != ConnectionPool.key('rtu', port='COM1', baudrate=19200)
+
+
+def test_callers_share_one_connection_with_their_own_timing(connections):
+    pool = ConnectionPool()
+    gui = pool.get('tcp', host='10.0.0.1', timeout=3)
+    scan = pool.get('tcp', host='10.0.0.1', timeout=0.05, retries=0)
+    assert scan.base is gui.base
+    assert (gui.timeout, scan.timeout, scan.retries) == (3, 0.05, 0)
+    pool.put(gui)
+    pool.put(scan)
+
+
+def test_dropped_connection_is_reopened(connections, monkeypatch):
+    pool = ConnectionPool()
+    client = pool.get('tcp', host='10.0.0.1')
+    pool.put(client)
+    monkeypatch.setattr(ModbusToolClient, 'is_connected', lambda self: False)
+    reconnects = []
+    monkeypatch.setattr(ModbusToolClient, 'connect', lambda self: reconnects.append(self) or True)
+    assert pool.get('tcp', host='10.0.0.1').base is client.base
+    assert reconnects == [client.base]
+
+
+def test_failed_connect_leaves_no_entry(connections, monkeypatch):
+    monkeypatch.setattr(ModbusToolClient, 'connect', lambda self: False)
+    pool = ConnectionPool(max_size=1)
+    assert pool.get('tcp', host='10.0.0.1') is None
+    monkeypatch.setattr(ModbusToolClient, 'connect', lambda self: True)
+    assert pool.get('tcp', host='10.0.0.2') is not None
+
+
+def test_least_recently_used_idle_connection_is_evicted(connections):
+    pool = ConnectionPool(max_size=2)
+    first = pool.get('tcp', host='10.0.0.1')
+    second = pool.get('tcp', host='10.0.0.2')
+    pool.put(first)
+    pool.put(second)
+    pool.get('tcp', host='10.0.0.3')
+    assert connections == [first.base]
+
+
+def test_full_pool_of_busy_connections_raises(connections):
+    pool = ConnectionPool(max_size=1)
+    pool.get('tcp', host='10.0.0.1')
+    with pytest.raises(PoolExhausted):
+        pool.get('tcp', host='10.0.0.2')
+
+
+def test_idle_connections_time_out(connections):
+    pool = ConnectionPool(idle_timeout=0.0)
+    client = pool.get('tcp', host='10.0.0.1')
+    assert connections == []
+    pool.put(client)
+    assert connections == [client.base]
+
+
+def test_connection_context_returns_the_client(connections):
+    pool = ConnectionPool(max_size=1)
+    with pool.connection('tcp', host='10.0.0.1'):
+        pass
+    # Returned and idle, so it can make room for another
+    pool.get('tcp', host='10.0.0.2')
+    pool.close_all()
+    assert len(connections) == 2
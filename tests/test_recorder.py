@@ -0,0 +1,126 @@
+import os
+
+import numpy as np
+import pytest
+
+from recorder import (
+    CHUNK_HEADER, FILE_MAGIC, RECORD, Recorder, RecordingReader, channel_key, split_channel,
+)
+
+A = channel_key(1, 3, 0)
+B = channel_key(2, 4, 65535)
+
+
+def record(path, samples, chunk_records=4):
+    """Write (timestamp, [(channel, value), ...]) samples through a Recorder"""
+    recorder = Recorder(str(path), chunk_records=chunk_records, flush_interval=60)
+    recorder.start()
+    for timestamp, values in samples:
+        recorder.record_many(timestamp, values)
+    recorder.stop()
+
+
+@pytest.fixture
+def recording(tmp_path):
+    path = tmp_path / 'capture.rec'
+    # Two records per timestamp, so every chunk of four holds two timestamps
+    record(path, [(float(t), [(A, t), (B, -t)]) for t in range(10)])
+    return path
+
+
+def test_channel_key_round_trip():
+    assert split_channel(channel_key(247, 4, 65535)) == (247, 4, 65535)
+    assert split_channel(A) == (1, 3, 0)
+
+
+def test_reader_indexes_chunks(recording):
+    reader = RecordingReader(str(recording))
+    try:
+        assert len(reader) == 20
+        assert reader.start_time == 0.0
+        assert reader.end_time == 9.0
+        assert sorted(reader.split()) == [A, B]
+    finally:
+        reader.close()
+
+
+def test_split_limits_to_time_range(recording):
+    reader = RecordingReader(str(recording))
+    try:
+        split = reader.split(2.0, 6.0)
+        assert sorted(split) == [A, B]
+        times, values = split[A]
+        assert list(times) == [2.0, 3.0, 4.0, 5.0, 6.0]
+        assert list(values) == [2.0, 3.0, 4.0, 5.0, 6.0]
+        assert np.array_equal(split[B][0], times)
+        assert list(split[B][1]) == [-2.0, -3.0, -4.0, -5.0, -6.0]
+        # Only the chunks overlapping the range are counted
+        assert reader.count(2.0, 6.0) == 12
+    finally:
+        reader.close()
+
+
+def test_split_samples_chunks_over_budget(recording):
+    reader = RecordingReader(str(recording))
+    try:
+        assert reader.count() == 20
+        split = reader.split(max_records=10)
+        # Every second chunk of four records
+        assert list(split[A][0]) == [0.0, 1.0, 4.0, 5.0, 8.0, 9.0]
+    finally:
+        reader.close()
+
+
+def test_truncated_chunk_is_ignored(recording):
+    size = os.path.getsize(recording)
+    # Cut the last chunk (two records) short, as an interrupted write would
+    with open(recording, 'r+b') as f:
+        f.truncate(size - RECORD.size)
+    reader = RecordingReader(str(recording))
+    try:
+        assert len(reader) == 16
+        assert reader.end_time == 7.0
+        assert list(reader.split()[B][1]) == [-float(t) for t in range(8)]
+    finally:
+        reader.close()
+
+
+def test_truncated_header_is_ignored(recording):
+    with open(recording, 'ab') as f:
+        f.write(CHUNK_HEADER.pack(b'CHNK', 4, 10.0, 11.0)[:CHUNK_HEADER.size - 1])
+    reader = RecordingReader(str(recording))
+    try:
+        assert len(reader) == 20
+        assert reader.end_time == 9.0
+    finally:
+        reader.close()
+
+
+def test_recording_appends_to_an_existing_file(recording):
+    record(recording, [(20.0, [(A, 20)])])
+    reader = RecordingReader(str(recording))
+    try:
+        assert len(reader) == 21
+        assert reader.end_time == 20.0
+    finally:
+        reader.close()
+
+
+def test_empty_recording(tmp_path):
+    path = tmp_path / 'empty.rec'
+    path.write_bytes(FILE_MAGIC)
+    reader = RecordingReader(str(path))
+    try:
+        assert len(reader) == 0
+        assert reader.start_time is None
+        assert reader.split() == {}
+        assert reader.count() == 0
+    finally:
+        reader.close()
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / 'other.rec'
+    path.write_bytes(b'not a recording')
+    with pytest.raises(ValueError):
+        RecordingReader(str(path))
@@ -0,0 +1,116 @@
+import struct
+
+import pytest
+
+from register_map import RegisterMap, format_tag, parse_tag
+
+
+def words(fmt, value):
+    """Big-endian register values of a packed value"""
+    data = struct.pack('>' + fmt, value)
+    return [int.from_bytes(data[i:i + 2], 'big') for i in range(0, len(data), 2)]
+
+
+def block(start, registers):
+    """Sparse read of a contiguous run of registers"""
+    return {start + i: value for i, value in enumerate(registers)}
+
+
+def single_tag_map(tag_type, word_order='big', byte_order='big', **extra):
+    return RegisterMap.from_dict({
+        'word_order': word_order,
+        'byte_order': byte_order,
+        'tags': [dict(name='value', register='holding', address=10, type=tag_type, **extra)],
+    })
+
+
+@pytest.mark.parametrize('tag_type, fmt, value', [
+    ('uint16', 'H', 65535),
+    ('int16', 'h', -2),
+    ('uint32', 'I', 0xDEADBEEF),
+    ('int32', 'i', -123456),
+    ('float32', 'f', 12.5),
+    ('uint64', 'Q', 2 ** 63 + 5),
+    ('int64', 'q', -(2 ** 40)),
+    ('float64', 'd', -1.0e100),
+])
+def test_big_endian_types(tag_type, fmt, value):
+    assert single_tag_map(tag_type).decode(3, block(10, words(fmt, value))) == {'value': value}
+
+
+def test_little_word_order_reverses_registers():
+    registers = words('I', 0x12345678)[::-1]
+    assert single_tag_map('uint32', word_order='little').decode(3, block(10, registers)) == {'value': 0x12345678}
+
+
+def test_little_byte_order_swaps_each_register():
+    registers = [0x3412, 0x7856]
+    assert single_tag_map('uint32', byte_order='little').decode(3, block(10, registers)) == {'value': 0x12345678}
+
+
+def test_both_orders_little():
+    registers = [0x7856, 0x3412]
+    tag_map = single_tag_map('uint32', word_order='little', byte_order='little')
+    assert tag_map.decode(3, block(10, registers)) == {'value': 0x12345678}
+
+
+def test_tag_overrides_map_default_order():
+    tag_map = RegisterMap.from_dict({
+        'word_order': 'little',
+        'tags': [
+            {'name': 'a', 'address': 0, 'type': 'uint32'},
+            {'name': 'b', 'address': 2, 'type': 'uint32', 'word_order': 'big'},
+        ],
+    })
+    assert tag_map.decode(3, block(0, [0x0002, 0x0001, 0x0001, 0x0002])) == {'a': 0x00010002, 'b': 0x00010002}
+
+
+def test_scale_and_offset():
+    tag_map = single_tag_map('int16', scale=0.1, offset=-50)
+    assert tag_map.decode(3, block(10, words('h', 600))) == {'value': pytest.approx(10.0)}
+
+
+def test_decode_skips_tags_outside_the_read():
+    tag_map = single_tag_map('uint32')
+    # Only the first register of the tag was read
+    assert tag_map.decode(3, block(9, [0, 1])) == {}
+    assert tag_map.decode(4, block(10, [0, 1])) == {}
+
+
+def test_decode_needs_every_register_of_a_tag():
+    tag_map = single_tag_map('uint32')
+    assert tag_map.decode(3, {10: 0x0001, 11: 0x0002}) == {'value': 0x00010002}
+    assert tag_map.decode(3, {10: 0x0001, 12: 0x0002}) == {}
+    assert tag_map.decode(3, {}) == {}
+
+
+def test_wanted_covers_every_register():
+    tag_map = RegisterMap.from_dict({'tags': [
+        {'name': 'flow', 'address': 100, 'type': 'float32'},
+        {'name': 'level', 'register': 'input', 'address': 0, 'type': 'int16'},
+    ]})
+    assert tag_map.wanted() == {3: {100, 101}, 4: {0}}
+
+
+@pytest.mark.parametrize('spec', [
+    {'address': 0},
+    {'name': 'x'},
+    {'name': 'x', 'address': 0, 'type': 'float16'},
+    {'name': 'x', 'address': 0, 'register': 'coils'},
+    {'name': 'x', 'address': 0, 'word_order': 'middle'},
+    {'name': 'x', 'address': 65535, 'type': 'uint32'},
+])
+def test_parse_tag_rejects_invalid_specs(spec):
+    with pytest.raises(ValueError):
+        parse_tag(spec)
+
+
+def test_duplicate_tag_names_are_rejected():
+    with pytest.raises(ValueError):
+        RegisterMap.from_dict({'tags': [{'name': 'x', 'address': 0}, {'name': 'x', 'address': 1}]})
+
+
+def test_format_tag():
+    tag = parse_tag({'name': 'flow', 'address': 0, 'type': 'float32', 'units': 'm3/h'})
+    assert format_tag(tag, 12.5) == 'flow = 12.5 m3/h'
+    assert format_tag(parse_tag({'name': 'count', 'address': 0}), 7) == 'count = 7'
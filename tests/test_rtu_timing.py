@@ -0,0 +1,48 @@
+import pytest
+
+from rtu_timing import (
+    DEFAULT_TURNAROUND, FIXED_FRAME_GAP, IDENTIFY_REPLY_BYTES, IDENTIFY_REQUEST_BYTES, PROBE_REPLY_BYTES,
+    PROBE_REQUEST_BYTES, char_time, frame_gap, identify_timeout, scan_timeout, transaction_time,
+)
+
+
+def test_char_time_counts_start_parity_and_stop_bits():
+    assert char_time(9600) == pytest.approx(10 / 9600)
+    assert char_time(9600, parity='E') == pytest.approx(11 / 9600)
+    assert char_time(9600, parity='none') == pytest.approx(10 / 9600)
+    assert char_time(19200, bytesize=7, parity='O', stopbits=2) == pytest.approx(11 / 19200)
+
+
+def test_frame_gap_is_three_and_a_half_characters():
+    assert frame_gap(9600) == pytest.approx(3.5 * 10 / 9600)
+    assert frame_gap(19200, parity='E') == pytest.approx(3.5 * 11 / 19200)
+
+
+@pytest.mark.parametrize('baudrate', [38400, 115200])
+def test_frame_gap_is_fixed_above_19200_baud(baudrate):
+    assert frame_gap(baudrate) == FIXED_FRAME_GAP
+
+
+def test_transaction_time():
+    expected = 15 * char_time(9600) + 2 * frame_gap(9600) + 0.01
+    assert transaction_time(8, 7, 9600, turnaround=0.01) == pytest.approx(expected)
+
+
+def test_scan_timeout_fits_the_probe_exchange():
+    expected = transaction_time(PROBE_REQUEST_BYTES, PROBE_REPLY_BYTES, 9600)
+    assert scan_timeout(9600) == pytest.approx(expected)
+    assert scan_timeout(9600) > DEFAULT_TURNAROUND
+
+
+def test_scan_timeout_shrinks_with_baudrate():
+    timeouts = [scan_timeout(b) for b in (1200, 9600, 19200, 115200)]
+    assert timeouts == sorted(timeouts, reverse=True)
+    # Slower framing needs longer
+    assert scan_timeout(9600, parity='E', stopbits=2) > scan_timeout(9600)
+
+
+def test_identify_timeout_allows_a_full_frame():
+    expected = transaction_time(IDENTIFY_REQUEST_BYTES, IDENTIFY_REPLY_BYTES, 9600)
+    assert identify_timeout(9600) == pytest.approx(expected)
+    # A 256 byte reply alone takes over a quarter second at 9600 baud
+    assert identify_timeout(9600) > 256 * char_time(9600) > scan_timeout(9600)
@@ -0,0 +1,129 @@
+import pytest
+
+from client import DEVICE_ID_BASIC, DEVICE_ID_REGULAR, GarbledReplyError
+from scanner import identify_unit, probe_unit
+
+SILENT = object()
+GARBLED = object()
+
+
+class Reply:
+    """Stand-in for a pymodbus response"""
+
+    def __init__(self, exception_code=None, **fields):
+        self.exception_code = exception_code
+        self.__dict__.update(fields)
+
+    def isError(self):
+        return self.exception_code is not None
+
+
+class FakeClient:
+    """Answers each request from a table and records what was sent.
+
+    ``replies`` maps (function code, read code) to a Reply, SILENT or
+    GARBLED; the read code is None for FC17 and FC03.
+    """
+
+    def __init__(self, replies, timeout=0.05):
+        self.replies = replies
+        self.timeout = timeout
+        self.retries = 0
+        self.sent = []
+
+    def with_timing(self, timeout, retries):
+        view = type(self)(self.replies, timeout)
+        view.sent = self.sent
+        return view
+
+    def _answer(self, key):
+        self.sent.append(key + (self.timeout,))
+        reply = self.replies.get(key, SILENT)
+        if reply is GARBLED:
+            raise GarbledReplyError("CRC mismatch")
+        return None if reply is SILENT else reply
+
+    def read_device_identification(self, unit, read_code=DEVICE_ID_REGULAR):
+        return self._answer((43, read_code))
+
+    def report_server_id(self, unit):
+        return self._answer((17, None))
+
+    def request(self, function_code, unit, method, **kwargs):
+        reply = self._answer((function_code, None))
+        if reply is None:
+            raise IOError("No response")
+        return reply
+
+
+IDENTITY = Reply(information={0x00: b'Acme', 0x01: b'PM-1', 0x05: b'PM5560\x00', 0x80: b'extra'})
+
+
+def test_identify_unit_reads_device_identification():
+    client = FakeClient({(43, DEVICE_ID_REGULAR): IDENTITY})
+    assert identify_unit(client, 1) == {'vendor': 'Acme', 'product_code': 'PM-1', 'model': 'PM5560'}
+
+
+def test_identify_unit_falls_back_to_the_basic_category():
+    client = FakeClient({
+        (43, DEVICE_ID_REGULAR): Reply(exception_code=3),
+        (43, DEVICE_ID_BASIC): Reply(information={0x00: b'Acme'}),
+    })
+    assert identify_unit(client, 1) == {'vendor': 'Acme'}
+
+
+def test_identify_unit_falls_back_to_report_server_id():
+    client = FakeClient({
+        (43, DEVICE_ID_REGULAR): Reply(exception_code=1),
+        (17, None): Reply(identifier=b'\x12\x34', status=0xFF),
+    })
+    assert identify_unit(client, 1) == {'server_id': '1234', 'running': True}
+
+
+@pytest.mark.parametrize('replies, expected', [
+    ({}, None),
+    ({(43, DEVICE_ID_REGULAR): Reply(exception_code=1), (17, None): Reply(exception_code=1)}, {}),
+    ({(43, DEVICE_ID_REGULAR): GARBLED, (17, None): GARBLED}, {}),
+])
+def test_identify_unit_presence(replies, expected):
+    assert identify_unit(FakeClient(replies), 1) == expected
+
+
+def test_probe_identifies_from_the_presence_reply():
+    client = FakeClient({(43, DEVICE_ID_REGULAR): IDENTITY})
+    assert probe_unit(client, 1, 0, 0.5)['vendor'] == 'Acme'
+    assert client.sent == [(43, DEVICE_ID_REGULAR, 0.05)]
+
+
+def test_probe_of_a_silent_unit_costs_one_short_request():
+    client = FakeClient({(3, None): Reply()})
+    assert probe_unit(client, 1, 0, 0.5) is None
+    assert client.sent == [(43, DEVICE_ID_REGULAR, 0.05)]
+
+
+def test_probe_identifies_a_garbled_reply_on_the_long_timeout():
+    client = FakeClient({(43, DEVICE_ID_REGULAR): GARBLED, (17, None): Reply(identifier=b'ID', status=0)})
+    assert probe_unit(client, 1, 0, 0.5) == {'server_id': 'ID', 'running': False}
+    assert client.sent == [(43, DEVICE_ID_REGULAR, 0.05), (43, DEVICE_ID_REGULAR, 0.5), (17, None, 0.5)]
+
+
+def test_probe_counts_a_unit_silent_on_identification_as_present():
+    client = FakeClient({(43, DEVICE_ID_REGULAR): GARBLED})
+    assert probe_unit(client, 1, 0, 0.5) == {}
+
+    # Garbled on the short probe, then nothing on the long one
+    class Fading(FakeClient):
+        def _answer(self, key):
+            if self.sent:
+                self.replies = {}
+            return super()._answer(key)
+
+    client = Fading({(43, DEVICE_ID_REGULAR): GARBLED})
+    assert probe_unit(client, 1, 0, 0.5) == {}
+    assert len(client.sent) == 2
+
+
+def test_fallback_register_read_only_when_asked():
+    replies = {(3, None): Reply(exception_code=2)}
+    assert probe_unit(FakeClient(replies), 1, 0, 0.5) is None
+    assert probe_unit(FakeClient(replies), 1, 0, 0.5, fallback=True) == {}
@@ -0,0 +1,65 @@
+from series import RingSeries, TimeSeriesStore
+
+
+def filled(capacity, count, max_age=None):
+    series = RingSeries(capacity, max_age)
+    for t in range(count):
+        series.append(float(t), float(t * 10))
+    return series
+
+
+def test_keeps_every_sample_below_capacity():
+    series = filled(5, 3)
+    times, values = series.window()
+    assert list(times) == [0.0, 1.0, 2.0]
+    assert list(values) == [0.0, 10.0, 20.0]
+
+
+def test_keeps_the_newest_samples_at_capacity():
+    series = filled(4, 10)
+    assert len(series) == 4
+    times, values = series.window()
+    assert list(times) == [6.0, 7.0, 8.0, 9.0]
+    assert list(values) == [60.0, 70.0, 80.0, 90.0]
+    assert series.latest() == (9.0, 90.0)
+
+
+def test_window_is_contiguous_across_the_wrap():
+    series = filled(4, 6)
+    # Position 2 of the ring: the oldest samples sit behind the newest
+    assert list(series.window()[0]) == [2.0, 3.0, 4.0, 5.0]
+
+
+def test_window_bounds_are_inclusive():
+    series = filled(10, 10)
+    assert list(series.window(3.0, 5.0)[0]) == [3.0, 4.0, 5.0]
+    assert list(series.window(start_time=7.5)[0]) == [8.0, 9.0]
+    assert list(series.window(end_time=1.0)[0]) == [0.0, 1.0]
+    assert list(series.window(20.0, 30.0)[0]) == []
+
+
+def test_max_age_drops_old_samples():
+    series = filled(100, 10, max_age=3.0)
+    assert len(series) == 4
+    assert list(series.window()[0]) == [6.0, 7.0, 8.0, 9.0]
+
+
+def test_clear():
+    series = filled(4, 6)
+    series.clear()
+    assert len(series) == 0
+    assert series.latest() is None
+    series.append(100.0, 1.0)
+    assert list(series.window()[0]) == [100.0]
+
+
+def test_store_creates_series_per_register():
+    store = TimeSeriesStore(capacity=2)
+    store.append('a', 0.0, 1.0)
+    store.append('a', 1.0, 2.0)
+    store.append('a', 2.0, 3.0)
+    store.append('b', 0.0, 5.0)
+    assert sorted(store) == ['a', 'b']
+    assert list(store.series('a').window()[1]) == [2.0, 3.0]
+    store.discard('b')
+    assert 'b' not in store and store.series('b') is None